@@ -0,0 +1,132 @@
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+import timeit
+
+from benchmarks.casos import CASOS
+from simulador.perfil import FASES, perfilar
+
+# Historial: lista de corridas {"commit", "fecha", "maquina", "resultados"},
+# donde resultados va de nombre de caso a segundos por llamada (el mínimo de
+# las repeticiones, que es el menos afectado por ruido).
+HISTORIAL = os.path.join(os.path.dirname(__file__), "historial.json")
+
+def commit_actual():
+    try:
+        salida = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(__file__), check=True)
+        sucio = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                               text=True, cwd=os.path.dirname(__file__)).stdout.strip()
+        return salida.stdout.strip() + ("+cambios" if sucio else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocido"
+
+def medir(caso, repeticiones=5, tiempo_minimo=0.2):
+    """
+    Segundos por llamada de caso: calibra la cantidad de llamadas por
+    repetición para que cada una dure al menos tiempo_minimo y devuelve el
+    mínimo entre repeticiones.
+    """
+    temporizador = timeit.Timer(caso)
+    numero = 1
+    while True:
+        duracion = temporizador.timeit(numero)
+        if duracion >= tiempo_minimo or numero >= 1_000_000:
+            break
+        numero *= 10 if duracion < tiempo_minimo / 10 else 2
+    tiempos = [duracion] + temporizador.repeat(repeat=repeticiones - 1, number=numero)
+    return min(tiempos) / numero
+
+def cargar_historial(ruta):
+    if not os.path.exists(ruta):
+        return []
+    with open(ruta) as archivo:
+        return json.load(archivo)
+
+def comparar(resultados, referencia, umbral):
+    """
+    Casos cuyo tiempo creció más que umbral (0.2 = 20 %) respecto de la
+    corrida de referencia: lista de (nombre, antes, ahora).
+    """
+    return [(nombre, referencia[nombre], segundos) for nombre, segundos in resultados.items()
+            if nombre in referencia and segundos > referencia[nombre] * (1 + umbral)]
+
+def perfilar_casos(casos, ruta, memoria=False):
+    """
+    Corre cada caso una vez con la instrumentación activa, muestra cómo se
+    reparte el tiempo de sus tramos entre las fases y guarda los informes en
+    ruta (JSON, un informe por caso).
+    """
+    informes = {}
+    print(f"{'caso':32s} {'tramos':>6} {'pasos':>7} {'llamadas':>9} "
+          + " ".join(f"{fase:>10}" for fase in FASES) + "  (ms)")
+    for nombre, caso in casos.items():
+        with perfilar(memoria) as perfil:
+            caso()
+        informes[nombre] = perfil.informe()
+        totales = informes[nombre]["totales"]
+        print(f"{nombre:32s} {totales['tramos']:6d} {totales['pasos']:7d} {sum(perfil.llamadas.values()):9d} "
+              + " ".join(f"{1e3 * totales['fases'][fase]:10.3f}" for fase in FASES))
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        json.dump(informes, archivo, indent=1, ensure_ascii=False)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de integradores, tramos y vueltas completas.")
+    parser.add_argument("filtro", nargs="?", default="", help="Expresión regular sobre los nombres de caso")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--tiempo-minimo", type=float, default=0.2, help="Segundos mínimos por repetición")
+    parser.add_argument("--umbral", type=float, default=0.2, help="Aumento relativo que cuenta como regresión")
+    parser.add_argument("--historial", default=HISTORIAL)
+    parser.add_argument("--no-guardar", action="store_true", help="No agregar la corrida al historial")
+    parser.add_argument("--listar", action="store_true", help="Sólo listar los casos")
+    parser.add_argument("--perfil", metavar="RUTA",
+                        help="En lugar de medir, correr cada caso una vez instrumentado y guardar el informe JSON")
+    parser.add_argument("--memoria", action="store_true", help="Con --perfil, medir también el pico de memoria")
+    args = parser.parse_args(argv)
+
+    casos = {nombre: caso for nombre, caso in CASOS.items() if re.search(args.filtro, nombre)}
+    if args.listar:
+        print("\n".join(casos))
+        return 0
+    if args.perfil:
+        perfilar_casos(casos, args.perfil, args.memoria)
+        return 0
+
+    historial = cargar_historial(args.historial)
+    commit = commit_actual()
+    # La referencia es la última corrida de otro commit que midió cada caso
+    referencia = {}
+    for corrida in historial:
+        if corrida["commit"] != commit:
+            referencia.update(corrida["resultados"])
+
+    resultados = {}
+    for nombre, caso in casos.items():
+        resultados[nombre] = medir(caso, args.repeticiones, args.tiempo_minimo)
+        antes = referencia.get(nombre)
+        cambio = f"{100 * (resultados[nombre] / antes - 1):+6.1f} %" if antes else ""
+        print(f"{nombre:32s} {resultados[nombre] * 1e3:12.4f} ms  {cambio}")
+
+    regresiones = comparar(resultados, referencia, args.umbral)
+    for nombre, antes, ahora in regresiones:
+        print(f"REGRESIÓN {nombre}: {antes * 1e3:.4f} ms -> {ahora * 1e3:.4f} ms", file=sys.stderr)
+
+    if not args.no_guardar:
+        historial.append({
+            "commit": commit,
+            "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "maquina": f"{platform.node()} {platform.processor() or platform.machine()} Python {platform.python_version()}",
+            "resultados": resultados,
+        })
+        with open(args.historial, "w") as archivo:
+            json.dump(historial, archivo, indent=1)
+
+    return 1 if regresiones else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+import numpy as np
+
+import formulas_tp
+import tp_completo
+from simulador.constantes import F_max, dt
+from simulador.integradores import rk4
+from simulador.tramos import tramo_recto, tramo_curva, simular_tramo_recto, simular_tramo_curva
+from simulador.vuelta import simular_vuelta
+from simulador.barrido import barrer
+
+# Cada caso es una función sin argumentos que corre una vez lo que se mide.
+# CASOS los junta por nombre; el nombre es la clave en el historial, así que
+# no conviene cambiarlo una vez publicado.
+
+ESTADO = np.array([0.0, 0.0, 50.0, 0.3])
+PASOS = 1000
+
+def formulas_rk4_curvas():
+    formulas_tp.runge_kutta_4_orden_superior(formulas_tp.ecuacion_curvas, 0, 0.5, 0, 2, 1e-3, 9, 5 * formulas_tp.G)
+
+def rk4_tramo_recto():
+    estado = ESTADO
+    for i in range(PASOS):
+        estado = rk4(tramo_recto, i * dt, estado, dt, -5000)
+
+def rk4_tramo_curva():
+    estado = ESTADO
+    for i in range(PASOS):
+        estado = rk4(tramo_curva, i * dt, estado, dt, 9, ESTADO[2])
+
+def _tramo_recto(metodo):
+    return lambda: simular_tramo_recto(ESTADO, 150, -5000, dt, 0.0, metodo=metodo)
+
+def _tramo_curva(metodo):
+    return lambda: simular_tramo_curva(ESTADO, 9, np.pi / 2, dt, 0.0, metodo=metodo)
+
+def _vuelta(paso, metodo):
+    return lambda: simular_vuelta(tp_completo.f1, tp_completo.f2, tp_completo.f3, tp_completo.r1,
+                                  tp_completo.r2, tp_completo.v0, paso, metodo=metodo)
+
+def barrido_lote():
+    barrer(fuerzas=[np.linspace(-10400, -10000, 21), np.linspace(-4500, -4200, 16), [F_max]],
+           radios=[[9], [3, 4, 5]], procesos=1)
+
+CASOS = {
+    "formulas_rk4_curvas": formulas_rk4_curvas,
+    "rk4_tramo_recto": rk4_tramo_recto,
+    "rk4_tramo_curva": rk4_tramo_curva,
+    **{f"simular_tramo_recto_{m}": _tramo_recto(m) for m in ("analitico", "rk4", "rk45", "distancia")},
+    **{f"simular_tramo_curva_{m}": _tramo_curva(m) for m in ("analitico", "rk4", "rk45", "distancia")},
+    **{f"vuelta_{m}_dt_{paso:g}": _vuelta(paso, m)
+       for m in ("analitico", "rk4") for paso in (0.01, 0.001, 0.0001)},
+    "barrido_lote": barrido_lote,
+}
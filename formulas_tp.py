@@ -1,67 +1,190 @@
 import numpy as np
 
+from simulador import perfil
+from simulador.integradores import pasos_dormand_prince, informe_integradores, integrador_mas_barato
+
+__all__ = [
+    "np", "G", "V_INICIAL_MAX", "M", "ACELERACION_MAX", "FUERZA_MAX",
+    "runge_kutta_4_sistema", "runge_kutta_4_orden_superior", "orden_convergencia",
+    "dormand_prince_orden_superior", "ecuacion_curvas",
+]
+
 G = 9.81 # m/s²
 V_INICIAL_MAX = 180 # km/h
 M = 800 # kg
 ACELERACION_MAX = 6 * G # m/s²
 FUERZA_MAX = ACELERACION_MAX * M # N
 
+def runge_kutta_4_sistema(f, t0, Y0, tf, h, *args):
+    """
+    Resuelve un sistema de EDOs de 1er orden Y' = f(t, Y) con Runge-Kutta de
+    4to orden y paso fijo, sobre arreglos preasignados
+
+    Parámetros:
+    f: Función f(t, Y, *args) que devuelve Y' (un arreglo del tamaño de Y)
+    t0: Valor inicial de t
+    Y0: Estado inicial (escalar o vector)
+    tf: Valor final de t
+    h: Tamaño del paso
+
+    Retorna:
+    t: Arreglo (n,) de valores de t
+    Y: Arreglo (n, d) de estados, una fila por paso
+    """
+    # Calcular número de pasos (la tolerancia evita perder el último por redondeo)
+    n = int((tf - t0) / h + 1e-9) + 1
+
+    Y0 = np.atleast_1d(np.asarray(Y0, dtype=float))
+    t = t0 + h * np.arange(n)
+    Y = np.empty((n, Y0.size))
+    Y[0] = Y0
+
+    for i in range(1, n):
+        ti, Yi = t[i-1], Y[i-1]
+        k1 = f(ti, Yi, *args)
+        k2 = f(ti + h/2, Yi + (h/2) * k1, *args)
+        k3 = f(ti + h/2, Yi + (h/2) * k2, *args)
+        k4 = f(ti + h, Yi + h * k3, *args)
+        Y[i] = Yi + h * (k1 + 2 * k2 + 2 * k3 + k4) / 6
+
+    return t, Y
+
 def runge_kutta_4_orden_superior(f_u, t0, y0, u0, tf, h, *args):
     """
-    Resuelve una EDO usando el método Runge-Kutta de 4to orden
+    Resuelve una EDO de 2do orden y'' = f_u(t, y, y') usando el método
+    Runge-Kutta de 4to orden. Con y0 vector se resuelve el sistema de 1er
+    orden Y = [y, u] con runge_kutta_4_sistema; con y0 escalar se usan las
+    mismas etapas con floats de Python, que es bastante más rápido que con
+    arreglos de 2 elementos (tests/test_formulas_tp.py verifica que ambos
+    caminos den lo mismo)
     
     Parámetros:
     f_u: Función que define u' = d²y/dt² 
     t0: Valor inicial de t
-    y0: Valor inicial de y
-    u0: Valor inicial de u
+    y0: Valor inicial de y (escalar, o vector para varias coordenadas a la vez)
+    u0: Valor inicial de u (del mismo tamaño que y0)
     tf: Valor final de t
     h: Tamaño del paso
     
     Retorna:
     t: Arreglo de valores de t
-    y: Arreglo de valores de y
+    y: Arreglo de valores de y (n,) si y0 es escalar o (n, d) si es vector
     u: Arreglo de valores de u
     """
-    # Calcular número de pasos
-    n = int((tf - t0) / h) + 1
-    
-    t = [0] * n
-    y = [0] * n
-    u = [0] * n
-    
-    # Condiciones iniciales
-    t[0] = t0
-    y[0] = y0
-    u[0] = u0
-    
-    # Método de Runge-Kutta de 4to orden
+    # Sin un Perfil activo, contar devuelve f_u sin envolver
+    f_u = perfil.contar(f_u)
+    if np.ndim(y0) > 0:
+        y0 = np.asarray(y0, dtype=float).ravel()
+        d = y0.size
+
+        def sistema(t, Y, *args):
+            dY = np.empty_like(Y)
+            dY[:d] = Y[d:]
+            dY[d:] = f_u(t, Y[:d], Y[d:], *args)
+            return dY
+
+        Y0 = np.concatenate([y0, np.broadcast_to(np.asarray(u0, dtype=float).ravel(), (d,))])
+        t, Y = runge_kutta_4_sistema(sistema, t0, Y0, tf, h, *args)
+        return t, Y[:, :d], Y[:, d:]
+
+    n = int((tf - t0) / h + 1e-9) + 1
+    t = t0 + h * np.arange(n)
+    y = np.empty(n)
+    u = np.empty(n)
+    y[0] = yi = float(y0)
+    u[0] = ui = float(u0)
+
+    # Etapas de runge_kutta_4_sistema sobre Y = [y, u], con Y' = [u, f_u]
     for i in range(1, n):
-        # 1era iteración
-        k1 = u[i-1]
-        m1 = f_u(t[i-1], y[i-1], u[i-1], *args)
-
-        # 2da iteración
-        k2 = u[i-1] + (h * m1) / 2
-        m2 = f_u(t[i-1] + h/2, y[i-1] + (h * k1)/2, k2, *args)
-        
-        # 3ra iteración
-        k3 = u[i-1] + (h * m2) / 2
-        m3 = f_u(t[i-1] + h/2, y[i-1] + (h * k2)/2, k3, *args)
-
-        # 4ta iteración
-        k4 = u[i-1] + (h * m3) / 2
-        m4 = f_u(t[i-1] + h, y[i-1] + (h * k3), k4, *args)
-
-        # Actualizar y, u, t
-        y[i] = y[i-1] + h * (k1 + 2 * k2 + 2 * k3 + k4) / 6
-        u[i] = u[i-1] + h * (m1 + 2 * m2 + 2 * m3 + m4) / 6
-        t[i] = t[i-1] + h
-    
+        ti = t0 + h * (i - 1)
+        k1, m1 = ui, f_u(ti, yi, ui, *args)
+        k2 = ui + (h/2) * m1
+        m2 = f_u(ti + h/2, yi + (h/2) * k1, k2, *args)
+        k3 = ui + (h/2) * m2
+        m3 = f_u(ti + h/2, yi + (h/2) * k2, k3, *args)
+        k4 = ui + h * m3
+        m4 = f_u(ti + h, yi + h * k3, k4, *args)
+        yi = yi + h * (k1 + 2 * k2 + 2 * k3 + k4) / 6
+        ui = ui + h * (m1 + 2 * m2 + 2 * m3 + m4) / 6
+        y[i] = yi
+        u[i] = ui
+
     return t, y, u
 
+def orden_convergencia(metodo, f_u, t0, y0, u0, tf, h, *args, refinamientos=4):
+    """
+    Estima el orden de convergencia de un método para EDOs de 2do orden
+    (con la firma de runge_kutta_4_orden_superior) resolviendo con h, h/2,
+    h/4, ... y comparando y(tf) entre refinamientos sucesivos: si el error
+    es C h^p, log2(|y_h - y_h/2| / |y_h/2 - y_h/4|) tiende a p. No hace
+    falta conocer la solución exacta; tf - t0 debe ser múltiplo de h.
+
+    Retorna:
+    pasos: Lista de los h usados
+    ordenes: Lista de órdenes estimados (refinamientos - 2 valores)
+    """
+    pasos = [h / 2**k for k in range(refinamientos)]
+    finales = [np.atleast_1d(metodo(f_u, t0, y0, u0, tf, paso, *args)[1])[-1] for paso in pasos]
+    diferencias = [np.max(np.abs(a - b)) for a, b in zip(finales, finales[1:])]
+    ordenes = [np.log2(a / b) for a, b in zip(diferencias, diferencias[1:])]
+    return pasos, ordenes
+
+def dormand_prince_orden_superior(f_u, t0, y0, u0, tf, h, *args, rtol=1e-6, atol=1e-9):
+    """
+    Resuelve una EDO de 2do orden con Dormand-Prince 5(4) y paso adaptativo
+    
+    Parámetros:
+    f_u: Función que define u' = d²y/dt² 
+    t0: Valor inicial de t
+    y0: Valor inicial de y
+    u0: Valor inicial de u
+    tf: Valor final de t
+    h: Tamaño del primer paso de prueba
+    rtol: Tolerancia relativa
+    atol: Tolerancia absoluta
+    
+    Retorna:
+    t: Arreglo de valores de t (pasos aceptados)
+    y: Arreglo de valores de y
+    u: Arreglo de valores de u
+    estadisticas: Diccionario con los pasos aceptados y rechazados
+    """
+    f_u = perfil.contar(f_u)
+
+    def sistema(t, Y, *args):
+        return np.array([Y[1], f_u(t, Y[0], Y[1], *args)])
+
+    t = [t0]
+    Y = [np.array([y0, u0], dtype=float)]
+    estadisticas = {}
+
+    # El último paso se acota para terminar exactamente en tf
+    pasos = pasos_dormand_prince(sistema, t0, Y[0], h, args, rtol, atol,
+                                 limite=lambda t, _: tf - t, estadisticas=estadisticas)
+    while tf - t[-1] > 1e-12 * max(1.0, abs(tf)):
+        t_siguiente, Y_siguiente, _, _ = next(pasos)
+        t.append(t_siguiente)
+        Y.append(Y_siguiente)
+
+    Y = np.array(Y)
+    return np.array(t), Y[:, 0], Y[:, 1], estadisticas
+
 def ecuacion_curvas(t,theta, omega, r, max_G):
     if max_G > ACELERACION_MAX:
         return 0
     
     return (- max_G/ r) * np.sin(theta)
+
+if __name__ == "__main__":
+    # Costo y precisión de los integradores registrados sobre ecuacion_curvas
+    # (el orden de convergencia se verifica en tests/test_formulas_tp.py)
+    def sistema_curvas(t, Y, r, max_G):
+        return np.array([Y[1], ecuacion_curvas(t, Y[0], Y[1], r, max_G)])
+
+    estado0 = np.array([0.0, 20 / 30])
+    print("Integrador  evaluaciones  eval/paso  error en t = 5 (h = 0.05)")
+    for fila in informe_integradores(sistema_curvas, 0.0, estado0, 5.0, 0.05, (30, ACELERACION_MAX)):
+        print(f"{fila['nombre']:10s} {fila['evaluaciones']:13d} {fila['evaluaciones_por_paso']:10.1f}  {fila['error']:.3e}")
+    nombre, h, evaluaciones, error = integrador_mas_barato(sistema_curvas, 0.0, estado0, 5.0, 1e-6,
+                                                           args=(30, ACELERACION_MAX))
+    print(f"Más barato con error < 1e-6: {nombre} (h = {h:g}, {evaluaciones} evaluaciones)")
@@ -0,0 +1,28 @@
+from simulador.constantes import g, g_max, M, dt, F_max
+from simulador.tramos import (
+    vector, angulo_entre, rk4, tramo_recto, tramo_recto_exponencial, tramo_curva,
+    evento_distancia, evento_angulo, evento_velocidad,
+    simular_tramo_recto, simular_tramo_curva,
+)
+from simulador.integradores import (
+    paso_dormand_prince, pasos_rk4, pasos_fijos, pasos_dormand_prince,
+    Integrador, INTEGRADORES, integrar, informe_integradores, integrador_mas_barato,
+)
+from simulador.pista import (
+    Pista, Recta, Curva, Malla, compilar_pista, cargar_pista, pista_por_defecto, discretizar_pista,
+)
+from simulador.analitico import estado_recta, estado_curva, tiempo_salida_recta, tiempo_salida_curva
+from simulador.lote import (
+    rk4_lote, tramo_recto_lote, tramo_curva_lote,
+    simular_tramo_recto_lote, simular_tramo_curva_lote, simular_pista_lote, simular_vuelta_lote,
+)
+from simulador.trayectoria import (
+    Trayectoria, RegistroCompleto, RegistroDecimado, RegistroIntervalo, RegistroEventos,
+)
+from simulador.vuelta import simular_pista, simular_vuelta, recorrer_tramos, simular_tramo_pista
+from simulador.cache import CacheTramos
+from simulador.cadena import CadenaVuelta
+from simulador.flujo import simular_en_bloques, EscritorNpy, EscritorNpz, volcar, leer_bloques
+from simulador.mapa import LineaCentral, linea_central, malla_linea_central, CampoDistancia, campo_distancia
+from simulador.perfil import Perfil, perfilar
+from simulador.sensibilidad import simular_pista_sensible, simular_tramo_sensible, disparo_newton
@@ -0,0 +1,57 @@
+import numpy as np
+
+from simulador.constantes import M
+
+# Soluciones exactas de los tramos con fuerza constante (movimiento
+# uniformemente acelerado) y de las curvas a velocidad constante (arco de
+# circunferencia). Todas aceptan arreglos y usan broadcasting de NumPy:
+# un estado (4,) con tiempos (K,) da (K, 4); estados (N, 4) con tiempos (N,)
+# dan (N, 4).
+
+def estado_recta(estado, F, t):
+    """
+    Estado tras t segundos sobre una recta con fuerza constante F.
+    """
+    estado = np.asarray(estado, dtype=float)
+    x0, y0, v0, theta = (estado[..., i] for i in range(4))
+    t = np.asarray(t, dtype=float)
+    a = np.asarray(F, dtype=float) / M
+    s = v0 * t + a * t**2 / 2
+    return np.stack(np.broadcast_arrays(
+        x0 + s * np.cos(theta), y0 + s * np.sin(theta), v0 + a * t, theta + 0 * t
+    ), axis=-1)
+
+def estado_curva(estado, radio, t):
+    """
+    Estado tras t segundos sobre una curva de radio constante a velocidad constante.
+    """
+    estado = np.asarray(estado, dtype=float)
+    x0, y0, v, theta0 = (estado[..., i] for i in range(4))
+    t = np.asarray(t, dtype=float)
+    theta = theta0 + v / radio * t
+    return np.stack(np.broadcast_arrays(
+        x0 + radio * (np.sin(theta) - np.sin(theta0)),
+        y0 - radio * (np.cos(theta) - np.cos(theta0)),
+        v + 0 * t,
+        theta,
+    ), axis=-1)
+
+def tiempo_salida_recta(v0, F, distancia):
+    """
+    Tiempo para recorrer la distancia con fuerza constante F. Es NaN si el auto
+    se detiene antes de llegar.
+    """
+    v0 = np.asarray(v0, dtype=float)
+    a = np.asarray(F, dtype=float) / M
+    discriminante = v0**2 + 2 * a * distancia
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # Forma 2d / (v0 + v_final): estable también cuando a -> 0
+        t = 2 * distancia / (v0 + np.sqrt(discriminante))
+    return np.where((discriminante >= 0) & (t >= 0), t, np.nan)
+
+def tiempo_salida_curva(v, radio, angulo):
+    """
+    Tiempo para girar el ángulo dado en una curva a velocidad constante.
+    """
+    with np.errstate(divide="ignore"):
+        return np.asarray(angulo, dtype=float) * radio / np.asarray(v, dtype=float)
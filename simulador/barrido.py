@@ -0,0 +1,155 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from simulador.constantes import dt, g_max
+from simulador.lote import simular_pista_lote
+from simulador.mapa import campo_distancia
+from simulador.pista import cargar_pista, leer_fuerza, pista_por_defecto
+
+# Columnas de resultados que siguen a las de parámetros en cada fila
+COLUMNAS_RESULTADO = ("t_total", "acc_tangencial_max", "acc_centripeta_max", "margen_pista", "violacion_6g",
+                      "valido")
+
+def leer_valores(texto):
+    """
+    Convierte "inicio:fin:n" en np.linspace(inicio, fin, n) y "a,b,c" en una
+    lista de valores. Acepta también "F_max" y "-F_max".
+    """
+    if ":" in texto:
+        inicio, fin, n = texto.split(":")
+        return np.linspace(leer_fuerza(inicio), leer_fuerza(fin), int(n))
+    return np.array([leer_fuerza(valor) for valor in texto.split(",")])
+
+def grilla(fuerzas, radios, v0):
+    """
+    Producto cartesiano de los valores de cada parámetro, como un arreglo
+    (N, n_fuerzas + n_radios + 1) con una configuración por fila.
+    """
+    ejes = [np.atleast_1d(np.asarray(v, dtype=float)) for v in (*fuerzas, *radios, v0)]
+    mallas = np.meshgrid(*ejes, indexing="ij")
+    return np.stack([m.ravel() for m in mallas], axis=1)
+
+def _evaluar_bloque(pista, configuraciones, dt, metodo, tolerancia_pista=None):
+    n_fuerzas = len(pista.rectas)
+    n_radios = len(pista.curvas)
+    fuerzas = configuraciones[:, :n_fuerzas].T
+    radios = configuraciones[:, n_fuerzas:n_fuerzas + n_radios].T
+    v0 = configuraciones[:, -1]
+    # El campo ya está en el caché (lo calcula barrer), así que cada proceso lo abre mapeado
+    campo = campo_distancia() if tolerancia_pista is not None else None
+    resultado = simular_pista_lote(pista, fuerzas, radios, v0, dt, metodo, campo)
+    tolerancia = 1e-9 * g_max
+    violacion = ((resultado["acc_tangencial_max"] > g_max + tolerancia)
+                 | (resultado["acc_centripeta_max"] > g_max + tolerancia))
+    valido = resultado["valido"]
+    if tolerancia_pista is not None:
+        valido = valido & (resultado["margen_pista"] >= -tolerancia_pista)
+    return np.column_stack([
+        configuraciones,
+        resultado["t_total"],
+        resultado["acc_tangencial_max"],
+        resultado["acc_centripeta_max"],
+        resultado["margen_pista"],
+        violacion,
+        valido,
+    ])
+
+def barrer(pista=None, fuerzas=None, radios=None, v0=None, dt=dt, metodo="analitico",
+           procesos=None, bloque=2000, tolerancia_pista=None):
+    """
+    Simula todas las combinaciones de parámetros repartiendo la grilla en
+    bloques de `bloque` vueltas entre procesos. Cada bloque se resuelve con
+    el motor por lotes.
+
+    Parámetros:
+    pista: Pista compilada; por defecto la de tp_completo.py
+    fuerzas: Valores de cada fuerza (una lista de valores por recta)
+    radios: Valores de cada radio (una lista de valores por curva)
+    v0: Valores de velocidad inicial
+    procesos: Cantidad de procesos (None usa todos los núcleos, 1 no usa el pool)
+    bloque: Vueltas por unidad de trabajo
+    tolerancia_pista: Si se pasa, el recorrido se controla contra el campo de
+                      distancia de pista.png y las vueltas que se salen más de
+                      esa distancia (m) quedan inválidas
+
+    Retorna:
+    Arreglo (N, k) con una fila por vuelta: los parámetros, el tiempo total,
+    los picos de aceleración, el margen a los bordes de la pista, si hubo
+    violación de 6g y si la vuelta es válida
+    """
+    pista = pista_por_defecto() if pista is None else pista
+    fuerzas = [[r.fuerza] for r in pista.rectas] if fuerzas is None else fuerzas
+    radios = [[c.radio] for c in pista.curvas] if radios is None else radios
+    v0 = [pista.v0] if v0 is None else v0
+
+    if tolerancia_pista is not None:
+        campo_distancia()
+    configuraciones = grilla(fuerzas, radios, v0)
+    bloques = [configuraciones[i:i + bloque] for i in range(0, len(configuraciones), bloque)]
+
+    if procesos == 1 or len(bloques) == 1:
+        partes = [_evaluar_bloque(pista, b, dt, metodo, tolerancia_pista) for b in bloques]
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            partes = list(pool.map(_evaluar_bloque, [pista] * len(bloques), bloques, [dt] * len(bloques),
+                                   [metodo] * len(bloques), [tolerancia_pista] * len(bloques)))
+    return np.concatenate(partes)
+
+def nombres_parametros(pista):
+    """
+    Nombres de los parámetros de la pista en el orden de las columnas de
+    grilla: f1, f2, ... por recta, r1, r2, ... por curva y v0.
+    """
+    return ([f"f{i + 1}" for i in range(len(pista.rectas))]
+            + [f"r{i + 1}" for i in range(len(pista.curvas))]
+            + ["v0"])
+
+def main(argv=None):
+    # La pista se lee primero: sus rectas y curvas dicen qué parámetros se pueden barrer
+    previo = argparse.ArgumentParser(add_help=False)
+    previo.add_argument("--pista", help="Archivo de pista (.json/.toml); por defecto tp_completo")
+    pista_elegida, _ = previo.parse_known_args(argv)
+    pista = cargar_pista(pista_elegida.pista) if pista_elegida.pista else pista_por_defecto()
+    nombres = nombres_parametros(pista)
+
+    parser = argparse.ArgumentParser(description="Barrido de parámetros de la vuelta", parents=[previo])
+    for nombre in nombres:
+        parser.add_argument(f"--{nombre}", help="Valores: 'inicio:fin:n' o 'a,b,c'")
+    parser.add_argument("--dt", type=float, default=dt)
+    parser.add_argument("--metodo", default="analitico", choices=("analitico", "rk4", "distancia"))
+    parser.add_argument("--procesos", type=int, default=None)
+    parser.add_argument("--bloque", type=int, default=2000)
+    parser.add_argument("--tolerancia-pista", type=float, default=None,
+                        help="Descartar vueltas que se salen de pista.png más de esta distancia (m)")
+    parser.add_argument("--salida", help="CSV donde guardar la tabla de resultados")
+    args = parser.parse_args(argv)
+
+    defectos = [r.fuerza for r in pista.rectas] + [c.radio for c in pista.curvas] + [pista.v0]
+    valores = [leer_valores(getattr(args, nombre)) if getattr(args, nombre) else [defecto]
+               for nombre, defecto in zip(nombres, defectos)]
+    n_fuerzas, n_radios = len(pista.rectas), len(pista.curvas)
+    fuerzas, radios, v0 = valores[:n_fuerzas], valores[n_fuerzas:n_fuerzas + n_radios], valores[-1]
+
+    tabla = barrer(pista, fuerzas, radios, v0, args.dt, args.metodo, args.procesos, args.bloque,
+                   args.tolerancia_pista)
+
+    columnas = [*nombres, *COLUMNAS_RESULTADO]
+    if args.salida:
+        directorio = os.path.dirname(args.salida)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        np.savetxt(args.salida, tabla, delimiter=",", header=",".join(columnas), comments="", fmt="%.10g")
+
+    admisibles = (tabla[:, -1] == 1) & (tabla[:, -2] == 0)
+    condicion = "sin superar 6g" if args.tolerancia_pista is None else "sin superar 6g ni salir de la pista"
+    print(f"{len(tabla)} vueltas, {int(admisibles.sum())} válidas {condicion}")
+    if admisibles.any():
+        t_total = tabla[admisibles, columnas.index("t_total")]
+        mejor = tabla[admisibles][np.argmin(t_total)]
+        print("Mejor vuelta: " + ", ".join(f"{c} = {v:.6g}" for c, v in zip(columnas, mejor)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import hashlib
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from simulador.tramos import simular_tramo_recto, simular_tramo_curva, tramo_recto, _resultado
+from simulador.trayectoria import Trayectoria
+
+def _escribir_atomico(ruta, escribir):
+    """
+    Llama a escribir(temporal) y renombra el temporal a ruta, así quien lea
+    ruta nunca ve un archivo a medio escribir. El pid en el nombre del
+    temporal evita que dos procesos que arrancan juntos pisen el mismo.
+    El temporal conserva la extensión de ruta para que np.save y np.savez
+    no le agreguen otra.
+    """
+    temporal = f"{ruta}.{os.getpid()}.tmp{os.path.splitext(ruta)[1]}"
+    escribir(temporal)
+    os.replace(temporal, ruta)
+
+class CacheTramos:
+    """
+    Memoización de tramos simulados. La clave es el tipo de tramo, el estado
+    de entrada cuantizado, los parámetros del tramo (fuerza o radio y
+    distancia o ángulo), el modelo de fuerza, dt y las opciones del
+    integrador. Como la dinámica no depende del tiempo absoluto, se guardan
+    las muestras con tiempo relativo a la entrada y se desplazan al reusarlas.
+
+    Hay dos niveles: un LRU en memoria de a lo sumo `capacidad` tramos y,
+    si se da `directorio`, un .npz por clave que comparten distintas corridas.
+
+    Las opciones entran en la clave por su repr, así que sólo se admiten
+    valores simples (números, cadenas, None): estadisticas se saca de la clave
+    porque sólo acumula resultados, y los eventos extra (funciones) se
+    rechazan con ValueError. Un acierto no integra nada, así que no suma pasos
+    a estadisticas ni llamadas al perfil activo; aciertos y fallos cuentan
+    cuántos tramos se reusaron.
+    """
+
+    def __init__(self, capacidad=256, directorio=None, decimales=9):
+        self.capacidad = capacidad
+        self.directorio = directorio
+        self.decimales = decimales
+        self._memoria = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+        if directorio is not None:
+            os.makedirs(directorio, exist_ok=True)
+
+    def clave(self, tipo, estado, parametro, objetivo, dinamica, dt, opciones):
+        opciones = {nombre: valor for nombre, valor in opciones.items()
+                    if nombre != "estadisticas" and not (nombre == "eventos" and not len(valor))}
+        for nombre, valor in opciones.items():
+            if not isinstance(valor, (str, int, float, type(None))):
+                raise ValueError(f"CacheTramos no puede usar la opción {nombre}={valor!r} en la clave "
+                                 "(sólo números, cadenas o None)")
+        entrada = (
+            tipo,
+            tuple(np.round(np.asarray(estado, dtype=float), self.decimales).tolist()),
+            round(float(parametro), self.decimales),
+            round(float(objetivo), self.decimales),
+            getattr(dinamica, "__name__", repr(dinamica)),
+            float(dt),
+            tuple(sorted(opciones.items())),
+        )
+        return hashlib.sha1(repr(entrada).encode()).hexdigest()
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, f"{clave}.npz")
+
+    def obtener(self, clave):
+        if clave in self._memoria:
+            self._memoria.move_to_end(clave)
+            return self._memoria[clave]
+        if self.directorio is not None and os.path.exists(self._ruta(clave)):
+            with np.load(self._ruta(clave)) as datos:
+                valor = (datos["estado"], float(datos["duracion"]), datos["filas"])
+            self._guardar_en_memoria(clave, valor)
+            return valor
+        return None
+
+    def _guardar_en_memoria(self, clave, valor):
+        self._memoria[clave] = valor
+        self._memoria.move_to_end(clave)
+        while len(self._memoria) > self.capacidad:
+            self._memoria.popitem(last=False)
+
+    def guardar(self, clave, valor):
+        self._guardar_en_memoria(clave, valor)
+        if self.directorio is not None:
+            estado, duracion, filas = valor
+            _escribir_atomico(self._ruta(clave),
+                              lambda temporal: np.savez(temporal, estado=estado, duracion=duracion, filas=filas))
+
+    def limpiar(self):
+        self._memoria.clear()
+
+    def _simular(self, tipo, estado_inicial, parametro, objetivo, dt, t_inicial, trayectoria,
+                 dinamica, opciones):
+        if trayectoria is None:
+            trayectoria = Trayectoria()
+        # Las filas guardadas dependen de la política de registro
+        clave = self.clave(tipo, estado_inicial, parametro, objetivo, dinamica, dt,
+                           {**opciones, "registro": repr(trayectoria.registro)})
+        valor = self.obtener(clave)
+        radio = parametro if tipo == "curva" else None
+
+        if valor is not None:
+            self.aciertos += 1
+            estado, duracion, filas = valor
+            inicio = trayectoria.abrir_tramo(t_inicial, estado_inicial, tipo, radio)
+            bloque = trayectoria.reservar(len(filas))
+            bloque[:] = filas
+            bloque[:, 0] += t_inicial
+            return _resultado(trayectoria, tipo, inicio, estado_inicial, t_inicial, estado.copy(),
+                              t_inicial + duracion, radio)
+
+        self.fallos += 1
+        inicio, descartadas = len(trayectoria), trayectoria.descartadas
+        if tipo == "recta":
+            resultado = simular_tramo_recto(estado_inicial, objetivo, parametro, dt, t_inicial,
+                                            trayectoria=trayectoria, dinamica=dinamica, **opciones)
+        else:
+            resultado = simular_tramo_curva(estado_inicial, parametro, objetivo, dt, t_inicial,
+                                            trayectoria=trayectoria, **opciones)
+        inicio -= trayectoria.descartadas - descartadas
+        # Si al_llenar ya entregó parte del tramo, no queda entero para guardarlo
+        if inicio >= 0:
+            filas = trayectoria.datos[inicio:].copy()
+            filas[:, 0] -= t_inicial
+            self.guardar(clave, (resultado[0].copy(), resultado[7] - t_inicial, filas))
+        return resultado
+
+    def simular_tramo_recto(self, estado_inicial, distancia_objetivo, F, dt, t_inicial,
+                            trayectoria=None, dinamica=tramo_recto, **opciones):
+        """
+        Igual que simulador.tramos.simular_tramo_recto, pero reusa el
+        resultado si el tramo ya se simuló con la misma entrada.
+        """
+        return self._simular("recta", estado_inicial, F, distancia_objetivo, dt, t_inicial,
+                             trayectoria, dinamica, opciones)
+
+    def simular_tramo_curva(self, estado_inicial, radio, angulo_objetivo, dt, t_inicial,
+                            trayectoria=None, **opciones):
+        """
+        Igual que simulador.tramos.simular_tramo_curva, con memoización.
+        """
+        return self._simular("curva", estado_inicial, radio, angulo_objetivo, dt, t_inicial,
+                             trayectoria, None, opciones)
@@ -0,0 +1,122 @@
+import numpy as np
+
+from simulador.constantes import dt
+from simulador.pista import Recta, pista_por_defecto
+from simulador.trayectoria import Trayectoria
+from simulador.vuelta import simular_tramo_pista
+
+# La vuelta como cadena de dependencias: cada tramo consume el estado y el
+# tiempo con que salió el anterior más su propio parámetro (la fuerza de la
+# recta o el radio de la curva). Al cambiar un parámetro sólo se vuelven a
+# simular ese tramo y los siguientes; los anteriores reusan sus muestras.
+
+class Eslabon:
+    """
+    Un tramo de la cadena con lo que consumió en la última simulación
+    (parametro, estado y t de entrada) y lo que produjo (salida, t_salida y
+    su propia Trayectoria).
+    """
+
+    def __init__(self, tramo, parametro):
+        self.tramo = tramo
+        self.parametro = parametro
+        # (parametro, estado, t) con que se simuló por última vez
+        self.consumido = None
+        self.salida = None
+        self.t_salida = None
+        self.trayectoria = None
+
+    def vigente(self, estado, t):
+        # Sigue valiendo si ya se simuló con este mismo parámetro y entrada
+        if self.consumido is None:
+            return False
+        parametro, entrada, t_entrada = self.consumido
+        return parametro == self.parametro and t_entrada == t and np.array_equal(entrada, estado)
+
+class CadenaVuelta:
+    """
+    Vuelta incremental: guarda la salida y las muestras de cada tramo y, al
+    cambiar parámetros, vuelve a simular desde el primer tramo afectado.
+
+    Uso:
+    cadena = CadenaVuelta(pista_por_defecto(), metodo="rk4")
+    estado, t_total, trayectoria = cadena.cambiar(f3=30000)   # sólo la recta final
+    cadena.recalculados                                       # [4]
+
+    Los parámetros se nombran como en tp_completo.py: f1, f2, ... para la
+    fuerza de cada recta, r1, r2, ... para el radio de cada curva y v0.
+    """
+
+    def __init__(self, pista=None, fuerzas=None, radios=None, v0=None, dt=dt, cache=None, registro=None,
+                 **opciones):
+        self.pista = pista_por_defecto() if pista is None else pista
+        self.v0 = self.pista.v0 if v0 is None else v0
+        self.dt = dt
+        self.cache = cache
+        self.registro = registro
+        self.opciones = opciones
+        fuerzas = iter([r.fuerza for r in self.pista.rectas] if fuerzas is None else fuerzas)
+        radios = iter([c.radio for c in self.pista.curvas] if radios is None else radios)
+        self.eslabones = [Eslabon(t, next(fuerzas) if isinstance(t, Recta) else next(radios))
+                          for t in self.pista.tramos]
+        rectas = [i for i, e in enumerate(self.eslabones) if isinstance(e.tramo, Recta)]
+        curvas = [i for i, e in enumerate(self.eslabones) if not isinstance(e.tramo, Recta)]
+        self._por_nombre = {**{f"f{k + 1}": i for k, i in enumerate(rectas)},
+                            **{f"r{k + 1}": i for k, i in enumerate(curvas)}}
+        # Índices de los tramos simulados en la última actualización
+        self.recalculados = []
+        self.simulados = 0
+
+    def parametros(self):
+        """
+        Valores actuales por nombre: {"f1": ..., "r1": ..., "v0": ...}.
+        """
+        valores = {nombre: self.eslabones[i].parametro for nombre, i in self._por_nombre.items()}
+        return {**valores, "v0": self.v0}
+
+    def estado_inicial(self):
+        return np.array([*self.pista.inicio, self.v0, self.pista.rumbo_inicial])
+
+    def cambiar(self, **parametros):
+        """
+        Cambia parámetros (f1=..., r2=..., v0=...) y actualiza la vuelta.
+        Devuelve lo mismo que simular_pista.
+        """
+        for nombre, valor in parametros.items():
+            if nombre == "v0":
+                self.v0 = valor
+            elif nombre in self._por_nombre:
+                self.eslabones[self._por_nombre[nombre]].parametro = valor
+            else:
+                raise ValueError(f"Parámetro desconocido: {nombre}")
+        return self.actualizar()
+
+    def actualizar(self):
+        """
+        Recorre la cadena y simula sólo los tramos cuya entrada o parámetro
+        cambió desde la última vez.
+        """
+        self.recalculados = []
+        estado, t = self.estado_inicial(), 0.0
+        for i, eslabon in enumerate(self.eslabones):
+            if not eslabon.vigente(estado, t):
+                trayectoria = Trayectoria(registro=self.registro)
+                salida, t_salida = simular_tramo_pista(eslabon.tramo, eslabon.parametro, estado, t, self.dt,
+                                                       trayectoria, self.cache, **self.opciones)
+                eslabon.consumido = (eslabon.parametro, estado.copy(), t)
+                eslabon.salida, eslabon.t_salida = salida, t_salida
+                eslabon.trayectoria = trayectoria
+                self.recalculados.append(i)
+                self.simulados += 1
+            estado, t = eslabon.salida, eslabon.t_salida
+        return estado.copy(), t, self.trayectoria()
+
+    def trayectoria(self):
+        """
+        Trayectoria de toda la vuelta, uniendo las de los tramos.
+        """
+        filas = sum(len(e.trayectoria) for e in self.eslabones)
+        completa = Trayectoria(capacidad=filas, registro=self.registro)
+        for eslabon in self.eslabones:
+            completa.extender(eslabon.trayectoria)
+        return completa
@@ -0,0 +1,6 @@
+# Constantes físicas
+g = 9.81
+g_max = 6 * g
+M = 800
+dt = 0.01
+F_max = g_max * M
@@ -0,0 +1,100 @@
+import numpy as np
+
+from simulador.constantes import M, g_max, F_max
+from simulador.mapa import malla_linea_central
+from simulador.pista import Recta, discretizar_pista, pista_por_defecto
+
+# Solver cuasiestático (QSS) del tiempo de vuelta: sobre una malla en longitud
+# de arco, la velocidad se acota por el límite centrípeto v² <= a_max / curvatura
+# y después se recorre hacia adelante acelerando a fondo y hacia atrás frenando
+# a fondo. Como en el resto del simulador, en las curvas la velocidad es
+# constante: la aceleración tangencial sólo está disponible en las rectas.
+#
+# Las dos pasadas son recurrencias v²[i+1] = min(tope[i+1], v²[i] + 2 a ds),
+# que se resuelven sin bucle: si A es la suma acumulada de 2 a ds, entonces
+# v² = A + minimum.accumulate(tope - A).
+
+def _pasada(tope, presupuesto):
+    acumulado = np.concatenate(([0.0], np.cumsum(presupuesto)))
+    return acumulado + np.minimum.accumulate(tope - acumulado)
+
+def resolver_cuasiestatico(pista=None, radios=None, v0=None, ds=0.1, a_max=g_max, F_max=F_max, linea=None,
+                           curvatura_recta=0.02):
+    """
+    Perfil de velocidad óptimo y tiempo de vuelta mínimo, sin simular.
+
+    Parámetros:
+    pista: Pista compilada; por defecto la de tp_completo.py
+    radios: Radio de cada curva, en orden; por defecto los de la pista
+    v0: Velocidad inicial (fija); por defecto la de la pista
+    ds: Separación máxima entre nodos de la malla (m)
+    a_max: Aceleración centrípeta máxima
+    F_max: Fuerza máxima para acelerar y para frenar en las rectas
+    linea: LineaCentral de mapa.linea_central; si se da, la curvatura sale de
+           la línea central de pista.png en lugar de las rectas y radios de
+           la especificación (la malla es la de la tabla, y ds y radios no se usan)
+    curvatura_recta: Con linea, curvatura (1/m) por debajo de la cual un
+                     intervalo cuenta como recta (ver mapa.malla_linea_central)
+
+    Retorna:
+    Diccionario con la malla, v (velocidad en cada nodo), a_t (aceleración
+    tangencial de cada intervalo), t (tiempo al pasar por cada nodo), t_total
+    y factible: False si entrando a v0 no se llega a frenar antes de una
+    curva; entonces v[0] es la mayor velocidad de entrada posible, menor que
+    v0, y el perfil y t_total son los de esa entrada
+    """
+    pista = pista_por_defecto() if pista is None else pista
+    v0 = pista.v0 if v0 is None else v0
+    if linea is None:
+        malla = discretizar_pista(pista, radios, ds)
+        en_recta = np.array([isinstance(t, Recta) for t in pista.tramos])[malla.tramo]
+    else:
+        malla = malla_linea_central(linea, curvatura_recta)
+        en_recta = malla.curvatura == 0
+    paso = np.diff(malla.s)
+
+    # Tope por curvatura en cada nodo: el más restrictivo de sus dos intervalos
+    with np.errstate(divide="ignore"):
+        tope_intervalo = np.where(malla.curvatura > 0, a_max / malla.curvatura, np.inf)
+    tope = np.minimum(np.append(tope_intervalo, np.inf), np.insert(tope_intervalo, 0, np.inf))
+    tope[0] = min(tope[0], v0**2)
+
+    presupuesto = np.where(en_recta, 2 * (F_max / M) * paso, 0.0)
+
+    adelante = _pasada(tope, presupuesto)
+    atras = _pasada(tope[::-1], presupuesto[::-1])[::-1]
+    v2 = np.maximum(np.minimum(adelante, atras), 0.0)
+    v = np.sqrt(v2)
+    # La pasada hacia atrás (o el tope de una curva al comienzo) baja v[0]
+    # si con v0 no se llega a frenar: v0 es fija, así que no hay perfil posible
+    factible = bool(v2[0] >= v0**2 * (1 - 1e-12))
+
+    # Con aceleración constante en cada intervalo, dt = 2 ds / (v_i + v_i+1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dt = 2 * paso / (v[:-1] + v[1:])
+        a_t = np.where(paso > 0, np.diff(v2) / (2 * paso), 0.0)
+    t = np.concatenate(([0.0], np.cumsum(dt)))
+
+    return {
+        "malla": malla,
+        "v": v,
+        "a_t": a_t,
+        "t": t,
+        "t_total": t[-1],
+        "factible": factible,
+    }
+
+if __name__ == "__main__":
+    import sys
+    from simulador.mapa import linea_central
+    from simulador.pista import cargar_pista
+
+    # python -m simulador.cuasiestatico [pista.json] [--linea-central]
+    argumentos = [a for a in sys.argv[1:] if a != "--linea-central"]
+    pista = cargar_pista(argumentos[0]) if argumentos else pista_por_defecto()
+    linea = linea_central() if "--linea-central" in sys.argv[1:] else None
+    resultado = resolver_cuasiestatico(pista, linea=linea)
+    if not resultado["factible"]:
+        print(f"Con v0 = {pista.v0:g} m/s no se llega a frenar: la entrada baja a {resultado['v'][0]:.1f} m/s")
+    print(f"Tiempo de vuelta mínimo: {resultado['t_total']:.3f} s "
+          f"({len(resultado['v'])} nodos, v máx {resultado['v'].max():.1f} m/s)")
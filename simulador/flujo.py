@@ -0,0 +1,208 @@
+import os
+import queue
+import struct
+import threading
+import zipfile
+
+import numpy as np
+
+from simulador.constantes import dt
+from simulador.trayectoria import COLUMNAS, Trayectoria
+from simulador.vuelta import recorrer_tramos
+
+# Simulación por bloques: en lugar de guardar toda la vuelta, las muestras
+# (t, x, y, v, theta, a_t, a_c, F) se entregan en bloques de tamaño fijo en
+# cuanto se juntan, aun en medio de un tramo (ver al_llenar en Trayectoria).
+# La simulación corre en un hilo aparte que espera a que se consuma cada
+# bloque, así que la memoria queda acotada por unos pocos bloques sin
+# importar cuán largos sean los tramos ni cuántas vueltas se simulen.
+
+class _Cancelada(Exception):
+    pass
+
+_FIN = object()
+
+def simular_en_bloques(pista, fuerzas=None, radios=None, v0=None, dt=dt, tamano_bloque=4096,
+                       vueltas=1, registro=None, **opciones):
+    """
+    Generador que simula vueltas a la pista y entrega las muestras en bloques.
+
+    Parámetros:
+    pista, fuerzas, radios, v0, dt, opciones: Los de simular_pista
+    tamano_bloque: Filas de cada bloque (el último puede ser más corto)
+    vueltas: Cantidad de vueltas; cada una vuelve a salir del inicio de la
+             pista con la velocidad con que terminó la anterior, y el tiempo
+             sigue corriendo
+    registro: Política de registro (ver simulador.trayectoria)
+
+    Retorna (en cada iteración):
+    Arreglo (n, 8) con las columnas de COLUMNAS, propio del bloque
+    """
+    cola = queue.Queue(maxsize=1)
+    cancelada = threading.Event()
+
+    def entregar(bloque):
+        # Espera a que se consuma el bloque anterior, salvo que se abandone el generador
+        while not cancelada.is_set():
+            try:
+                cola.put(bloque, timeout=0.05)
+                return
+            except queue.Full:
+                pass
+        raise _Cancelada
+
+    def vaciar(trayectoria, listas):
+        while listas >= tamano_bloque:
+            entregar(trayectoria.datos[:tamano_bloque].copy())
+            trayectoria.descartar(tamano_bloque)
+            listas -= tamano_bloque
+
+    def simular():
+        trayectoria = Trayectoria(capacidad=tamano_bloque, registro=registro, al_llenar=vaciar)
+        v = pista.v0 if v0 is None else v0
+        t_actual = 0.0
+        for _ in range(vueltas):
+            estado = np.array([*pista.inicio, v, pista.rumbo_inicial])
+            for estado, t_actual in recorrer_tramos(pista, estado, t_actual, fuerzas, radios, dt,
+                                                    trayectoria, **opciones):
+                vaciar(trayectoria, len(trayectoria))
+            v = estado[2]
+        if len(trayectoria):
+            entregar(trayectoria.datos.copy())
+
+    def correr():
+        try:
+            simular()
+            entregar(_FIN)
+        except _Cancelada:
+            pass
+        except Exception as error:
+            # El error se vuelve a lanzar en quien consume el generador
+            try:
+                entregar(error)
+            except _Cancelada:
+                pass
+
+    hilo = threading.Thread(target=correr, daemon=True)
+    hilo.start()
+    try:
+        while (bloque := cola.get()) is not _FIN:
+            if isinstance(bloque, Exception):
+                raise bloque
+            yield bloque
+    finally:
+        cancelada.set()
+        hilo.join()
+
+def _cabecera_npy(filas, columnas, largo=128):
+    # Cabecera .npy versión 1.0 de largo fijo, para poder reescribirla con la
+    # cantidad final de filas sin mover los datos
+    texto = f"{{'descr': '<f8', 'fortran_order': False, 'shape': ({filas}, {columnas}), }}"
+    relleno = largo - 10 - len(texto) - 1
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", largo - 10) + (texto + " " * relleno + "\n").encode("latin1")
+
+class EscritorNpy:
+    """
+    Agrega bloques (n, 8) al final de un archivo .npy. La cabecera se escribe
+    al abrir y se corrige al cerrar, así que el archivo se puede leer después
+    con np.load(ruta, mmap_mode="r") sin cargarlo entero.
+
+    Uso:
+    with EscritorNpy("vuelta.npy") as escritor:
+        for bloque in simular_en_bloques(pista):
+            escritor.escribir(bloque)
+    """
+
+    def __init__(self, ruta, columnas=len(COLUMNAS)):
+        self.ruta = ruta
+        self.columnas = columnas
+        self.filas = 0
+        self._archivo = open(ruta, "wb")
+        self._archivo.write(_cabecera_npy(0, columnas))
+
+    def escribir(self, bloque):
+        bloque = np.ascontiguousarray(bloque, dtype="<f8")
+        if bloque.ndim != 2 or bloque.shape[1] != self.columnas:
+            raise ValueError(f"Se esperaba un bloque (n, {self.columnas}), llegó {bloque.shape}")
+        self._archivo.write(bloque.tobytes())
+        self.filas += len(bloque)
+
+    def cerrar(self):
+        if self._archivo.closed:
+            return
+        self._archivo.seek(0)
+        self._archivo.write(_cabecera_npy(self.filas, self.columnas))
+        self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+class EscritorNpz:
+    """
+    Guarda cada bloque como un arreglo propio (bloque_000000, bloque_000001,
+    ...) dentro de un .npz, junto con los nombres de las columnas. Se usa
+    igual que EscritorNpy; leer_bloques une los bloques al leer.
+    """
+
+    def __init__(self, ruta, comprimir=False):
+        self.ruta = ruta
+        self.filas = 0
+        self.bloques = 0
+        compresion = zipfile.ZIP_DEFLATED if comprimir else zipfile.ZIP_STORED
+        self._zip = zipfile.ZipFile(ruta, "w", compression=compresion, allowZip64=True)
+        self._agregar("columnas", np.array(COLUMNAS))
+
+    def _agregar(self, nombre, arreglo):
+        with self._zip.open(nombre + ".npy", "w", force_zip64=True) as archivo:
+            np.lib.format.write_array(archivo, np.asanyarray(arreglo))
+
+    def escribir(self, bloque):
+        self._agregar(f"bloque_{self.bloques:06d}", bloque)
+        self.bloques += 1
+        self.filas += len(bloque)
+
+    def cerrar(self):
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+def escritor(ruta):
+    """
+    Devuelve el escritor que corresponde a la extensión de ruta (.npy o .npz).
+    """
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension == ".npy":
+        return EscritorNpy(ruta)
+    if extension == ".npz":
+        return EscritorNpz(ruta)
+    raise ValueError(f"Formato de salida no soportado: {ruta}")
+
+def volcar(bloques, ruta):
+    """
+    Escribe todos los bloques de un generador (por ejemplo simular_en_bloques)
+    en ruta y devuelve la cantidad de filas escritas.
+    """
+    with escritor(ruta) as destino:
+        for bloque in bloques:
+            destino.escribir(bloque)
+    return destino.filas
+
+def leer_bloques(ruta, mmap_mode="r"):
+    """
+    Lee lo que escribió volcar: un .npy se abre mapeado en memoria y de un
+    .npz se concatenan los bloques en orden.
+    """
+    if ruta.lower().endswith(".npy"):
+        return np.load(ruta, mmap_mode=mmap_mode)
+    with np.load(ruta) as archivo:
+        nombres = sorted(n for n in archivo.files if n.startswith("bloque_"))
+        if not nombres:
+            return np.empty((0, len(COLUMNAS)))
+        return np.concatenate([archivo[n] for n in nombres])
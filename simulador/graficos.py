@@ -0,0 +1,127 @@
+import os
+from functools import lru_cache
+
+from simulador.constantes import g_max
+
+RUTA_PISTA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pista.png")
+# Rectángulo (x0, x1, y0, y1) en metros que ocupa la imagen de la pista
+EXTENSION_PISTA = (0, 100, 0, 80)
+
+# matplotlib y la imagen de la pista se cargan recién al graficar, para que
+# importar el paquete (por ejemplo desde un proceso de trabajo) cueste lo
+# mismo que importar NumPy.
+
+@lru_cache(maxsize=None)
+def cargar_imagen_pista(ruta=RUTA_PISTA):
+    import matplotlib.image as mpimg
+    return mpimg.imread(ruta)
+
+def series_paneles(trayectoria):
+    """
+    Series de los seis paneles del gráfico de la vuelta, como arreglos.
+    """
+    return {
+        "trayectoria": (trayectoria["x"], trayectoria["y"]),
+        "velocidad": (trayectoria["t"], trayectoria["v"]),
+        "aceleracion": (trayectoria["t"], trayectoria["a_t"] + trayectoria["a_c"]),
+        "acc_tangencial": (trayectoria["t"], trayectoria["a_t"]),
+        "acc_centripeta": (trayectoria["t"], trayectoria["a_c"]),
+        "fuerza": (trayectoria["t"], trayectoria["F"]),
+    }
+
+def graficar_vuelta(trayectoria, img=None, mostrar=True):
+    """
+    Dibuja los seis paneles de tp_completo.py (trayectoria sobre la pista,
+    velocidad, aceleración total, tangencial, centrípeta y fuerza).
+
+    Parámetros:
+    trayectoria: Trayectoria de la vuelta
+    img: Imagen de fondo; por defecto pista.png
+    mostrar: Llamar a plt.show() al terminar
+
+    Retorna:
+    fig: Figura de matplotlib
+    """
+    import matplotlib.pyplot as plt
+
+    if img is None:
+        img = cargar_imagen_pista()
+    series = series_paneles(trayectoria)
+    xs_total, ys_total = series["trayectoria"]
+    tiempos_total, vel_total = series["velocidad"]
+    acc_total = series["aceleracion"][1]
+    acc_tangencial_total = series["acc_tangencial"][1]
+    acc_centripeta_total = series["acc_centripeta"][1]
+    fuerzas_total = series["fuerza"][1]
+
+    # Gráficos reorganizados (2 filas × 3 columnas)
+    fig, posicion_grafico = plt.subplots(2, 3, figsize=(20, 10))
+    titulo_fontsize = 14
+    label_fontsize = 12
+    tick_fontsize = 11
+
+    # Trayectoria sobre pista
+    posicion_grafico[0, 0].imshow(img, extent=EXTENSION_PISTA, aspect='auto', zorder=0)
+    posicion_grafico[0, 0].plot(xs_total, ys_total, color='black', linewidth=2, zorder=1)
+    posicion_grafico[0, 0].set_title("Trayectoria sobre pista", fontsize=titulo_fontsize)
+    posicion_grafico[0, 0].set_xlabel("X (m)", fontsize=label_fontsize)
+    posicion_grafico[0, 0].set_ylabel("Y (m)", fontsize=label_fontsize)
+    posicion_grafico[0, 0].tick_params(labelsize=tick_fontsize)
+    posicion_grafico[0, 0].axis('equal')
+    posicion_grafico[0, 0].grid(True)
+
+    # Velocidad vs Tiempo
+    posicion_grafico[0, 1].plot(tiempos_total, vel_total, color='blue')
+    posicion_grafico[0, 1].set_title("Velocidad vs Tiempo", fontsize=titulo_fontsize)
+    posicion_grafico[0, 1].set_xlabel("Tiempo (s)", fontsize=label_fontsize)
+    posicion_grafico[0, 1].set_ylabel("Velocidad (m/s)", fontsize=label_fontsize)
+    posicion_grafico[0, 1].tick_params(labelsize=tick_fontsize)
+    posicion_grafico[0, 1].grid(True)
+
+    # Aceleración total
+    posicion_grafico[0, 2].plot(tiempos_total, acc_total, color='red', label="Aceleración")
+    posicion_grafico[0, 2].axhline(y=g_max, color='red', linestyle='--', label='Límite 6g')
+    posicion_grafico[0, 2].set_title("Aceleración total", fontsize=titulo_fontsize)
+    posicion_grafico[0, 2].set_xlabel("Tiempo (s)", fontsize=label_fontsize)
+    posicion_grafico[0, 2].set_ylabel("Aceleración (m/s²)", fontsize=label_fontsize)
+    posicion_grafico[0, 2].tick_params(labelsize=tick_fontsize)
+    posicion_grafico[0, 2].grid(True)
+    posicion_grafico[0, 2].legend(fontsize=10)
+
+    # Aceleración Tangencial
+    posicion_grafico[1, 0].plot(tiempos_total, acc_tangencial_total, color='orange', label="Tangencial")
+    posicion_grafico[1, 0].axhline(y=g_max, color='red', linestyle='--', label='Límite 6g')
+    posicion_grafico[1, 0].axhline(y=-g_max, color='red', linestyle='--')
+    posicion_grafico[1, 0].set_title("Aceleración Tangencial", fontsize=titulo_fontsize)
+    posicion_grafico[1, 0].set_xlabel("Tiempo (s)", fontsize=label_fontsize)
+    posicion_grafico[1, 0].set_ylabel(r"$a_t$ (m/s$^2$)", fontsize=label_fontsize)
+    posicion_grafico[1, 0].tick_params(labelsize=tick_fontsize)
+    posicion_grafico[1, 0].grid(True)
+    posicion_grafico[1, 0].legend(fontsize=10)
+
+    # Aceleración Centrípeta
+    posicion_grafico[1, 1].plot(tiempos_total, acc_centripeta_total, color='green', label="Centrípeta")
+    posicion_grafico[1, 1].axhline(y=g_max, color='red', linestyle='--', label='Límite 6g')
+    posicion_grafico[1, 1].set_title("Aceleración Centrípeta", fontsize=titulo_fontsize)
+    posicion_grafico[1, 1].set_xlabel("Tiempo (s)", fontsize=label_fontsize)
+    posicion_grafico[1, 1].set_ylabel(r"$a_c$ (m/s$^2$)", fontsize=label_fontsize)
+    posicion_grafico[1, 1].tick_params(labelsize=tick_fontsize)
+    posicion_grafico[1, 1].grid(True)
+    posicion_grafico[1, 1].legend(fontsize=10)
+
+    # Fuerza aplicada
+    posicion_grafico[1, 2].plot(tiempos_total, fuerzas_total, color='purple')
+    posicion_grafico[1, 2].set_title("Fuerza aplicada", fontsize=titulo_fontsize)
+    posicion_grafico[1, 2].set_xlabel("Tiempo (s)", fontsize=label_fontsize)
+    posicion_grafico[1, 2].set_ylabel("Fuerza (N)", fontsize=label_fontsize)
+    posicion_grafico[1, 2].tick_params(labelsize=tick_fontsize)
+    posicion_grafico[1, 2].grid(True)
+
+    # Ajustes finales
+    plt.tight_layout(pad=2.5)
+    plt.subplots_adjust(top=0.92, bottom=0.08, left=0.05, right=0.97, hspace=0.4, wspace=0.3)
+    fig.suptitle("Análisis de velocidad, aceleración y trayectoria", fontsize=16)
+
+    if mostrar:
+        plt.show()
+    return fig
@@ -0,0 +1,343 @@
+from typing import Callable, NamedTuple
+
+import numpy as np
+
+def euler(f, t, estado, h, *args):
+    return estado + h * f(t, estado, *args)
+
+def heun(f, t, estado, h, *args):
+    k1 = f(t, estado, *args)
+    k2 = f(t + h, estado + h*k1, *args)
+    return estado + (h/2)*(k1 + k2)
+
+def rk4(f, t, estado, h, *args):
+    k1 = f(t, estado, *args)
+    k2 = f(t + h/2, estado + h*k1/2, *args)
+    k3 = f(t + h/2, estado + h*k2/2, *args)
+    k4 = f(t + h, estado + h*k3, *args)
+    return estado + (h/6)*(k1 + 2*k2 + 2*k3 + k4)
+
+# Tabla de Butcher de Dormand-Prince 5(4)
+C_DP = np.array([0, 1/5, 3/10, 4/5, 8/9, 1, 1])
+A_DP = [
+    [],
+    [1/5],
+    [3/40, 9/40],
+    [44/45, -56/15, 32/9],
+    [19372/6561, -25360/2187, 64448/6561, -212/729],
+    [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656],
+    [35/384, 0, 500/1113, 125/192, -2187/6784, 11/84],
+]
+B_DP = np.array([35/384, 0, 500/1113, 125/192, -2187/6784, 11/84, 0])
+E_DP = B_DP - np.array([5179/57600, 0, 7571/16695, 393/640, -92097/339200, 187/2100, 1/40])
+# Salida densa de orden 4 (Shampine): coeficientes de sigma, sigma², sigma³, sigma⁴
+P_DP = np.array([
+    [1, -8048581381/2820520608, 8663915743/2820520608, -12715105075/11282082432],
+    [0, 0, 0, 0],
+    [0, 131558114200/32700410799, -68118460800/10900136933, 87487479700/32700410799],
+    [0, -1754552775/470086768, 14199869525/1410260304, -10690763975/1880347072],
+    [0, 127303824393/49829197408, -318862633887/49829197408, 701980252875/199316789632],
+    [0, -282668133/205662961, 2019193451/616988883, -1453857185/822651844],
+    [0, 40617522/29380423, -110615467/29380423, 69997945/29380423],
+])
+
+def paso_dormand_prince(f, t, estado, h, *args, k1=None):
+    """
+    Da un paso de Dormand-Prince 5(4).
+
+    Parámetros:
+    f: Función f(t, estado, *args) que devuelve la derivada del estado
+    t: Tiempo actual
+    estado: Estado actual
+    h: Tamaño del paso
+    k1: f(t, estado) ya calculada en el paso anterior (FSAL), opcional
+
+    Retorna:
+    estado_nuevo: Estado de orden 5 en t + h
+    error: Estimación del error local (diferencia entre orden 5 y 4)
+    k: Lista con las 7 etapas; k[6] es f(t + h, estado_nuevo)
+    """
+    k = [f(t, estado, *args) if k1 is None else k1]
+    for i in range(1, 7):
+        incremento = sum(a * k_j for a, k_j in zip(A_DP[i], k))
+        k.append(f(t + C_DP[i] * h, estado + h * incremento, *args))
+    estado_nuevo = estado + h * sum(b * k_i for b, k_i in zip(B_DP, k))
+    error = h * sum(e * k_i for e, k_i in zip(E_DP, k))
+    return estado_nuevo, error, k
+
+def dormand_prince(f, t, estado, h, *args):
+    # Paso fijo de orden 5, sin reusar la última etapa (7 evaluaciones)
+    return paso_dormand_prince(f, t, estado, h, *args)[0]
+
+def verlet_velocidad(f, t, estado, h, *args):
+    """
+    Paso de Verlet en velocidad (simpléctico, orden 2) para un sistema de 2do
+    orden escrito como estado = [y, u] con f = [u, a(t, y)]. La aceleración
+    no puede depender de u, como en ecuacion_curvas.
+    """
+    d = len(estado) // 2
+    y, u = estado[:d], estado[d:]
+    a0 = f(t, estado, *args)[d:]
+    y1 = y + h*u + (h*h/2)*a0
+    a1 = f(t + h, np.concatenate([y1, u]), *args)[d:]
+    return np.concatenate([y1, u + (h/2)*(a0 + a1)])
+
+class Integrador(NamedTuple):
+    paso: Callable
+    orden: int
+    # Sólo sirve para estados [y, u] de un sistema de 2do orden
+    segundo_orden: bool = False
+
+# Integradores de paso fijo con la firma paso(f, t, estado, h, *args)
+INTEGRADORES = {
+    "euler": Integrador(euler, 1),
+    "heun": Integrador(heun, 2),
+    "rk4": Integrador(rk4, 4),
+    "rk45": Integrador(dormand_prince, 5),
+    "verlet": Integrador(verlet_velocidad, 2, segundo_orden=True),
+}
+
+def _contar(f, contador):
+    def f_contada(t, estado, *args):
+        contador[0] += 1
+        return f(t, estado, *args)
+    return f_contada
+
+def integrar(nombre, f, t0, estado, tf, h, args=()):
+    """
+    Integra con paso fijo h desde t0 hasta tf (el último paso se acorta para
+    terminar justo en tf) con el integrador registrado como nombre.
+
+    Retorna:
+    t: Arreglo (n,) de tiempos
+    Y: Arreglo (n, d) de estados
+    evaluaciones: Cantidad de llamadas a f
+    """
+    paso = INTEGRADORES[nombre].paso
+    contador = [0]
+    f = _contar(f, contador)
+    n = max(int(np.ceil((tf - t0) / h - 1e-9)), 0)
+    t = np.minimum(t0 + h * np.arange(n + 1), tf)
+    Y = np.empty((n + 1, np.size(estado)))
+    Y[0] = estado
+    for i in range(n):
+        Y[i + 1] = paso(f, t[i], Y[i], t[i + 1] - t[i], *args)
+    return t, Y, contador[0]
+
+def solucion_referencia(f, t0, estado, tf, args=(), rtol=1e-12, atol=1e-14):
+    """
+    Estado en tf con Dormand-Prince adaptativo a tolerancia muy ajustada.
+    """
+    pasos = pasos_dormand_prince(f, t0, np.asarray(estado, dtype=float), (tf - t0) / 100, args, rtol, atol,
+                                 limite=lambda t, _: tf - t)
+    t, Y = t0, np.asarray(estado, dtype=float)
+    while tf - t > 1e-12 * max(1.0, abs(tf)):
+        t, Y, _, _ = next(pasos)
+    return Y
+
+def informe_integradores(f, t0, estado, tf, h, args=(), referencia=None, nombres=None):
+    """
+    Compara los integradores registrados sobre el mismo problema.
+
+    Parámetros:
+    f, t0, estado, tf, h, args: El problema y el paso fijo
+    referencia: Estado exacto en tf; si no se pasa se usa solucion_referencia
+    nombres: Integradores a comparar; por defecto todos
+
+    Retorna:
+    Lista de diccionarios con nombre, orden, pasos, evaluaciones,
+    evaluaciones_por_paso y error (máximo error absoluto en tf)
+    """
+    if referencia is None:
+        referencia = solucion_referencia(f, t0, estado, tf, args)
+    filas = []
+    for nombre in nombres or INTEGRADORES:
+        t, Y, evaluaciones = integrar(nombre, f, t0, estado, tf, h, args)
+        pasos = len(t) - 1
+        filas.append({
+            "nombre": nombre,
+            "orden": INTEGRADORES[nombre].orden,
+            "pasos": pasos,
+            "evaluaciones": evaluaciones,
+            "evaluaciones_por_paso": evaluaciones / max(pasos, 1),
+            "error": float(np.max(np.abs(Y[-1] - referencia))),
+        })
+    return filas
+
+def integrador_mas_barato(f, t0, estado, tf, tolerancia, h=None, args=(), nombres=None, max_refinamientos=16):
+    """
+    Para cada integrador busca (partiendo de h y dividiéndolo a la mitad) el
+    paso más grande cuyo error en tf es menor que tolerancia, y devuelve el
+    que lo logra con menos evaluaciones de f.
+
+    Retorna:
+    (nombre, h, evaluaciones, error), o None si ninguno llega a la tolerancia
+    """
+    h = (tf - t0) / 10 if h is None else h
+    referencia = solucion_referencia(f, t0, estado, tf, args)
+    mejor = None
+    for nombre in nombres or INTEGRADORES:
+        paso = h
+        for _ in range(max_refinamientos):
+            fila, = informe_integradores(f, t0, estado, tf, paso, args, referencia, [nombre])
+            if fila["error"] <= tolerancia:
+                if mejor is None or fila["evaluaciones"] < mejor[2]:
+                    mejor = (nombre, paso, fila["evaluaciones"], fila["error"])
+                break
+            paso /= 2
+    return mejor
+
+def norma_error(error, estado, estado_nuevo, rtol, atol):
+    escala = atol + rtol * np.maximum(np.abs(estado), np.abs(estado_nuevo))
+    return np.sqrt(np.mean((error / escala) ** 2))
+
+def interpolante_hermite(f, args, t0, y0, t1, y1):
+    """
+    Salida densa genérica de un paso: devuelve estado_en(t) para t en [t0, t1].
+    Las derivadas en los extremos se evalúan recién la primera vez que se usa.
+    """
+    derivadas = []
+
+    def estado_en(t):
+        if not derivadas:
+            derivadas.extend([f(t0, y0, *args), f(t1, y1, *args)])
+        return interpolar_hermite(t0, y0, derivadas[0], t1, y1, derivadas[1], t)
+    return estado_en
+
+def interpolante_dormand_prince(t0, y0, h, k):
+    """
+    Salida densa de orden 4 de un paso de Dormand-Prince a partir de sus etapas.
+    """
+    K = np.array(k)
+
+    def estado_en(t):
+        sigma = (t - t0) / h
+        coeficientes = P_DP @ np.array([sigma, sigma**2, sigma**3, sigma**4])
+        return y0 + h * np.tensordot(coeficientes, K, axes=1)
+    return estado_en
+
+def pasos_rk4(f, t, estado, h, args=(), estadisticas=None):
+    """
+    Generador de pasos fijos de rk4. Entrega (t, estado, h, estado_en) tras
+    cada paso, donde estado_en(t) es la salida densa del paso.
+    """
+    return pasos_fijos(rk4, f, t, estado, h, args, estadisticas)
+
+def pasos_fijos(paso, f, t, estado, h, args=(), estadisticas=None):
+    """
+    Igual que pasos_rk4 pero con cualquier paso(f, t, estado, h, *args) de
+    INTEGRADORES.
+    """
+    while True:
+        estado_nuevo = paso(f, t, estado, h, *args)
+        interpolante = interpolante_hermite(f, args, t, estado, t + h, estado_nuevo)
+        t, estado = t + h, estado_nuevo
+        if estadisticas is not None:
+            estadisticas["aceptados"] = estadisticas.get("aceptados", 0) + 1
+        yield t, estado, h, interpolante
+
+def pasos_dormand_prince(f, t, estado, h, args=(), rtol=1e-6, atol=1e-9,
+                         h_max=np.inf, limite=None, estadisticas=None):
+    """
+    Generador de pasos adaptativos de Dormand-Prince con control del error
+    local. Entrega (t, estado, h, estado_en) tras cada paso aceptado, donde
+    estado_en(t) es la salida densa de orden 4 del paso.
+
+    Parámetros:
+    f: Función f(t, estado, *args)
+    t: Tiempo inicial
+    estado: Estado inicial
+    h: Paso inicial de prueba
+    args: Argumentos extra de f
+    rtol, atol: Tolerancias relativa y absoluta
+    h_max: Paso máximo
+    limite: Función limite(t, estado) con un paso máximo que depende del
+            tiempo y del estado al comienzo del paso
+            (por ejemplo, el tiempo que falta para terminar el tramo)
+    estadisticas: Diccionario donde se acumulan pasos aceptados y rechazados
+    """
+    if estadisticas is not None:
+        estadisticas.setdefault("aceptados", 0)
+        estadisticas.setdefault("rechazados", 0)
+    k1 = f(t, estado, *args)
+
+    while True:
+        h = min(h, h_max)
+        if limite is not None:
+            h = min(h, limite(t, estado))
+
+        estado_nuevo, error, k = paso_dormand_prince(f, t, estado, h, *args, k1=k1)
+        norma = norma_error(error, estado, estado_nuevo, rtol, atol)
+
+        # Factor de seguridad 0.9 y cambios de paso acotados entre 0.2 y 5
+        factor = 5.0 if norma == 0 else min(5.0, max(0.2, 0.9 * norma ** (-1/5)))
+
+        if norma <= 1:
+            interpolante = interpolante_dormand_prince(t, estado, h, k)
+            t, estado, k1 = t + h, estado_nuevo, k[6]
+            if estadisticas is not None:
+                estadisticas["aceptados"] += 1
+            yield t, estado, h, interpolante
+        elif estadisticas is not None:
+            estadisticas["rechazados"] += 1
+
+        h = h * factor
+
+def interpolar_hermite(t0, y0, f0, t1, y1, f1, t):
+    """
+    Salida densa de un paso: interpolante cúbico de Hermite que usa los estados
+    y las derivadas en los extremos del paso.
+    """
+    h = t1 - t0
+    s = (t - t0) / h
+    h00 = 2*s**3 - 3*s**2 + 1
+    h10 = s**3 - 2*s**2 + s
+    h01 = -2*s**3 + 3*s**2
+    h11 = s**3 - s**2
+    return h00*y0 + h10*h*f0 + h01*y1 + h11*h*f1
+
+def localizar_evento(eventos, t0, y0, t1, y1, estado_en, tol=1e-12, max_iter=100):
+    """
+    Busca el primer cruce de alguno de los eventos dentro del paso [t0, t1].
+    Un evento es una función g(t, estado) que se dispara cuando pasa de ser
+    negativa a ser >= 0. La raíz se busca con regula falsi (variante Illinois)
+    sobre la salida densa estado_en(t) del paso.
+
+    Retorna:
+    (t_evento, estado_evento, indice) del evento más temprano, o None si
+    ningún evento cruzó en el paso
+    """
+    cruzados = [i for i, g in enumerate(eventos) if g(t1, y1) >= 0]
+    if not cruzados:
+        return None
+
+    mejor = None
+    for i in cruzados:
+        g = eventos[i]
+        a, b = t0, t1
+        ga, gb = g(a, y0), g(b, y1)
+        if ga >= 0:
+            # Ya estaba disparado al comienzo del paso
+            candidato = (t0, y0, i)
+        else:
+            lado = 0
+            for _ in range(max_iter):
+                c = b - gb * (b - a) / (gb - ga)
+                gc = g(c, estado_en(c))
+                if gc >= 0:
+                    b, gb = c, gc
+                    if lado == 1:
+                        ga /= 2
+                    lado = 1
+                else:
+                    a, ga = c, gc
+                    if lado == -1:
+                        gb /= 2
+                    lado = -1
+                if b - a <= tol * max(1.0, abs(t1)) or gc == 0:
+                    break
+            candidato = (b, y1 if b == t1 else estado_en(b), i)
+        if mejor is None or candidato[0] < mejor[0]:
+            mejor = candidato
+
+    return mejor
@@ -0,0 +1,398 @@
+import numpy as np
+
+from simulador.constantes import M, dt
+from simulador import analitico
+from simulador.pista import Recta, pista_por_defecto, entrada_recta
+
+# Versiones vectorizadas de rk4 / tramo_recto / tramo_curva: cada fila de
+# `estados` (N, 4) es un auto distinto con sus propios parámetros (N,).
+
+def rk4_lote(f, t, estados, h, *args):
+    k1 = f(t, estados, *args)
+    k2 = f(t + h/2, estados + h*k1/2, *args)
+    k3 = f(t + h/2, estados + h*k2/2, *args)
+    k4 = f(t + h, estados + h*k3, *args)
+    return estados + (h/6)*(k1 + 2*k2 + 2*k3 + k4)
+
+def tramo_recto_lote(t, estados, F):
+    v, theta = estados[:, 2], estados[:, 3]
+    derivadas = np.empty_like(estados)
+    derivadas[:, 0] = v * np.cos(theta)
+    derivadas[:, 1] = v * np.sin(theta)
+    derivadas[:, 2] = F / M
+    derivadas[:, 3] = 0
+    return derivadas
+
+def tramo_curva_lote(t, estados, radio):
+    v, theta = estados[:, 2], estados[:, 3]
+    derivadas = np.empty_like(estados)
+    derivadas[:, 0] = v * np.cos(theta)
+    derivadas[:, 1] = v * np.sin(theta)
+    derivadas[:, 2] = 0
+    derivadas[:, 3] = v / radio
+    return derivadas
+
+def _por_fila(valor, n):
+    return np.broadcast_to(np.asarray(valor, dtype=float), (n,))
+
+def _recortar_en_evento(f, args, t0, y0, t1, y1, g, iteraciones=45):
+    """
+    Para las filas que cruzaron el evento g(estados) en el último paso, busca
+    por bisección (vectorizada) el instante del cruce sobre el interpolante de
+    Hermite del paso y devuelve (t, estados) en ese instante.
+    """
+    h = (t1 - t0)[:, None]
+    f0 = h * f(t0, y0, *args)
+    f1 = h * f(t1, y1, *args)
+    # Coeficientes del cúbico de Hermite en s = (t - t0) / h, para usar Horner
+    c2 = 3 * (y1 - y0) - 2 * f0 - f1
+    c3 = 2 * (y0 - y1) + f0 + f1
+
+    def estado_en(s):
+        s = s[:, None]
+        return y0 + s * (f0 + s * (c2 + s * c3))
+
+    a, b = np.zeros(len(t0)), np.ones(len(t0))
+    for _ in range(iteraciones):
+        c = (a + b) / 2
+        cruzo = g(estado_en(c)) >= 0
+        b = np.where(cruzo, c, b)
+        a = np.where(cruzo, a, c)
+    return t0 + b * (t1 - t0), estado_en(b)
+
+def _integrar_en_distancia_lote(f, args, estados, t, longitud, ds):
+    """
+    Integra con rk4 en la longitud de arco (como tramos.en_distancia) todas
+    las filas con la misma cantidad de pasos, ceil(max(longitud) / ds); cada
+    fila usa su paso longitud / pasos, así que todas terminan justo en su
+    longitud y las muestras quedan alineadas entre filas.
+
+    Retorna:
+    estados, t: Salida de cada fila
+    muestras: Arreglo (pasos, N, 5) con [x, y, v, theta, t] tras cada paso
+    validos: Filas que no se detuvieron
+    """
+    pasos = int(np.ceil(np.max(longitud, initial=0) / ds - 1e-9))
+    h = (longitud / max(pasos, 1))[:, None]
+
+    def f_s(s, z, *args):
+        derivadas = np.empty_like(z)
+        derivadas[:, :4] = f(z[:, 4], z[:, :4], *args)
+        derivadas[:, 4] = 1.0
+        return derivadas / z[:, 2:3]
+
+    z = np.column_stack([estados, t])
+    validos = estados[:, 2] > 0
+    muestras = np.empty((pasos, len(z), 5))
+    for i in range(pasos):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            nuevo = rk4_lote(f_s, i * h, z, h, *args)
+        validos &= nuevo[:, 2] > 0
+        z = np.where(validos[:, None], nuevo, z)
+        muestras[i] = z
+    return z[:, :4], z[:, 4], muestras, validos
+
+def simular_tramo_recto_lote(estados_iniciales, distancia_objetivo, F, dt, t_inicial, exacto=True,
+                             metodo="analitico", ds=0.1):
+    """
+    Avanza N autos a la vez sobre un tramo recto con el mismo criterio de corte
+    que simular_tramo_recto. Con metodo="analitico" (por defecto) la salida de
+    cada fila se calcula en forma cerrada; con metodo="rk4" se integra y cada
+    fila sale del lote (máscara) al alcanzar su distancia objetivo, o se marca
+    como inválida si se detiene antes. Con exacto=True el último paso de cada
+    fila se recorta justo en el objetivo.
+
+    Parámetros:
+    estados_iniciales: Arreglo (N, 4) con [x, y, v, theta] de cada auto
+    distancia_objetivo: Distancia a recorrer, escalar o (N,)
+    F: Fuerza aplicada, escalar o (N,)
+    dt: Paso temporal
+    t_inicial: Tiempo de entrada, escalar o (N,)
+    exacto: Recortar el último paso sobre el objetivo
+    metodo: "analitico", "rk4" o "distancia" (rk4 en longitud de arco con paso ds)
+
+    Retorna:
+    estados: Arreglo (N, 4) con el estado de salida
+    t: Tiempo de salida de cada fila
+    acc_tangencial_max: Máximo |a_t| registrado por fila
+    validos: Máscara de filas que completaron el tramo
+    """
+    estados = np.array(estados_iniciales, dtype=float)
+    n = len(estados)
+    distancia_objetivo = _por_fila(distancia_objetivo, n)
+    F = _por_fila(F, n)
+    t = _por_fila(t_inicial, n).copy()
+    x0, y0 = estados[:, 0].copy(), estados[:, 1].copy()
+    acc_tangencial_max = np.zeros(n)
+    validos = estados[:, 2] > 0
+    activos = validos & (distancia_objetivo > 0)
+
+    if metodo == "analitico":
+        t_salida = analitico.tiempo_salida_recta(estados[:, 2], F, distancia_objetivo)
+        validos &= ~np.isnan(t_salida)
+        activos &= validos
+        estados[activos] = analitico.estado_recta(estados[activos], F[activos], t_salida[activos])
+        t[activos] += t_salida[activos]
+        acc_tangencial_max[activos] = np.abs(F[activos]) / M
+        return estados, t, acc_tangencial_max, validos
+
+    if metodo == "distancia":
+        longitud = np.where(activos, distancia_objetivo, 0.0)
+        salida, t_salida, muestras, ok = _integrar_en_distancia_lote(tramo_recto_lote, (F,), estados, t,
+                                                                     longitud, ds)
+        dv = np.abs(np.diff(np.concatenate([estados[None, :, 2], muestras[:, :, 2]]), axis=0))
+        paso_t = np.diff(np.concatenate([t[None], muestras[:, :, 4]]), axis=0)
+        acc = np.divide(dv, paso_t, out=np.zeros_like(dv), where=paso_t > 0)
+        acc_tangencial_max = acc.max(axis=0, initial=0)
+        return salida, t_salida, acc_tangencial_max, validos & ok
+
+    while activos.any():
+        idx = np.flatnonzero(activos)
+        anterior = estados[idx]
+        nuevo = rk4_lote(tramo_recto_lote, t[idx], anterior, dt, F[idx])
+        t_nuevo = t[idx] + dt
+
+        distancia = np.hypot(nuevo[:, 0] - x0[idx], nuevo[:, 1] - y0[idx])
+        llegaron = distancia >= distancia_objetivo[idx]
+        if exacto and llegaron.any():
+            sel = idx[llegaron]
+
+            def g(e):
+                return np.hypot(e[:, 0] - x0[sel], e[:, 1] - y0[sel]) - distancia_objetivo[sel]
+
+            t_nuevo[llegaron], nuevo[llegaron] = _recortar_en_evento(
+                tramo_recto_lote, (F[sel],), t[sel], anterior[llegaron],
+                t_nuevo[llegaron], nuevo[llegaron], g)
+
+        acc_tangencial = np.abs(nuevo[:, 2] - anterior[:, 2]) / (t_nuevo - t[idx])
+        acc_tangencial_max[idx] = np.maximum(acc_tangencial_max[idx], acc_tangencial)
+        estados[idx] = nuevo
+        t[idx] = t_nuevo
+
+        detenidos = (nuevo[:, 2] <= 0) & ~llegaron
+        validos[idx[detenidos]] = False
+        activos[idx] = ~llegaron & ~detenidos
+
+    return estados, t, acc_tangencial_max, validos
+
+def simular_tramo_curva_lote(estados_iniciales, radio, angulo_objetivo, dt, t_inicial, exacto=True,
+                             metodo="analitico", ds=0.1):
+    """
+    Avanza N autos a la vez sobre una curva de radio constante con el mismo
+    criterio de corte que simular_tramo_curva, en forma cerrada (arco a
+    velocidad constante) o integrando con rk4 según metodo.
+
+    Parámetros:
+    estados_iniciales: Arreglo (N, 4) con [x, y, v, theta] de cada auto
+    radio: Radio de la curva, escalar o (N,)
+    angulo_objetivo: Ángulo a girar, escalar o (N,)
+    dt: Paso temporal
+    t_inicial: Tiempo de entrada, escalar o (N,)
+    exacto: Recortar el último paso sobre el ángulo objetivo
+    metodo: "analitico", "rk4" o "distancia" (rk4 en longitud de arco con paso ds)
+
+    Retorna:
+    estados: Arreglo (N, 4) con el estado de salida
+    t: Tiempo de salida de cada fila
+    acc_centripeta_max: Máxima v²/r registrada por fila
+    validos: Máscara de filas que completaron el tramo
+    """
+    estados = np.array(estados_iniciales, dtype=float)
+    n = len(estados)
+    radio = _por_fila(radio, n)
+    angulo_objetivo = _por_fila(angulo_objetivo, n)
+    t = _por_fila(t_inicial, n).copy()
+    theta0 = estados[:, 3].copy()
+    acc_centripeta_max = np.zeros(n)
+    validos = estados[:, 2] > 0
+    activos = validos & (angulo_objetivo > 0)
+
+    if metodo == "analitico":
+        t_salida = analitico.tiempo_salida_curva(estados[activos, 2], radio[activos], angulo_objetivo[activos])
+        estados[activos] = analitico.estado_curva(estados[activos], radio[activos], t_salida)
+        t[activos] += t_salida
+        acc_centripeta_max[activos] = estados[activos, 2] ** 2 / radio[activos]
+        return estados, t, acc_centripeta_max, validos
+
+    if metodo == "distancia":
+        longitud = np.where(activos, radio * angulo_objetivo, 0.0)
+        salida, t_salida, muestras, ok = _integrar_en_distancia_lote(tramo_curva_lote, (radio,), estados, t,
+                                                                     longitud, ds)
+        v = np.concatenate([estados[None, :, 2], muestras[:, :, 2]])
+        acc_centripeta_max = np.where(activos, np.max(v**2, axis=0) / radio, 0.0)
+        return salida, t_salida, acc_centripeta_max, validos & ok
+
+    while activos.any():
+        idx = np.flatnonzero(activos)
+        anterior = estados[idx]
+        nuevo = rk4_lote(tramo_curva_lote, t[idx], anterior, dt, radio[idx])
+        t_nuevo = t[idx] + dt
+
+        llegaron = np.abs(nuevo[:, 3] - theta0[idx]) >= angulo_objetivo[idx]
+        if exacto and llegaron.any():
+            sel = idx[llegaron]
+
+            def g(e):
+                return np.abs(e[:, 3] - theta0[sel]) - angulo_objetivo[sel]
+
+            t_nuevo[llegaron], nuevo[llegaron] = _recortar_en_evento(
+                tramo_curva_lote, (radio[sel],), t[sel], anterior[llegaron],
+                t_nuevo[llegaron], nuevo[llegaron], g)
+
+        acc_centripeta = nuevo[:, 2] ** 2 / radio[idx]
+        acc_centripeta_max[idx] = np.maximum(acc_centripeta_max[idx], acc_centripeta)
+        estados[idx] = nuevo
+        t[idx] = t_nuevo
+        activos[idx] = ~llegaron
+
+    return estados, t, acc_centripeta_max, validos
+
+def _margen_recta(campo, entrada, salida, separacion):
+    # La recta es el segmento entre la entrada y la salida de cada fila
+    largo = np.hypot(salida[:, 0] - entrada[:, 0], salida[:, 1] - entrada[:, 1])
+    k = max(int(np.ceil(np.nanmax(largo, initial=0) / separacion)), 1) + 1
+    lam = np.linspace(0, 1, k)
+    x = entrada[:, 0, None] + lam * (salida[:, 0] - entrada[:, 0])[:, None]
+    y = entrada[:, 1, None] + lam * (salida[:, 1] - entrada[:, 1])[:, None]
+    return campo.en(x, y).min(axis=1)
+
+def _margen_curva(campo, entrada, radio, salida, separacion):
+    # Arco de circunferencia de radio dado entre el rumbo de entrada y el de salida
+    radio = _por_fila(radio, len(entrada))
+    theta0 = entrada[:, 3]
+    largo = np.abs(salida[:, 3] - theta0) * radio
+    k = max(int(np.ceil(np.nanmax(largo, initial=0) / separacion)), 1) + 1
+    theta = theta0[:, None] + np.linspace(0, 1, k) * (salida[:, 3] - theta0)[:, None]
+    x = entrada[:, 0, None] + radio[:, None] * (np.sin(theta) - np.sin(theta0)[:, None])
+    y = entrada[:, 1, None] - radio[:, None] * (np.cos(theta) - np.cos(theta0)[:, None])
+    return campo.en(x, y).min(axis=1)
+
+def _ramificar(grupo, valores):
+    """
+    Un nivel del árbol de prefijos: combina el grupo de cada fila (su prefijo
+    de parámetros ya simulado) con su valor para el próximo tramo.
+
+    Retorna:
+    grupo: Grupo nuevo de cada fila (N,), numerado desde 0
+    primero: Una fila representante de cada grupo nuevo
+    """
+    _, valor = np.unique(valores, return_inverse=True)
+    clave = grupo * (valor.max(initial=0) + 1) + valor
+    _, primero, grupo = np.unique(clave, return_index=True, return_inverse=True)
+    return grupo, primero
+
+def simular_pista_lote(pista, fuerzas=None, radios=None, v0=None, dt=dt, metodo="analitico", campo=None,
+                       separacion=0.5, ds=0.1, masa=None, compartir_prefijos=True):
+    """
+    Recorre una pista compilada para N autos a la vez. Todas las filas
+    comparten la misma geometría ya calculada; cambian las fuerzas, los radios
+    y la velocidad inicial, que se combinan con broadcasting de NumPy (se
+    puede pasar una grilla completa, por ejemplo con np.meshgrid, o arreglos
+    de igual largo). Con metodo="analitico" cada tramo se evalúa en forma
+    cerrada; con "rk4" se integra paso a paso con dt y con "distancia" en
+    longitud de arco con paso ds.
+
+    Parámetros:
+    pista: Pista compilada (ver simulador.pista)
+    fuerzas: Fuerza de cada recta (escalar o arreglo); por defecto las de la pista
+    radios: Radio de cada curva (escalar o arreglo); por defecto los de la pista
+    v0: Velocidad inicial (escalar o arreglo); por defecto la de la pista
+    campo: CampoDistancia opcional (ver simulador.mapa); si se pasa, se mide
+           la distancia al borde de la pista a lo largo de cada recorrido
+    separacion: Distancia entre los puntos de control del recorrido (m)
+    masa: Masa del auto (escalar o arreglo); por defecto M. Sólo cambia la
+          aceleración F / masa de las rectas, así que se resuelve escalando
+          las fuerzas por M / masa
+    compartir_prefijos: Simular cada tramo una sola vez por combinación
+                        distinta de parámetros hasta él (ver _ramificar); en
+                        una grilla el costo pasa de ser el producto de la
+                        cantidad de valores de cada parámetro a casi su suma
+
+    Retorna:
+    Diccionario de arreglos (N,) con el tiempo total, el estado final, los
+    picos de aceleración tangencial y centrípeta, el margen_pista (mínima
+    distancia al borde, negativa si el auto salió; NaN sin campo) y la
+    máscara de vueltas válidas, más tramos_simulados (filas de tramo que se
+    simularon en total, contando una vez cada prefijo compartido)
+    """
+    if any(r.modelo != "constante" for r in pista.rectas):
+        raise ValueError("El motor por lotes sólo admite rectas con fuerza constante")
+    fuerzas = [r.fuerza for r in pista.rectas] if fuerzas is None else list(fuerzas)
+    radios = [c.radio for c in pista.curvas] if radios is None else list(radios)
+    v0 = pista.v0 if v0 is None else v0
+    masa = M if masa is None else masa
+
+    parametros = np.broadcast_arrays(*(np.asarray(p, dtype=float) for p in (*fuerzas, *radios, v0, masa)))
+    parametros = [p.ravel() for p in parametros]
+    radios = iter(parametros[len(fuerzas):-2])
+    v0, masa = parametros[-2], parametros[-1]
+    fuerzas = iter([F * (M / masa) for F in parametros[:len(fuerzas)]])
+    n = len(v0)
+
+    # Árbol de prefijos: las filas con los mismos parámetros hasta un tramo
+    # llegan a él con el mismo estado, así que cada tramo se simula una vez por
+    # prefijo distinto (grupo) y al final se reparte a las filas
+    if compartir_prefijos:
+        grupo, primero = _ramificar(np.zeros(n, dtype=np.int64), v0)
+    else:
+        grupo, primero = np.arange(n), np.arange(n)
+    g = len(primero)
+    estados = np.empty((g, 4))
+    estados[:, 0], estados[:, 1] = pista.inicio
+    estados[:, 2] = v0[primero]
+    estados[:, 3] = pista.rumbo_inicial
+    t = np.zeros(g)
+    acc_tangencial_max = np.zeros(g)
+    acc_centripeta_max = np.zeros(g)
+    validos = np.ones(g, dtype=bool)
+    margen_pista = np.full(g, np.inf if campo is not None else np.nan)
+    simulados = 0
+
+    for tramo in pista.tramos:
+        parametro = next(fuerzas) if isinstance(tramo, Recta) else next(radios)
+        # Cuando ya todas las filas son distintas no queda nada que compartir
+        if len(primero) < n:
+            anterior = grupo
+            grupo, primero = _ramificar(grupo, parametro)
+            padre = anterior[primero]
+            estados, t, validos = estados[padre], t[padre], validos[padre]
+            acc_tangencial_max, acc_centripeta_max = acc_tangencial_max[padre], acc_centripeta_max[padre]
+            margen_pista = margen_pista[padre]
+        parametro = parametro[primero]
+        simulados += len(primero)
+
+        entrada = estados
+        if isinstance(tramo, Recta):
+            estados[:, 3], distancia = entrada_recta(tramo, estados[:, 0], estados[:, 1], estados[:, 3])
+            estados, t, acc, ok = simular_tramo_recto_lote(estados, distancia, parametro, dt, t,
+                                                            metodo=metodo, ds=ds)
+            acc_tangencial_max = np.maximum(acc_tangencial_max, acc)
+            if campo is not None:
+                margen = _margen_recta(campo, entrada, estados, separacion)
+        else:
+            estados, t, acc, ok = simular_tramo_curva_lote(estados, parametro, tramo.angulo, dt, t,
+                                                            metodo=metodo, ds=ds)
+            acc_centripeta_max = np.maximum(acc_centripeta_max, acc)
+            if campo is not None:
+                margen = _margen_curva(campo, entrada, parametro, estados, separacion)
+        if campo is not None:
+            margen_pista = np.fmin(margen_pista, margen)
+        validos &= ok
+
+    return {
+        "t_total": t[grupo],
+        "estado_final": estados[grupo],
+        "acc_tangencial_max": acc_tangencial_max[grupo],
+        "acc_centripeta_max": acc_centripeta_max[grupo],
+        "margen_pista": margen_pista[grupo],
+        "valido": validos[grupo],
+        "tramos_simulados": simulados,
+    }
+
+def simular_vuelta_lote(f1, f2, f3, r1, r2, v0=50.0, dt=dt, metodo="analitico"):
+    """
+    Simula la vuelta de tp_completo.py (recta - curva - recta - curva - recta
+    final) para todas las combinaciones de parámetros a la vez. Devuelve lo
+    mismo que simular_pista_lote.
+    """
+    return simular_pista_lote(pista_por_defecto(), (f1, f2, f3), (r1, r2), v0, dt, metodo)
@@ -0,0 +1,414 @@
+import hashlib
+import os
+from typing import NamedTuple
+
+import numpy as np
+
+from simulador.cache import _escribir_atomico
+from simulador.graficos import RUTA_PISTA, EXTENSION_PISTA, cargar_imagen_pista
+from simulador.pista import Malla
+
+DIRECTORIO_CACHE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache")
+
+# Preprocesamiento de pista.png: la imagen tiene los dos bordes de la pista en
+# negro, la largada en verde y la llegada en rojo. De ahí se obtienen la
+# máscara de la pista, la línea central como spline parametrizada por longitud
+# de arco y sus tablas de rumbo y curvatura. Todo se guarda en DIRECTORIO_CACHE
+# con el hash de la imagen en el nombre, así que sólo se recalcula (y sólo se
+# necesita matplotlib para leer el PNG) cuando cambia la imagen.
+#
+# Las coordenadas son las de graficar_vuelta: la imagen ocupa EXTENSION_PISTA
+# (x de 0 a 100 m, y de 0 a 80 m), con píxeles que no son cuadrados.
+
+def hash_imagen(ruta=RUTA_PISTA):
+    with open(ruta, "rb") as archivo:
+        return hashlib.sha1(archivo.read()).hexdigest()
+
+def espaciado_pixeles(forma, extension=EXTENSION_PISTA):
+    """
+    Tamaño de un píxel en metros: (alto, ancho).
+    """
+    x0, x1, y0, y1 = extension
+    return (y1 - y0) / forma[0], (x1 - x0) / forma[1]
+
+def pixeles_a_metros(filas, columnas, forma, extension=EXTENSION_PISTA):
+    alto, ancho = espaciado_pixeles(forma, extension)
+    return extension[0] + (np.asarray(columnas) + 0.5) * ancho, extension[3] - (np.asarray(filas) + 0.5) * alto
+
+def metros_a_pixeles(x, y, forma, extension=EXTENSION_PISTA):
+    """
+    Fila y columna (continuas) de cada punto; el centro del píxel (i, j) es (i, j).
+    """
+    alto, ancho = espaciado_pixeles(forma, extension)
+    return (extension[3] - np.asarray(y)) / alto - 0.5, (np.asarray(x) - extension[0]) / ancho - 0.5
+
+# --- Componentes conexas por corridas horizontales ---
+
+def etiquetar(mascara, conectividad=4):
+    """
+    Etiqueta las componentes conexas de una máscara 2D. Trabaja sobre las
+    corridas de píxeles de cada fila (pocas por fila) y las une con las
+    corridas que se tocan en la fila siguiente.
+
+    Retorna:
+    etiquetas: Arreglo de enteros, 0 fuera de la máscara y 1..n en cada componente
+    n: Cantidad de componentes
+    """
+    alto = mascara.shape[0]
+    borde = np.diff(np.pad(mascara, ((0, 0), (1, 1))).astype(np.int8), axis=1)
+    filas, inicios = np.nonzero(borde == 1)
+    fines = np.nonzero(borde == -1)[1]
+    primera = np.searchsorted(filas, np.arange(alto + 1)).tolist()
+    inicios_l, fines_l = inicios.tolist(), fines.tolist()
+    extra = 1 if conectividad == 8 else 0
+
+    padre = list(range(len(filas)))
+
+    def raiz(i):
+        while padre[i] != i:
+            padre[i] = padre[padre[i]]
+            i = padre[i]
+        return i
+
+    for fila in range(alto - 1):
+        a, fin_a = primera[fila], primera[fila + 1]
+        b, fin_b = primera[fila + 1], primera[fila + 2]
+        while a < fin_a and b < fin_b:
+            if inicios_l[a] < fines_l[b] + extra and inicios_l[b] < fines_l[a] + extra:
+                ra, rb = raiz(a), raiz(b)
+                if ra != rb:
+                    padre[rb] = ra
+            if fines_l[a] < fines_l[b]:
+                a += 1
+            else:
+                b += 1
+
+    raices = np.array([raiz(i) for i in range(len(filas))], dtype=np.int64)
+    _, componente = np.unique(raices, return_inverse=True)
+    etiquetas = np.zeros(mascara.shape, dtype=np.int32)
+    for fila, inicio, fin, c in zip(filas.tolist(), inicios_l, fines_l, (componente + 1).tolist()):
+        etiquetas[fila, inicio:fin] = c
+    return etiquetas, int(componente.max() + 1) if len(filas) else 0
+
+# --- Transformada de distancia euclídea exacta (Felzenszwalb-Huttenlocher) ---
+
+_LEJOS = 1e30
+
+def _distancia_1d(f, espaciado):
+    """
+    Para cada fila de f (costos al cuadrado) calcula min_p f[p] + (espaciado (q - p))²
+    con la envolvente inferior de parábolas, avanzando todas las filas a la vez.
+    """
+    filas, n = f.shape
+    indice = np.arange(filas)
+    posiciones = espaciado * np.arange(n)
+    clave = f + posiciones**2
+    k = np.zeros(filas, dtype=np.int64)
+    v = np.zeros((filas, n), dtype=np.int64)
+    z = np.full((filas, n + 1), np.inf)
+    z[:, 0] = -np.inf
+
+    for q in range(1, n):
+        while True:
+            vk = v[indice, k]
+            s = (clave[:, q] - clave[indice, vk]) / (2 * (posiciones[q] - posiciones[vk]))
+            quitar = s <= z[indice, k]
+            if not quitar.any():
+                break
+            k[quitar] -= 1
+        k += 1
+        v[indice, k] = q
+        z[indice, k] = s
+        z[indice, k + 1] = np.inf
+
+    d = np.empty_like(f)
+    k[:] = 0
+    for q in range(n):
+        while True:
+            avanzar = z[indice, k + 1] < posiciones[q]
+            if not avanzar.any():
+                break
+            k[avanzar] += 1
+        vk = v[indice, k]
+        d[:, q] = (posiciones[q] - posiciones[vk])**2 + f[indice, vk]
+    return d
+
+def distancia_euclidea(caracteristicas, espaciado=(1.0, 1.0)):
+    """
+    Distancia euclídea exacta de cada píxel al píxel True más cercano, con
+    píxeles de espaciado (alto, ancho). Es separable: una pasada por columnas
+    y otra por filas, cada una O(n) por línea.
+    """
+    f = np.where(caracteristicas, 0.0, _LEJOS)
+    f = _distancia_1d(f.T, espaciado[0]).T
+    f = _distancia_1d(f, espaciado[1])
+    return np.sqrt(np.minimum(f, _LEJOS))
+
+def _dilatar(mascara, radio=1):
+    resultado = mascara.copy()
+    for _ in range(radio):
+        previo = resultado.copy()
+        resultado[1:] |= previo[:-1]
+        resultado[:-1] |= previo[1:]
+        resultado[:, 1:] |= previo[:, :-1]
+        resultado[:, :-1] |= previo[:, 1:]
+    return resultado
+
+class Segmentacion(NamedTuple):
+    pista: np.ndarray
+    borde_a: np.ndarray
+    borde_b: np.ndarray
+    largada: np.ndarray
+    llegada: np.ndarray
+
+def segmentar_pista(img):
+    """
+    Separa la imagen en la superficie de la pista (la componente cerrada más
+    grande entre los bordes negros y las líneas de largada y llegada), los dos
+    bordes y las dos líneas.
+    """
+    rgb = np.asarray(img, dtype=float)[..., :3]
+    if rgb.max() > 1:
+        rgb = rgb / 255
+    gris = rgb.mean(axis=2)
+    saturacion = rgb.max(axis=2) - rgb.min(axis=2)
+    coloreado = saturacion > 0.15
+    oscuro = (gris < 0.75) & ~coloreado
+
+    libres, n = etiquetar(~(oscuro | coloreado), conectividad=4)
+    tocan_borde = np.unique(np.concatenate([libres[0], libres[-1], libres[:, 0], libres[:, -1]]))
+    areas = np.bincount(libres.ravel(), minlength=n + 1)
+    areas[0] = 0
+    areas[tocan_borde] = 0
+    if not areas.any():
+        raise ValueError("No se encontró una región cerrada de pista en la imagen")
+    pista = libres == np.argmax(areas)
+
+    bordes, n = etiquetar(oscuro, conectividad=8)
+    if n < 2:
+        raise ValueError("No se encontraron los dos bordes de la pista")
+    areas = np.bincount(bordes.ravel(), minlength=n + 1)
+    areas[0] = 0
+    a, b = np.argsort(areas)[-2:]
+
+    cerca = _dilatar(pista, 3)
+    r, g, bl = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    largada = cerca & (g > r + 0.2) & (g > bl + 0.2)
+    llegada = cerca & (r > g + 0.2) & (r > bl + 0.2)
+    if not largada.any() or not llegada.any():
+        raise ValueError("No se encontraron las líneas de largada (verde) y llegada (roja)")
+    return Segmentacion(pista, bordes == a, bordes == b, largada, llegada)
+
+# --- Línea central ---
+
+def _ordenar_puntos(puntos, inicio, radio):
+    """
+    Recorre una nube de puntos angosta desde inicio: en cada paso toma los
+    puntos sin visitar a menos de radio, registra su centroide y salta al más
+    lejano. Devuelve los centroides en orden.
+    """
+    visitado = np.zeros(len(puntos), dtype=bool)
+    actual = puntos[np.argmin(np.hypot(*(puntos - inicio).T))]
+    camino = []
+    while True:
+        distancia = np.hypot(*(puntos - actual).T)
+        cerca = (distancia <= radio) & ~visitado
+        if not cerca.any():
+            break
+        visitado |= cerca
+        camino.append(puntos[cerca].mean(axis=0))
+        candidatos = np.nonzero(cerca)[0]
+        actual = puntos[candidatos[np.argmax(distancia[candidatos])]]
+    return np.array(camino)
+
+def _base_bspline(u, nodo, n_segmentos, derivada=0):
+    """
+    Matriz de la B-spline cúbica uniforme (o de su derivada) evaluada en u,
+    con separación nodo entre nudos.
+    """
+    segmento = np.clip(np.floor(u / nodo).astype(int), 0, n_segmentos - 1)
+    t = u / nodo - segmento
+    if derivada == 0:
+        pesos = [(1 - t)**3 / 6, (3*t**3 - 6*t**2 + 4) / 6, (-3*t**3 + 3*t**2 + 3*t + 1) / 6, t**3 / 6]
+    elif derivada == 1:
+        pesos = [-(1 - t)**2 / 2, 1.5*t**2 - 2*t, -1.5*t**2 + t + 0.5, t**2 / 2]
+        pesos = [p / nodo for p in pesos]
+    else:
+        pesos = [1 - t, 3*t - 2, 1 - 3*t, t]
+        pesos = [p / nodo**2 for p in pesos]
+    base = np.zeros((len(u), n_segmentos + 3))
+    filas = np.arange(len(u))
+    for j, peso in enumerate(pesos):
+        base[filas, segmento + j] = peso
+    return base
+
+class LineaCentral(NamedTuple):
+    """
+    Tablas de la línea central muestreadas cada ds metros de longitud de arco
+    desde la largada. Las consultas por s son O(1): índice directo más
+    interpolación lineal.
+    """
+    ds: float
+    s: np.ndarray
+    x: np.ndarray
+    y: np.ndarray
+    rumbo: np.ndarray
+    curvatura: np.ndarray
+
+    @property
+    def longitud(self):
+        return self.s[-1]
+
+    def _interpolar(self, tabla, s):
+        u = np.clip(np.asarray(s, dtype=float) / self.ds, 0, len(self.s) - 1)
+        i = np.minimum(u.astype(int), len(self.s) - 2)
+        w = u - i
+        return tabla[i] * (1 - w) + tabla[i + 1] * w
+
+    def curvatura_en(self, s):
+        return self._interpolar(self.curvatura, s)
+
+    def rumbo_en(self, s):
+        return self._interpolar(self.rumbo, s)
+
+    def posicion_en(self, s):
+        return self._interpolar(self.x, s), self._interpolar(self.y, s)
+
+def malla_linea_central(linea, curvatura_recta=0.02):
+    """
+    Malla (como la de pista.discretizar_pista) sobre la línea central de la
+    imagen: un nodo por muestra de la tabla y la curvatura absoluta media de
+    cada intervalo. Los intervalos con curvatura menor que curvatura_recta
+    (1/m) cuentan como recta; tramo numera las corridas de rectas y curvas.
+    """
+    curvatura = np.abs(linea.curvatura)
+    curvatura = (curvatura[:-1] + curvatura[1:]) / 2
+    recta = curvatura < curvatura_recta
+    tramo = np.concatenate(([0], np.cumsum(recta[1:] != recta[:-1])))
+    return Malla(linea.s, linea.x, linea.y, linea.rumbo, np.where(recta, 0.0, curvatura), tramo)
+
+def ajustar_linea_central(puntos, ds=0.1, suavizado=2.0, penalizacion=10.0):
+    """
+    Ajusta por cuadrados mínimos una B-spline cúbica uniforme (nudos cada
+    suavizado metros de cuerda) a puntos ordenados, la reparametriza por
+    longitud de arco y la muestrea cada ds. La penalización de las segundas
+    diferencias de los puntos de control (P-spline) evita que el ruido de
+    los píxeles y los extremos libres aparezcan como picos de curvatura.
+    """
+    cuerda = np.concatenate(([0.0], np.cumsum(np.hypot(*np.diff(puntos, axis=0).T))))
+    n_segmentos = max(int(np.ceil(cuerda[-1] / suavizado)), 1)
+    nodo = cuerda[-1] / n_segmentos
+    base = _base_bspline(cuerda, nodo, n_segmentos)
+    diferencias = np.diff(np.eye(n_segmentos + 3), 2, axis=0)
+    control = np.linalg.solve(base.T @ base + penalizacion * diferencias.T @ diferencias, base.T @ puntos)
+
+    # Longitud de arco real integrando |r'(u)| sobre una grilla fina de u
+    u_fino = np.linspace(0, cuerda[-1], 20 * len(puntos))
+    rapidez = np.hypot(*(_base_bspline(u_fino, nodo, n_segmentos, 1) @ control).T)
+    arco = np.concatenate(([0.0], np.cumsum((rapidez[1:] + rapidez[:-1]) / 2 * np.diff(u_fino))))
+
+    s = np.arange(0, arco[-1], ds)
+    u = np.interp(s, arco, u_fino)
+    posicion = _base_bspline(u, nodo, n_segmentos) @ control
+    d1 = _base_bspline(u, nodo, n_segmentos, 1) @ control
+    d2 = _base_bspline(u, nodo, n_segmentos, 2) @ control
+    rumbo = np.unwrap(np.arctan2(d1[:, 1], d1[:, 0]))
+    curvatura = (d1[:, 0] * d2[:, 1] - d1[:, 1] * d2[:, 0]) / np.hypot(d1[:, 0], d1[:, 1])**3
+    return LineaCentral(ds, s, posicion[:, 0], posicion[:, 1], rumbo, curvatura)
+
+def extraer_linea_central(img, ds=0.1, suavizado=2.0, penalizacion=10.0, extension=EXTENSION_PISTA):
+    """
+    Línea central de la pista de la imagen: los puntos equidistantes de los
+    dos bordes, ordenados desde la largada y ajustados con una spline.
+    """
+    segmentacion = segmentar_pista(img)
+    forma = segmentacion.pista.shape
+    espaciado = espaciado_pixeles(forma, extension)
+    d_a = distancia_euclidea(segmentacion.borde_a, espaciado)
+    d_b = distancia_euclidea(segmentacion.borde_b, espaciado)
+    medio = segmentacion.pista & (np.abs(d_a - d_b) <= 1.5 * max(espaciado))
+
+    puntos = np.column_stack(pixeles_a_metros(*np.nonzero(medio), forma, extension))
+    largada = np.column_stack(pixeles_a_metros(*np.nonzero(segmentacion.largada), forma, extension))
+    ordenados = _ordenar_puntos(puntos, largada.mean(axis=0), 3 * max(espaciado))
+    return ajustar_linea_central(ordenados, ds, suavizado, penalizacion)
+
+def linea_central(ruta=RUTA_PISTA, ds=0.1, suavizado=2.0, penalizacion=10.0, directorio=DIRECTORIO_CACHE):
+    """
+    Línea central de la pista de ruta, leída del caché si ya se calculó para
+    esta imagen y estos parámetros (directorio=None no usa caché).
+    """
+    nombre = f"linea_central_{hash_imagen(ruta)[:16]}_{ds:g}_{suavizado:g}_{penalizacion:g}.npz"
+    archivo = os.path.join(directorio, nombre) if directorio is not None else None
+    if archivo is not None and os.path.exists(archivo):
+        with np.load(archivo) as datos:
+            return LineaCentral(float(datos["ds"]), *(datos[c] for c in LineaCentral._fields[1:]))
+
+    linea = extraer_linea_central(cargar_imagen_pista(ruta), ds, suavizado, penalizacion)
+    if archivo is not None:
+        os.makedirs(directorio, exist_ok=True)
+        _escribir_atomico(archivo, lambda temporal: np.savez(temporal, **linea._asdict()))
+    return linea
+
+# --- Campo de distancia con signo ---
+
+class CampoDistancia(NamedTuple):
+    """
+    Distancia con signo al borde de la pista en cada píxel (m): positiva
+    sobre la pista y negativa fuera.
+    """
+    valores: np.ndarray
+    extension: tuple = EXTENSION_PISTA
+
+    def en(self, x, y):
+        """
+        Distancia al borde en los puntos (x, y), con interpolación bilineal;
+        acepta arreglos de cualquier forma. Fuera de la imagen es -inf.
+        """
+        alto, ancho = self.valores.shape
+        fila, columna = metros_a_pixeles(x, y, self.valores.shape, self.extension)
+        dentro = (fila >= 0) & (fila <= alto - 1) & (columna >= 0) & (columna <= ancho - 1)
+        fila = np.clip(fila, 0, alto - 1)
+        columna = np.clip(columna, 0, ancho - 1)
+        i = np.minimum(fila.astype(int), alto - 2)
+        j = np.minimum(columna.astype(int), ancho - 2)
+        wi, wj = fila - i, columna - j
+        v = self.valores
+        valor = ((v[i, j] * (1 - wj) + v[i, j + 1] * wj) * (1 - wi)
+                 + (v[i + 1, j] * (1 - wj) + v[i + 1, j + 1] * wj) * wi)
+        return np.where(dentro, valor, -np.inf)
+
+    def sobre_pista(self, x, y, margen=0.0):
+        return self.en(x, y) >= margen
+
+def calcular_campo_distancia(img, extension=EXTENSION_PISTA):
+    """
+    La distancia se mide a los bordes negros: las líneas de largada y
+    llegada cuentan como pista, para que un recorrido que empieza y termina
+    sobre ellas no aparezca pegado al borde.
+    """
+    segmentacion = segmentar_pista(img)
+    bordes = segmentacion.borde_a | segmentacion.borde_b
+    lineas = _dilatar(segmentacion.largada | segmentacion.llegada, 2)
+    superficie = (segmentacion.pista | lineas) & ~bordes
+    espaciado = espaciado_pixeles(bordes.shape, extension)
+    # El borde está a medio píxel del centro de los píxeles negros
+    distancia = distancia_euclidea(bordes, espaciado) - min(espaciado) / 2
+    return CampoDistancia(np.where(superficie, distancia, -distancia).astype(np.float32), extension)
+
+def campo_distancia(ruta=RUTA_PISTA, directorio=DIRECTORIO_CACHE):
+    """
+    Campo de distancia con signo de la pista de ruta, guardado como .npy con
+    el hash de la imagen en el nombre y abierto mapeado en memoria (los
+    procesos de un barrido lo comparten sin copiarlo).
+    """
+    archivo = (os.path.join(directorio, f"distancia_{hash_imagen(ruta)[:16]}.npy")
+               if directorio is not None else None)
+    if archivo is not None and os.path.exists(archivo):
+        return CampoDistancia(np.load(archivo, mmap_mode="r"))
+
+    campo = calcular_campo_distancia(cargar_imagen_pista(ruta))
+    if archivo is not None:
+        os.makedirs(directorio, exist_ok=True)
+        _escribir_atomico(archivo, lambda temporal: np.save(temporal, campo.valores))
+    return campo
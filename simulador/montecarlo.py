@@ -0,0 +1,199 @@
+import argparse
+
+import numpy as np
+
+from simulador.constantes import M, F_max, dt, g_max
+from simulador.lote import simular_pista_lote
+from simulador.pista import cargar_pista, leer_fuerza, pista_por_defecto
+
+# Análisis de robustez por Monte Carlo: la masa, la velocidad de entrada, los
+# radios y las fuerzas de cada vuelta se muestrean de distribuciones dadas y
+# las vueltas se simulan por bloques con el motor por lotes. De cada bloque se
+# conservan sólo los acumulados (conteos, sumas y un resumen de cuantiles de
+# tamaño fijo), así que la memoria no depende de la cantidad de vueltas.
+
+def leer_distribucion(texto):
+    """
+    Convierte una especificación en una función muestra(rng, n):
+    "normal:media:desvio", "uniforme:min:max", "triangular:min:moda:max" o
+    un valor fijo ("50", "F_max").
+    """
+    nombre, _, resto = texto.partition(":")
+    if not resto:
+        valor = leer_fuerza(nombre)
+        return lambda rng, n: np.full(n, valor)
+    parametros = [float(p) for p in resto.split(":")]
+    if nombre == "normal":
+        media, desvio = parametros
+        return lambda rng, n: rng.normal(media, desvio, n)
+    if nombre == "uniforme":
+        minimo, maximo = parametros
+        return lambda rng, n: rng.uniform(minimo, maximo, n)
+    if nombre == "triangular":
+        minimo, moda, maximo = parametros
+        return lambda rng, n: rng.triangular(minimo, moda, maximo, n)
+    raise ValueError(f"Distribución desconocida: {texto}")
+
+def _distribucion(valor):
+    # Acepta una función muestra(rng, n), un texto de leer_distribucion o un número fijo
+    if callable(valor):
+        return valor
+    if isinstance(valor, str):
+        return leer_distribucion(valor)
+    return lambda rng, n: np.full(n, float(valor))
+
+class CuantilesFlujo:
+    """
+    Resumen de cuantiles de tamaño acotado para datos que llegan por bloques
+    (un t-digest simplificado). Guarda centroides (valor medio, peso) en orden;
+    al agregar un bloque se reagrupan de modo que cada centroide abarque a lo
+    sumo 1 / compresion de la escala k(q) = asin(2q - 1) / pi + 1/2, que es
+    más fina en las colas: los percentiles extremos salen casi exactos.
+    """
+
+    def __init__(self, compresion=500):
+        self.compresion = compresion
+        self.n = 0
+        self.minimo = np.inf
+        self.maximo = -np.inf
+        self._suma = 0.0
+        self._suma_cuadrados = 0.0
+        self._valores = np.empty(0)
+        self._pesos = np.empty(0)
+
+    def agregar(self, valores):
+        valores = np.asarray(valores, dtype=float).ravel()
+        valores = valores[np.isfinite(valores)]
+        if not len(valores):
+            return
+        self.n += len(valores)
+        self.minimo = min(self.minimo, valores.min())
+        self.maximo = max(self.maximo, valores.max())
+        self._suma += valores.sum()
+        self._suma_cuadrados += np.dot(valores, valores)
+
+        todos = np.concatenate([self._valores, valores])
+        pesos = np.concatenate([self._pesos, np.ones(len(valores))])
+        orden = np.argsort(todos, kind="stable")
+        todos, pesos = todos[orden], pesos[orden]
+        q = (np.cumsum(pesos) - pesos / 2) / self.n
+        grupo = np.floor(self.compresion * (np.arcsin(2 * q - 1) / np.pi + 0.5))
+        _, grupo = np.unique(grupo, return_inverse=True)
+        self._pesos = np.bincount(grupo, pesos)
+        self._valores = np.bincount(grupo, pesos * todos) / self._pesos
+
+    @property
+    def media(self):
+        return self._suma / self.n if self.n else np.nan
+
+    @property
+    def desvio(self):
+        if self.n < 2:
+            return np.nan
+        return np.sqrt(max(self._suma_cuadrados - self.n * self.media**2, 0.0) / (self.n - 1))
+
+    def cuantil(self, q):
+        """
+        Cuantil(es) q en [0, 1], interpolando entre los centros de los centroides.
+        """
+        if not self.n:
+            return np.full(np.shape(q), np.nan)
+        posiciones = np.concatenate(([0.0], (np.cumsum(self._pesos) - self._pesos / 2) / self.n, [1.0]))
+        valores = np.concatenate(([self.minimo], self._valores, [self.maximo]))
+        return np.interp(q, posiciones, valores)
+
+def monte_carlo(pista=None, n=100_000, masa=M, v0=None, radios=None, fuerzas=None, ruido_fuerza=0.0,
+                bloque=10_000, metodo="analitico", dt=dt, semilla=None, compresion=500):
+    """
+    Simula n vueltas con entradas perturbadas y resume la distribución del
+    tiempo de vuelta y la probabilidad de superar 6g.
+
+    Parámetros:
+    pista: Pista compilada; por defecto la de tp_completo.py
+    n: Cantidad de vueltas
+    masa, v0: Distribución de la masa y de la velocidad inicial (ver
+              leer_distribucion; también una función muestra(rng, n) o un
+              número fijo). v0 por defecto es la de la pista
+    radios: Distribución del radio de cada curva (lista); por defecto fijos
+    fuerzas: Distribución de la fuerza de cada recta (lista); por defecto fijas
+    ruido_fuerza: Desvío relativo del error de ejecución de cada fuerza: se
+                  aplica F * (1 + ruido_fuerza * z), acotado a ±F_max
+    bloque: Vueltas simuladas a la vez
+    metodo, dt: Los de simular_pista_lote
+    semilla: Semilla del generador, para repetir la corrida
+    compresion: Tamaño del resumen de cuantiles (ver CuantilesFlujo)
+
+    Retorna:
+    Diccionario con n, validas (vueltas que completaron la pista),
+    prob_6g_curva (alguna curva supera 6g), prob_6g_recta, prob_6g (alguna
+    de las dos) y tiempos (CuantilesFlujo con el tiempo de las vueltas válidas)
+    """
+    pista = pista_por_defecto() if pista is None else pista
+    rng = np.random.default_rng(semilla)
+    masa = _distribucion(masa)
+    v0 = _distribucion(pista.v0 if v0 is None else v0)
+    radios = [_distribucion(c.radio if radios is None else radios[i]) for i, c in enumerate(pista.curvas)]
+    fuerzas = [_distribucion(r.fuerza if fuerzas is None else fuerzas[i]) for i, r in enumerate(pista.rectas)]
+
+    tiempos = CuantilesFlujo(compresion)
+    validas = excede_curva = excede_recta = excede = 0
+    tolerancia = 1e-9 * g_max
+    for inicio in range(0, n, bloque):
+        k = min(bloque, n - inicio)
+        muestra_fuerzas = [f(rng, k) for f in fuerzas]
+        if ruido_fuerza:
+            muestra_fuerzas = [np.clip(F * (1 + ruido_fuerza * rng.standard_normal(k)), -F_max, F_max)
+                               for F in muestra_fuerzas]
+        resultado = simular_pista_lote(pista, muestra_fuerzas, [r(rng, k) for r in radios], v0(rng, k), dt,
+                                       metodo, masa=masa(rng, k))
+        curva = resultado["acc_centripeta_max"] > g_max + tolerancia
+        recta = resultado["acc_tangencial_max"] > g_max + tolerancia
+        validas += int(resultado["valido"].sum())
+        excede_curva += int(curva.sum())
+        excede_recta += int(recta.sum())
+        excede += int((curva | recta).sum())
+        tiempos.agregar(resultado["t_total"][resultado["valido"]])
+
+    return {
+        "n": n,
+        "validas": validas,
+        "prob_6g_curva": excede_curva / n,
+        "prob_6g_recta": excede_recta / n,
+        "prob_6g": excede / n,
+        "tiempos": tiempos,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Robustez de la vuelta por Monte Carlo")
+    parser.add_argument("--pista", help="Archivo de pista (.json/.toml); por defecto tp_completo")
+    parser.add_argument("-n", type=int, default=100_000, help="Cantidad de vueltas")
+    parser.add_argument("--masa", default=str(M), help="Distribución: 'normal:m:s', 'uniforme:a:b', "
+                                                       "'triangular:a:moda:b' o un valor fijo")
+    parser.add_argument("--v0")
+    for nombre in ("f1", "f2", "f3", "r1", "r2"):
+        parser.add_argument(f"--{nombre}")
+    parser.add_argument("--ruido-fuerza", type=float, default=0.0, help="Desvío relativo de cada fuerza")
+    parser.add_argument("--metodo", default="analitico", choices=("analitico", "rk4", "distancia"))
+    parser.add_argument("--dt", type=float, default=dt)
+    parser.add_argument("--bloque", type=int, default=10_000)
+    parser.add_argument("--semilla", type=int)
+    args = parser.parse_args(argv)
+
+    pista = cargar_pista(args.pista) if args.pista else pista_por_defecto()
+    fuerzas = [getattr(args, f"f{i + 1}", None) or r.fuerza for i, r in enumerate(pista.rectas)]
+    radios = [getattr(args, f"r{i + 1}", None) or c.radio for i, c in enumerate(pista.curvas)]
+    resultado = monte_carlo(pista, args.n, args.masa, args.v0, radios, fuerzas, args.ruido_fuerza, args.bloque,
+                            args.metodo, args.dt, args.semilla)
+
+    tiempos = resultado["tiempos"]
+    print(f"{resultado['n']} vueltas, {resultado['validas']} completaron la pista")
+    print(f"Tiempo de vuelta: media {tiempos.media:.4f} s, desvío {tiempos.desvio:.4f} s, "
+          f"mín {tiempos.minimo:.4f} s, máx {tiempos.maximo:.4f} s")
+    percentiles = (1, 5, 25, 50, 75, 95, 99)
+    print("Percentiles: " + ", ".join(f"p{p} = {t:.4f}"
+                                      for p, t in zip(percentiles, tiempos.cuantil(np.array(percentiles) / 100))))
+    print(f"P(> 6g en alguna curva) = {resultado['prob_6g_curva']:.4f}, "
+          f"P(> 6g en alguna recta) = {resultado['prob_6g_recta']:.4f}, P(> 6g) = {resultado['prob_6g']:.4f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import numpy as np
+
+from simulador.constantes import M, dt, g_max, F_max
+from simulador.tramos import simular_tramo_recto, simular_tramo_curva, tramo_recto
+from simulador.pista import Recta, Curva, pista_por_defecto, entrada_recta
+from simulador.vuelta import MODELOS
+
+def _velocidad_salida(estado, distancia, F, dt, dinamica):
+    try:
+        estado_salida = simular_tramo_recto(estado, distancia, F, dt, 0.0, dinamica=dinamica)[0]
+    except ValueError:
+        # Frenó tanto que se detuvo: para la curva siguiente cuenta como v = 0
+        return 0.0
+    return estado_salida[2]
+
+def fuerza_maxima_para_curva(estado, distancia, radio, dt=dt, a_max=g_max, tol=1.0, dinamica=tramo_recto):
+    """
+    Busca por bisección la mayor fuerza constante sobre una recta con la que el
+    auto entra a la curva siguiente sin superar a_max de aceleración centrípeta
+    (v² / radio <= a_max). Como la velocidad de salida crece con la fuerza, la
+    mayor fuerza admisible es también la que minimiza el tiempo de la recta.
+
+    Parámetros:
+    estado: Estado [x, y, v, theta] al entrar a la recta
+    distancia: Largo de la recta
+    radio: Radio de la curva siguiente
+    dt: Paso temporal de la simulación
+    a_max: Aceleración centrípeta máxima admitida
+    tol: Ancho final del intervalo de fuerzas (N)
+    dinamica: Modelo de fuerza de la recta
+
+    Retorna:
+    F: Fuerza encontrada, dentro de [-F_max, F_max]
+    simulaciones: Cantidad de tramos simulados
+    """
+    v_limite = np.sqrt(a_max * radio)
+    simulaciones = 0
+
+    def cumple(F):
+        nonlocal simulaciones
+        simulaciones += 1
+        return _velocidad_salida(estado, distancia, F, dt, dinamica) <= v_limite
+
+    # Estimación inicial con movimiento uniformemente acelerado
+    F0 = M * (v_limite**2 - estado[2]**2) / (2 * distancia)
+    F0 = float(np.clip(F0, -F_max, F_max))
+
+    # Acotar la raíz alrededor de la estimación, duplicando el paso
+    paso = max(tol, 0.01 * abs(F0))
+    if cumple(F0):
+        if F0 == F_max:
+            return F_max, simulaciones
+        bajo, alto = F0, min(F0 + paso, F_max)
+        while cumple(alto):
+            if alto == F_max:
+                return F_max, simulaciones
+            bajo, alto, paso = alto, min(alto + paso, F_max), 2 * paso
+    else:
+        if F0 == -F_max:
+            raise ValueError("Ni frenando con F_max se respeta el límite de la curva")
+        bajo, alto = max(F0 - paso, -F_max), F0
+        while not cumple(bajo):
+            if bajo == -F_max:
+                raise ValueError("Ni frenando con F_max se respeta el límite de la curva")
+            bajo, alto, paso = max(bajo - paso, -F_max), bajo, 2 * paso
+
+    # Bisección
+    while alto - bajo > tol:
+        medio = (bajo + alto) / 2
+        if cumple(medio):
+            bajo = medio
+        else:
+            alto = medio
+
+    return bajo, simulaciones
+
+def resolver_fuerzas(pista=None, radios=None, v0=None, dt=dt, a_max=g_max, tol=1.0):
+    """
+    Calcula las fuerzas de las rectas de una pista en lugar de ajustarlas a
+    mano. Tramo a tramo (disparo secuencial) elige para cada recta la mayor
+    fuerza que respeta el límite centrípeto de la curva siguiente; en una
+    recta que no termina en curva (la final, que apunta a (x_fin3, y_fin3) en
+    tp_completo.py) usa la máxima aceleración permitida.
+
+    Parámetros:
+    pista: Pista compilada; por defecto la de tp_completo.py
+    radios: Radio de cada curva, en orden; por defecto los de la pista
+    v0: Velocidad inicial; por defecto la de la pista
+    dt, a_max, tol: Como en fuerza_maxima_para_curva
+
+    Retorna:
+    Diccionario con las fuerzas (en orden de las rectas), el tiempo total
+    t_actual, el estado final y la cantidad de tramos simulados
+    """
+    pista = pista_por_defecto() if pista is None else pista
+    radios = [c.radio for c in pista.curvas] if radios is None else list(radios)
+    v0 = pista.v0 if v0 is None else v0
+
+    estado = np.array([*pista.inicio, v0, pista.rumbo_inicial])
+    t_actual = 0.0
+    fuerzas = []
+    simulaciones = 0
+    curva = 0
+
+    for i, tramo in enumerate(pista.tramos):
+        if isinstance(tramo, Recta):
+            estado[3], distancia = entrada_recta(tramo, estado[0], estado[1], estado[3])
+            dinamica = MODELOS[tramo.modelo]
+            siguiente = pista.tramos[i + 1] if i + 1 < len(pista.tramos) else None
+            if isinstance(siguiente, Curva):
+                F, sims = fuerza_maxima_para_curva(estado, distancia, radios[curva], dt, a_max, tol, dinamica)
+                simulaciones += sims
+            else:
+                F = min(F_max, M * a_max)
+            fuerzas.append(F)
+            estado, *_, t_actual, _, _ = simular_tramo_recto(estado, distancia, F, dt, t_actual,
+                                                             dinamica=dinamica)
+        else:
+            estado, *_, t_actual, _, _ = simular_tramo_curva(estado, radios[curva], tramo.angulo, dt, t_actual)
+            curva += 1
+        simulaciones += 1
+
+    return {
+        "fuerzas": fuerzas,
+        "t_actual": t_actual,
+        "estado_final": estado,
+        "simulaciones": simulaciones,
+    }
+
+if __name__ == "__main__":
+    import sys
+    from simulador.pista import cargar_pista
+
+    pista = cargar_pista(sys.argv[1]) if len(sys.argv) > 1 else None
+    resultado = resolver_fuerzas(pista)
+    for i, F in enumerate(resultado["fuerzas"], start=1):
+        print(f"f{i} = {F:.0f} N")
+    print(f"Tiempo total: {resultado['t_actual']:.2f} s ({resultado['simulaciones']} tramos simulados)")
@@ -0,0 +1,184 @@
+import json
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+# Instrumentación opcional de los simuladores de tramos. Mientras hay un Perfil
+# activo (ver perfilar), cada tramo registra su tiempo total y el de cada fase,
+# los pasos, las llamadas a la dinámica y las filas escritas. Sin perfil activo
+# contar y cronometrar devuelven la misma función que reciben y tramo un
+# contexto vacío: el costo es de unas pocas llamadas por tramo, nada por paso.
+#
+# Los tiempos de las fases son exclusivos: "integrar" es el tiempo del
+# integrador sin contar las llamadas a la dinámica ni a los eventos, que van a
+# "dinamica" y "eventos".
+
+FASES = ("integrar", "dinamica", "eventos", "registrar", "posproceso")
+
+_activo = None
+_NULO = nullcontext()
+
+class Perfil:
+    """
+    Acumula las mediciones de los tramos simulados mientras está activo.
+
+    Atributos:
+    llamadas: Counter con las llamadas a cada función contada, por nombre
+    tramos: Lista de diccionarios, uno por tramo (tipo, metodo, tiempo,
+            pasos, evaluaciones, filas, fases y, con memoria=True, el pico
+            de memoria en bytes)
+    memoria_pico: Pico de memoria de toda la medición (con memoria=True)
+    """
+
+    def __init__(self, memoria=False):
+        self.memoria = memoria
+        self.llamadas = Counter()
+        self.tramos = []
+        self.memoria_pico = 0
+        self.duracion = 0.0
+        self._actual = None
+        # Tiempo de las llamadas anidadas en cada fase abierta, para descontarlo
+        self._anidado = []
+
+    def _medir(self, medicion, clave, inicio):
+        total = time.perf_counter() - inicio
+        interno = self._anidado.pop()
+        if medicion is not None:
+            medicion["fases"][clave] += total - interno
+        if self._anidado:
+            self._anidado[-1] += total
+
+    def contar(self, f):
+        """
+        Envuelve la dinámica f(t, estado, *args) para contar sus llamadas y
+        sumar su tiempo a la fase "dinamica" del tramo en curso.
+        """
+        nombre = getattr(f, "__name__", repr(f))
+
+        def f_contada(t, estado, *args):
+            medicion = self._actual
+            self.llamadas[nombre] += 1
+            if medicion is not None:
+                medicion["evaluaciones"] += 1
+            self._anidado.append(0.0)
+            inicio = time.perf_counter()
+            try:
+                return f(t, estado, *args)
+            finally:
+                self._medir(medicion, "dinamica", inicio)
+        return f_contada
+
+    def cronometrar(self, fase, funcion, paso=False):
+        """
+        Envuelve funcion para sumar su tiempo a fase. Con paso=True cada
+        llamada cuenta como un paso del tramo.
+        """
+        def medida(*args, **kwargs):
+            medicion = self._actual
+            if paso and medicion is not None:
+                medicion["pasos"] += 1
+            self._anidado.append(0.0)
+            inicio = time.perf_counter()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                self._medir(medicion, fase, inicio)
+        return medida
+
+    @contextmanager
+    def tramo(self, tipo, metodo, trayectoria):
+        medicion = {"tipo": tipo, "metodo": metodo, "tiempo": 0.0, "pasos": 0, "evaluaciones": 0,
+                    "filas": 0, "fases": dict.fromkeys(FASES, 0.0)}
+        anterior, self._actual = self._actual, medicion
+        filas = len(trayectoria)
+        if self.memoria:
+            self.memoria_pico = max(self.memoria_pico, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        inicio = time.perf_counter()
+        try:
+            yield medicion
+        finally:
+            medicion["tiempo"] = time.perf_counter() - inicio
+            medicion["filas"] = len(trayectoria) - filas
+            if self.memoria:
+                medicion["memoria_pico"] = tracemalloc.get_traced_memory()[1]
+                self.memoria_pico = max(self.memoria_pico, medicion["memoria_pico"])
+            self._actual = anterior
+            self.tramos.append(medicion)
+
+    def totales(self):
+        """
+        Suma de las mediciones de todos los tramos, con las fases por separado.
+        """
+        totales = {"tramos": len(self.tramos), "tiempo": 0.0, "pasos": 0, "evaluaciones": 0, "filas": 0,
+                   "fases": dict.fromkeys(FASES, 0.0)}
+        for medicion in self.tramos:
+            for clave in ("tiempo", "pasos", "evaluaciones", "filas"):
+                totales[clave] += medicion[clave]
+            for fase in FASES:
+                totales["fases"][fase] += medicion["fases"][fase]
+        return totales
+
+    def informe(self):
+        """
+        Diccionario serializable con todas las mediciones.
+        """
+        informe = {"duracion": self.duracion, "llamadas": dict(self.llamadas), "totales": self.totales(),
+                   "tramos": self.tramos}
+        if self.memoria:
+            informe["memoria_pico"] = self.memoria_pico
+        return informe
+
+    def guardar(self, ruta):
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            json.dump(self.informe(), archivo, indent=2, ensure_ascii=False)
+
+def activo():
+    """
+    El Perfil activo, o None si no se está midiendo.
+    """
+    return _activo
+
+def contar(f):
+    return f if _activo is None else _activo.contar(f)
+
+def cronometrar(fase, funcion, paso=False):
+    return funcion if _activo is None else _activo.cronometrar(fase, funcion, paso)
+
+def tramo(tipo, metodo, trayectoria):
+    return _NULO if _activo is None else _activo.tramo(tipo, metodo, trayectoria)
+
+@contextmanager
+def perfilar(memoria=False, ruta=None):
+    """
+    Activa la instrumentación dentro del bloque.
+
+    Parámetros:
+    memoria: Medir también el pico de memoria con tracemalloc (hace todo
+             bastante más lento, así que los tiempos no son comparables)
+    ruta: Si se pasa, el informe se guarda ahí en JSON al salir
+
+    Uso:
+    with perfilar() as perfil:
+        simular_vuelta(f1, f2, f3, r1, r2, metodo="rk4")
+    perfil.informe()["totales"]
+    """
+    global _activo
+    perfil = Perfil(memoria)
+    anterior, _activo = _activo, perfil
+    iniciar_memoria = memoria and not tracemalloc.is_tracing()
+    if iniciar_memoria:
+        tracemalloc.start()
+    inicio = time.perf_counter()
+    try:
+        yield perfil
+    finally:
+        perfil.duracion = time.perf_counter() - inicio
+        if memoria:
+            perfil.memoria_pico = max(perfil.memoria_pico, tracemalloc.get_traced_memory()[1])
+        if iniciar_memoria:
+            tracemalloc.stop()
+        _activo = anterior
+        if ruta is not None:
+            perfil.guardar(ruta)
@@ -0,0 +1,212 @@
+import json
+import os
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+
+from simulador import analitico
+from simulador.constantes import F_max
+from simulador.tramos import vector, angulo_entre
+
+DIRECTORIO_PISTAS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pistas")
+
+# Formato de una pista (JSON o TOML): una lista ordenada de tramos.
+#
+#   recta: "desde", "hasta" (puntos [x, y]) o "longitud"; "fuerza" en N (o
+#          "F_max" / "-F_max"); "modelo": "constante" | "exponencial";
+#          "rumbo": "tramo" (entra alineado con desde -> hasta, por defecto),
+#          "continuar" (sigue con el rumbo de salida de la curva) o "apuntar"
+#          (apunta a "hasta" desde donde esté y recorre esa distancia).
+#   curva: "radio" y opcionalmente "angulo" (rad) o "angulo_grados"; si no se
+#          da, se usa angulo_entre de las rectas vecinas.
+
+class Recta(NamedTuple):
+    longitud: float
+    direccion: float
+    hasta: tuple
+    rumbo: str
+    fuerza: float
+    modelo: str
+
+class Curva(NamedTuple):
+    radio: float
+    angulo: float
+
+class Pista(NamedTuple):
+    """
+    Pista compilada: tramos inmutables con longitudes, rumbos y ángulos de
+    giro ya calculados, para compartirla entre todas las corridas.
+    """
+    nombre: str
+    inicio: tuple
+    rumbo_inicial: float
+    v0: float
+    tramos: tuple
+
+    @property
+    def rectas(self):
+        return tuple(t for t in self.tramos if isinstance(t, Recta))
+
+    @property
+    def curvas(self):
+        return tuple(t for t in self.tramos if isinstance(t, Curva))
+
+def leer_fuerza(valor):
+    """
+    Fuerza en N a partir de un número o de "F_max" / "-F_max".
+    """
+    if isinstance(valor, str) and valor.strip().lstrip("+-") == "F_max":
+        return -F_max if valor.strip().startswith("-") else F_max
+    return float(valor)
+
+def _vector_recta(spec):
+    if "desde" in spec and "hasta" in spec:
+        return vector(spec["desde"], spec["hasta"])
+    return None
+
+def compilar_pista(spec):
+    """
+    Compila la especificación (un diccionario ya leído) en una Pista.
+    """
+    specs = spec["tramos"]
+    tramos = []
+    for i, tramo in enumerate(specs):
+        if tramo["tipo"] == "recta":
+            v = _vector_recta(tramo)
+            rumbo = tramo.get("rumbo", "tramo")
+            if rumbo not in ("tramo", "continuar", "apuntar"):
+                raise ValueError(f"Rumbo desconocido en el tramo {i}: {rumbo}")
+            if "longitud" in tramo:
+                longitud = float(tramo["longitud"])
+            elif v is not None:
+                longitud = float(np.linalg.norm(v))
+            elif rumbo != "apuntar":
+                raise ValueError(f"La recta {i} necesita 'longitud' o 'desde' y 'hasta'")
+            else:
+                longitud = np.nan
+            direccion = float(np.arctan2(v[1], v[0])) if v is not None else np.nan
+            if rumbo == "tramo" and v is None:
+                raise ValueError(f"La recta {i} necesita 'desde' y 'hasta' para alinear el rumbo")
+            hasta = tuple(map(float, tramo["hasta"])) if "hasta" in tramo else None
+            tramos.append(Recta(longitud, direccion, hasta, rumbo, leer_fuerza(tramo.get("fuerza", 0)),
+                                tramo.get("modelo", "constante")))
+
+        elif tramo["tipo"] == "curva":
+            if "angulo" in tramo:
+                angulo = float(tramo["angulo"])
+            elif "angulo_grados" in tramo:
+                angulo = float(np.radians(tramo["angulo_grados"]))
+            else:
+                anterior = _vector_recta(specs[i - 1]) if i > 0 else None
+                siguiente = _vector_recta(specs[i + 1]) if i + 1 < len(specs) else None
+                if anterior is None or siguiente is None:
+                    raise ValueError(f"La curva {i} necesita 'angulo' o rectas vecinas con 'desde' y 'hasta'")
+                angulo = float(angulo_entre(anterior, siguiente))
+            tramos.append(Curva(float(tramo["radio"]), angulo))
+
+        else:
+            raise ValueError(f"Tipo de tramo desconocido: {tramo['tipo']}")
+
+    primera = specs[0]
+    inicio = tuple(map(float, spec.get("inicio", primera.get("desde", (0, 0)))))
+    if "rumbo_inicial" in spec:
+        rumbo_inicial = float(spec["rumbo_inicial"])
+    elif isinstance(tramos[0], Recta):
+        rumbo_inicial = float(np.nan_to_num(tramos[0].direccion))
+    else:
+        # Las curvas giran a la izquierda: se entra con el rumbo que deja la
+        # salida alineada con la recta siguiente
+        siguiente = tramos[1] if len(tramos) > 1 else None
+        if not isinstance(siguiente, Recta) or np.isnan(siguiente.direccion):
+            raise ValueError("Una pista que empieza con una curva necesita 'rumbo_inicial' o una recta "
+                             "siguiente con 'desde' y 'hasta'")
+        rumbo_inicial = siguiente.direccion - tramos[0].angulo
+    return Pista(spec.get("nombre", ""), inicio, rumbo_inicial, float(spec.get("v0", 50.0)), tuple(tramos))
+
+def cargar_pista(ruta):
+    """
+    Lee y compila un archivo de pista .json o .toml.
+    """
+    if ruta.endswith(".toml"):
+        import tomllib
+        with open(ruta, "rb") as archivo:
+            spec = tomllib.load(archivo)
+    else:
+        with open(ruta, encoding="utf-8") as archivo:
+            spec = json.load(archivo)
+    return compilar_pista(spec)
+
+@lru_cache(maxsize=None)
+def pista_por_defecto():
+    """
+    Pista de tp_completo.py, compilada una sola vez.
+    """
+    return cargar_pista(os.path.join(DIRECTORIO_PISTAS, "tp_completo.json"))
+
+def entrada_recta(recta, x, y, theta):
+    """
+    Rumbo con el que se entra a la recta y distancia a recorrer, según su modo
+    de rumbo. Acepta escalares o arreglos (una fila por auto).
+    """
+    if recta.rumbo == "apuntar":
+        dx, dy = recta.hasta[0] - x, recta.hasta[1] - y
+        return np.arctan2(dy, dx), np.hypot(dx, dy)
+    if recta.rumbo == "tramo":
+        return np.full_like(theta, recta.direccion, dtype=float), recta.longitud
+    return theta, recta.longitud
+
+class Malla(NamedTuple):
+    """
+    Pista discretizada por longitud de arco. Los nodos caen justo sobre los
+    bordes de los tramos; curvatura y tramo son de cada intervalo entre nodos.
+    """
+    s: np.ndarray
+    x: np.ndarray
+    y: np.ndarray
+    theta: np.ndarray
+    curvatura: np.ndarray
+    tramo: np.ndarray
+
+def discretizar_pista(pista, radios=None, ds=0.1):
+    """
+    Recorre la geometría de la pista (que no depende de la velocidad) y la
+    muestrea cada ds metros como máximo, con al menos un intervalo por tramo.
+
+    Parámetros:
+    pista: Pista compilada
+    radios: Radio de cada curva, en orden; por defecto los de la pista
+    ds: Separación máxima entre nodos (m)
+
+    Retorna:
+    Malla con n nodos y n - 1 intervalos
+    """
+    radios = iter(radios if radios is not None else [c.radio for c in pista.curvas])
+    # Con v = 1 el tiempo de los tramos analíticos es la longitud de arco
+    estado = np.array([*pista.inicio, 1.0, pista.rumbo_inicial])
+    nodos = [estado[None, :]]
+    s = [np.zeros(1)]
+    curvatura, indice = [], []
+
+    for i, tramo in enumerate(pista.tramos):
+        if isinstance(tramo, Recta):
+            estado[3], longitud = entrada_recta(tramo, estado[0], estado[1], estado[3])
+            radio = None
+        else:
+            radio = next(radios)
+            longitud = radio * tramo.angulo
+        n = max(int(np.ceil(longitud / ds - 1e-9)), 1)
+        recorrido = longitud * np.arange(1, n + 1) / n
+        if radio is None:
+            puntos = analitico.estado_recta(estado, 0.0, recorrido)
+        else:
+            puntos = analitico.estado_curva(estado, radio, recorrido)
+        nodos.append(puntos)
+        s.append(s[-1][-1] + recorrido)
+        curvatura.append(np.full(n, 0.0 if radio is None else 1 / radio))
+        indice.append(np.full(n, i))
+        estado = puntos[-1].copy()
+
+    nodos = np.concatenate(nodos)
+    return Malla(np.concatenate(s), nodos[:, 0], nodos[:, 1], nodos[:, 3],
+                 np.concatenate(curvatura), np.concatenate(indice))
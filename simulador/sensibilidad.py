@@ -0,0 +1,303 @@
+import numpy as np
+
+from simulador.constantes import M, dt, g_max, F_max
+from simulador.pista import Curva, Recta, pista_por_defecto
+from simulador.tramos import tramo_recto, tramo_curva, evento_distancia, evento_angulo, _avanzar, _pasos, _resultado
+from simulador.trayectoria import Trayectoria
+
+# Sensibilidades por ecuaciones variacionales (modo directo): junto con el
+# estado se integra la matriz S = d(estado)/d(parámetros), de 4 x P, con
+#
+#   dS/dt = J(estado) S + df/dp,   J = df/d(estado)
+#
+# usando el mismo esquema (y los mismos pasos) que el estado, así que S es la
+# derivada de la solución numérica. El final de cada tramo lo fija un evento
+# g(estado) = 0, que también se mueve con los parámetros: la duración cambia
+# en dtau/dp = -(dg/dp) / (dg/dt) y la salida se corrige con S += f dtau/dp.
+#
+# Los parámetros se nombran como en tp_completo.py: f1, f2, ... (fuerza de
+# cada recta), r1, r2, ... (radio de cada curva) y v0.
+
+COMPONENTES = ("x", "y", "v", "theta")
+
+def jacobiano_recta(estado, F):
+    """
+    df/d(estado) y df/dF de tramo_recto.
+    """
+    _, _, v, theta = estado
+    J = np.zeros((4, 4))
+    J[0, 2], J[0, 3] = np.cos(theta), -v * np.sin(theta)
+    J[1, 2], J[1, 3] = np.sin(theta), v * np.cos(theta)
+    return J, np.array([0.0, 0.0, 1 / M, 0.0])
+
+def jacobiano_curva(estado, radio):
+    """
+    df/d(estado) y df/d(radio) de tramo_curva.
+    """
+    _, _, v, theta = estado
+    J = np.zeros((4, 4))
+    J[0, 2], J[0, 3] = np.cos(theta), -v * np.sin(theta)
+    J[1, 2], J[1, 3] = np.sin(theta), v * np.cos(theta)
+    J[3, 2] = 1 / radio
+    return J, np.array([0.0, 0.0, 0.0, -v / radio**2])
+
+def variacional(dinamica, jacobiano, columna, p):
+    """
+    Dinámica aumentada con S: el estado es [x, y, v, theta, S.ravel()] y el
+    parámetro propio del tramo (fuerza o radio) es la columna `columna` de S
+    (None si no es uno de los derivados).
+    """
+    def f(t, z, *args):
+        estado = z[:4]
+        S = z[4:].reshape(4, p)
+        J, df_dp = jacobiano(estado, args[0])
+        dS = J @ S
+        if columna is not None:
+            dS[:, columna] += df_dp
+        return np.concatenate([dinamica(t, estado, *args), dS.ravel()])
+    return f
+
+def _entrada_recta(recta, estado, S):
+    # Rumbo y distancia de entrada (como pista.entrada_recta) con sus derivadas
+    if recta.rumbo == "apuntar":
+        dx, dy = recta.hasta[0] - estado[0], recta.hasta[1] - estado[1]
+        r2 = dx**2 + dy**2
+        estado[3] = np.arctan2(dy, dx)
+        S[3] = (dy * S[0] - dx * S[1]) / r2
+        return np.sqrt(r2), -(dx * S[0] + dy * S[1]) / np.sqrt(r2)
+    if recta.rumbo == "tramo":
+        estado[3] = recta.direccion
+        S[3] = 0.0
+    return recta.longitud, np.zeros(S.shape[1])
+
+def simular_tramo_sensible(tramo, parametro, estado, S, t, dt_dp, columna=None, dt=dt, metodo="rk4",
+                           rtol=1e-6, atol=1e-9, h_max=np.inf, trayectoria=None):
+    """
+    Simula un tramo de la pista integrando también las sensibilidades.
+
+    Parámetros:
+    tramo: Recta (con fuerza constante) o Curva de una pista compilada
+    parametro: Fuerza de la recta o radio de la curva
+    estado, S: Estado de entrada y su sensibilidad (4, P)
+    t, dt_dp: Tiempo de entrada y su sensibilidad (P,)
+    columna: Columna de S que corresponde al parámetro del tramo, o None
+    metodo: "rk4", "rk45" u otro integrador de tramos._pasos. Con rk4 los
+            pasos son los de simular_tramo_recto/curva; con rk45 el control
+            de error también mira S y los pasos pueden diferir un poco
+
+    Retorna:
+    (estado, S, t, dt_dp) a la salida del tramo
+    """
+    if metodo in ("auto", "analitico", "distancia"):
+        raise ValueError(f"Las sensibilidades se integran con rk4, rk45, euler o heun, no con metodo={metodo!r}")
+    if trayectoria is None:
+        trayectoria = Trayectoria()
+    estado = np.array(estado, dtype=float)
+    S = np.array(S, dtype=float)
+    p = S.shape[1]
+
+    if isinstance(tramo, Recta):
+        if tramo.modelo != "constante":
+            raise ValueError("Las sensibilidades sólo admiten rectas con fuerza constante")
+        tipo, radio = "recta", None
+        distancia, dd_dp = _entrada_recta(tramo, estado, S)
+        x0, y0, S0 = estado[0], estado[1], S[:2].copy()
+        evento = evento_distancia(x0, y0, distancia)
+        f = variacional(tramo_recto, jacobiano_recta, columna, p)
+        args = (parametro,)
+
+        def limite(t, z):
+            restante = distancia - np.hypot(z[0] - x0, z[1] - y0)
+            return max(2 * restante / max(z[2], 1e-9), 1e-9)
+        terminado = distancia <= 0
+    else:
+        tipo, radio = "curva", parametro
+        theta0, S0 = estado[3], S[3].copy()
+        evento = evento_angulo(theta0, tramo.angulo)
+        f = variacional(tramo_curva, jacobiano_curva, columna, p)
+        args = (parametro, estado[2])
+
+        def limite(t, z):
+            restante = tramo.angulo - abs(z[3] - theta0)
+            return max(2 * restante * parametro / max(z[2], 1e-9), 1e-9)
+        terminado = tramo.angulo <= 0
+
+    estado_inicial, t_inicial = estado.copy(), t
+    inicio = trayectoria.abrir_tramo(t, estado, tipo, radio)
+    z = np.concatenate([estado, S.ravel()])
+    pasos = _pasos(f, t, z, dt, args, metodo, rtol, atol, h_max, limite, None)
+    vacio = terminado
+    while not terminado:
+        t, z, _, terminado, z_en = _avanzar(pasos, t, z, [evento], True)
+        trayectoria.agregar(t, z[:4], z_en)
+        if z[2] <= 0 and not terminado:
+            raise ValueError("El auto se detuvo antes de completar el tramo recto")
+    _resultado(trayectoria, tipo, inicio, estado_inicial, t_inicial, z[:4].copy(), t, radio)
+
+    estado, S = z[:4].copy(), z[4:].reshape(4, p).copy()
+    if not vacio:
+        # Corrección por el corrimiento del evento: dtau/dp = -(dg/dp) / (dg/dt)
+        derivada = f(t, z, *args)[:4]
+        if tipo == "recta":
+            u = np.array([estado[0] - x0, estado[1] - y0]) / distancia
+            dg_dp = u @ (S[:2] - S0) - dd_dp
+            dg_dt = u @ derivada[:2]
+        else:
+            signo = np.sign(estado[3] - theta0)
+            dg_dp = signo * (S[3] - S0)
+            dg_dt = signo * derivada[3]
+        dtau_dp = -dg_dp / dg_dt
+        S += np.outer(derivada, dtau_dp)
+        dt_dp = dt_dp + dtau_dp
+    return estado, S, t, dt_dp
+
+def simular_pista_sensible(pista=None, fuerzas=None, radios=None, v0=None, parametros=None, dt=dt,
+                           metodo="rk4", trayectoria=None, **opciones):
+    """
+    Recorre la pista como simular_pista y además devuelve los jacobianos
+    exactos (de la solución numérica) respecto de los parámetros pedidos.
+
+    Parámetros:
+    pista, fuerzas, radios, v0, dt: Los de simular_pista
+    parametros: Nombres de los parámetros a derivar; por defecto las fuerzas
+                de todas las rectas ("f1", "f2", ...)
+    metodo: Integrador ("rk4" por defecto; ver simular_tramo_sensible)
+    opciones: rtol, atol y h_max para metodo="rk45"
+
+    Retorna:
+    estado: Estado final
+    t_total: Tiempo total de la vuelta
+    trayectoria: Trayectoria con todas las muestras de la vuelta
+    jacobianos: Diccionario con parametros (los nombres, en el orden de las
+                columnas), estado (4, P) = d(estado final)/dp, t_total (P,) y
+                tramos, una lista con (estado, S, t, dt_dp) a la salida de
+                cada tramo
+    """
+    pista = pista_por_defecto() if pista is None else pista
+    fuerzas = [r.fuerza for r in pista.rectas] if fuerzas is None else list(fuerzas)
+    radios = [c.radio for c in pista.curvas] if radios is None else list(radios)
+    v0 = pista.v0 if v0 is None else v0
+    parametros = [f"f{i + 1}" for i in range(len(fuerzas))] if parametros is None else list(parametros)
+    if trayectoria is None:
+        trayectoria = Trayectoria()
+
+    estado = np.array([*pista.inicio, v0, pista.rumbo_inicial])
+    S = np.zeros((4, len(parametros)))
+    if "v0" in parametros:
+        S[2, parametros.index("v0")] = 1.0
+    t, dt_dp = 0.0, np.zeros(len(parametros))
+    tramos = []
+    rectas = curvas = 0
+    for tramo in pista.tramos:
+        if isinstance(tramo, Recta):
+            rectas += 1
+            nombre, parametro = f"f{rectas}", fuerzas[rectas - 1]
+        else:
+            curvas += 1
+            nombre, parametro = f"r{curvas}", radios[curvas - 1]
+        columna = parametros.index(nombre) if nombre in parametros else None
+        estado, S, t, dt_dp = simular_tramo_sensible(tramo, parametro, estado, S, t, dt_dp, columna, dt, metodo,
+                                                     trayectoria=trayectoria, **opciones)
+        tramos.append((estado, S, t, dt_dp))
+
+    jacobianos = {"parametros": parametros, "estado": S, "t_total": dt_dp, "tramos": tramos}
+    return estado, t, trayectoria, jacobianos
+
+def disparo_newton(pista=None, objetivos=None, parametros=None, fuerzas=None, radios=None, v0=None, dt=dt,
+                   metodo="rk4", a_max=g_max, tol=1e-6, max_iter=20, **opciones):
+    """
+    Disparo de Gauss-Newton: ajusta los parámetros para que la vuelta cumpla
+    los objetivos, con una vuelta (estado + jacobianos) por iteración. Con
+    tantos objetivos como parámetros es Newton; con más, mínimos cuadrados.
+
+    Parámetros:
+    objetivos: Lista de (indice_tramo, componente, valor): la componente
+               ("x", "y", "v", "theta" o "t") a la salida de ese tramo. Por
+               defecto, como optimizacion.resolver_fuerzas, entrar a cada
+               curva a la velocidad límite sqrt(a_max * radio), ajustando la
+               fuerza de la recta anterior
+    parametros: Nombres de los parámetros a ajustar (ver simular_pista_sensible)
+    tol: Se detiene cuando el mayor residuo, o el mayor cambio de un
+         parámetro en un paso, es menor que tol
+    max_iter: Iteraciones (vueltas) como máximo
+
+    Si con el paso de Newton el auto no completa la vuelta (se detiene en
+    una recta), el paso se reduce a la mitad hasta que la complete.
+
+    Retorna:
+    Diccionario con los valores de fuerzas, radios y v0 encontrados, el
+    residuo final, las iteraciones (pasos de Newton) y el resultado de la
+    última vuelta, como lo devuelve simular_pista_sensible
+    """
+    pista = pista_por_defecto() if pista is None else pista
+    valores = {f"f{i + 1}": r.fuerza for i, r in enumerate(pista.rectas)}
+    valores.update({f"r{i + 1}": c.radio for i, c in enumerate(pista.curvas)})
+    valores["v0"] = pista.v0
+    for prefijo, dados in (("f", fuerzas), ("r", radios)):
+        if dados is not None:
+            valores.update({f"{prefijo}{i + 1}": valor for i, valor in enumerate(dados)})
+    if v0 is not None:
+        valores["v0"] = v0
+
+    if objetivos is None:
+        objetivos, parametros_defecto = [], []
+        rectas = curvas = 0
+        for i, tramo in enumerate(pista.tramos):
+            rectas += isinstance(tramo, Recta)
+            if isinstance(tramo, Curva):
+                curvas += 1
+                if i > 0 and isinstance(pista.tramos[i - 1], Recta):
+                    objetivos.append((i - 1, "v", np.sqrt(a_max * valores[f"r{curvas}"])))
+                    parametros_defecto.append(f"f{rectas}")
+        parametros = parametros_defecto if parametros is None else parametros
+    parametros = list(parametros)
+
+    def evaluar(valores):
+        fuerzas = [valores[f"f{i + 1}"] for i in range(len(pista.rectas))]
+        radios = [valores[f"r{i + 1}"] for i in range(len(pista.curvas))]
+        vuelta = simular_pista_sensible(pista, fuerzas, radios, valores["v0"], parametros, dt, metodo, **opciones)
+        residuo, J = [], []
+        for indice, componente, objetivo in objetivos:
+            estado, S, t, dt_dp = vuelta[3]["tramos"][indice]
+            if componente == "t":
+                residuo.append(t - objetivo)
+                J.append(dt_dp)
+            else:
+                fila = COMPONENTES.index(componente)
+                residuo.append(estado[fila] - objetivo)
+                J.append(S[fila])
+        return vuelta, np.array(residuo), np.array(J)
+
+    vuelta, residuo, J = evaluar(valores)
+    iteraciones = 0
+    while iteraciones < max_iter and np.max(np.abs(residuo), initial=0) >= tol:
+        delta = np.linalg.lstsq(J, -residuo, rcond=None)[0]
+        # Si con el paso completo el auto no completa la vuelta, se lo acorta a la mitad
+        paso = 1.0
+        while True:
+            prueba = dict(valores)
+            for nombre, d in zip(parametros, delta):
+                prueba[nombre] += paso * d
+                if nombre.startswith("f"):
+                    prueba[nombre] = float(np.clip(prueba[nombre], -F_max, F_max))
+            try:
+                vuelta, residuo, J = evaluar(prueba)
+                break
+            except ValueError:
+                paso /= 2
+                if paso < 1e-6:
+                    raise
+        valores = prueba
+        iteraciones += 1
+        if np.max(np.abs(paso * delta)) < tol:
+            # Mínimos cuadrados: el residuo ya no baja aunque no sea cero
+            break
+
+    return {
+        "fuerzas": [valores[f"f{i + 1}"] for i in range(len(pista.rectas))],
+        "radios": [valores[f"r{i + 1}"] for i in range(len(pista.curvas))],
+        "v0": valores["v0"],
+        "residuo": residuo,
+        "iteraciones": iteraciones,
+        "vuelta": vuelta,
+    }
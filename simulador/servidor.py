@@ -0,0 +1,312 @@
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import struct
+
+import numpy as np
+
+from simulador.cadena import CadenaVuelta
+from simulador.constantes import dt
+from simulador.graficos import EXTENSION_PISTA, RUTA_PISTA, series_paneles
+from simulador.mapa import campo_distancia
+from simulador.pista import cargar_pista, pista_por_defecto
+
+# Servidor local para ajustar la vuelta en vivo, sólo con la biblioteca
+# estándar (asyncio): mantiene una CadenaVuelta y el campo de distancia de
+# pista.png en memoria, recibe cambios de f1, f2, f3, r1, r2 y v0 por
+# WebSocket (o POST /parametros) y devuelve la vuelta nueva con las series de
+# los seis paneles de tp_completo.py. Los cambios que llegan mientras se
+# simula se juntan y se resuelven en una sola simulación con los últimos valores.
+#
+#   GET  /             página con controles y gráficos
+#   GET  /pista.png    imagen de fondo
+#   GET  /estado       última vuelta en JSON
+#   POST /parametros   {"f3": 30000, ...} -> vuelta en JSON
+#   GET  /ws           WebSocket: se envían cambios y se reciben vueltas
+
+GUID_WEBSOCKET = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+class Servidor:
+    """
+    Estado del servidor: la cadena de la vuelta, los cambios pendientes y
+    los clientes WebSocket conectados.
+
+    Parámetros:
+    pista: Pista compilada; por defecto la de tp_completo.py
+    max_puntos: Puntos máximos por serie en cada respuesta (se toma una de
+                cada k muestras, siempre con la última)
+    opciones: Argumentos de CadenaVuelta (dt, metodo, ...)
+    """
+
+    def __init__(self, pista=None, max_puntos=2000, **opciones):
+        self.cadena = CadenaVuelta(pista, **opciones)
+        self.campo = campo_distancia()
+        with open(RUTA_PISTA, "rb") as archivo:
+            self.imagen = archivo.read()
+        self.max_puntos = max_puntos
+        self.clientes = set()
+        self.ultimo = None
+        self._pendiente = {}
+        # Futuros de los POST que esperan la próxima simulación
+        self._esperando = []
+        self._hay_cambios = None
+        self._simulaciones = 0
+
+    def simular(self, cambios):
+        """
+        Aplica los cambios a la cadena (sólo se re-simulan los tramos
+        afectados) y arma la respuesta JSON. El margen a la pista es null si
+        la vuelta sale de la imagen.
+        """
+        estado, t_total, trayectoria = self.cadena.cambiar(**cambios)
+        self._simulaciones += 1
+        margen = self.campo.en(trayectoria["x"], trayectoria["y"]).min(initial=np.inf)
+        paso = max(int(np.ceil(len(trayectoria) / self.max_puntos)), 1)
+        indices = np.unique(np.append(np.arange(0, len(trayectoria), paso), len(trayectoria) - 1))
+        series = {nombre: {"x": x[indices].tolist(), "y": y[indices].tolist()}
+                  for nombre, (x, y) in series_paneles(trayectoria).items()}
+        return {
+            "simulacion": self._simulaciones,
+            "parametros": self.cadena.parametros(),
+            "t_total": t_total,
+            "estado_final": estado.tolist(),
+            "recalculados": self.cadena.recalculados,
+            "acc_tangencial_max": float(np.abs(trayectoria["a_t"]).max(initial=0)),
+            "acc_centripeta_max": float(trayectoria["a_c"].max(initial=0)),
+            "margen_pista": float(margen) if np.isfinite(margen) else None,
+            "series": series,
+        }
+
+    def pedir(self, cambios):
+        """
+        Encola cambios de parámetros. Se acumulan hasta que el simulador los
+        toma todos juntos, así que sólo cuentan los últimos valores. Los
+        nombres desconocidos, los valores no finitos y los radios o v0 que no
+        son positivos se rechazan con ValueError (un 400 para el cliente).
+        """
+        desconocidos = set(cambios) - set(self.cadena.parametros())
+        if desconocidos:
+            raise ValueError(f"Parámetros desconocidos: {', '.join(sorted(desconocidos))}")
+        cambios = {nombre: float(valor) for nombre, valor in cambios.items()}
+        no_finitos = [nombre for nombre, valor in cambios.items() if not np.isfinite(valor)]
+        if no_finitos:
+            raise ValueError(f"Valores no finitos: {', '.join(sorted(no_finitos))}")
+        # Un radio o una velocidad inicial nulos o negativos no tienen vuelta posible
+        no_positivos = [nombre for nombre, valor in cambios.items() if nombre[0] in "rv" and valor <= 0]
+        if no_positivos:
+            raise ValueError(f"Deben ser positivos: {', '.join(sorted(no_positivos))}")
+        self._pendiente.update(cambios)
+        self._hay_cambios.set()
+
+    async def simulador(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._hay_cambios.wait()
+            self._hay_cambios.clear()
+            cambios, self._pendiente = self._pendiente, {}
+            esperando, self._esperando = self._esperando, []
+            # La simulación corre en un hilo para seguir recibiendo cambios mientras
+            # tanto. Cualquier error se responde a todos y el simulador sigue andando
+            try:
+                respuesta = await loop.run_in_executor(None, self.simular, cambios)
+                mensaje = a_json(respuesta)
+                self.ultimo = respuesta
+            except Exception as error:
+                respuesta = {"error": f"{type(error).__name__}: {error}", "parametros": self.cadena.parametros()}
+                mensaje = a_json(respuesta)
+            for futuro in esperando:
+                if not futuro.done():
+                    futuro.set_result(respuesta)
+            for cliente in list(self.clientes):
+                try:
+                    await enviar_websocket(cliente, mensaje)
+                except ConnectionError:
+                    self.clientes.discard(cliente)
+
+    async def atender(self, lector, escritor):
+        try:
+            linea = await lector.readline()
+            metodo, ruta, _ = linea.decode("latin1").split(" ", 2)
+            cabeceras = {}
+            while (linea := await lector.readline()) not in (b"\r\n", b"\n", b""):
+                nombre, _, valor = linea.decode("latin1").partition(":")
+                cabeceras[nombre.strip().lower()] = valor.strip()
+            cuerpo = await lector.readexactly(int(cabeceras.get("content-length", 0)))
+
+            if ruta == "/ws" and cabeceras.get("upgrade", "").lower() == "websocket":
+                await self.websocket(lector, escritor, cabeceras["sec-websocket-key"])
+            elif metodo == "GET" and ruta == "/":
+                responder(escritor, 200, PAGINA.encode(), "text/html; charset=utf-8")
+            elif metodo == "GET" and ruta == "/pista.png":
+                responder(escritor, 200, self.imagen, "image/png")
+            elif metodo == "GET" and ruta == "/estado":
+                responder_json(escritor, 200, self.ultimo)
+            elif metodo == "POST" and ruta == "/parametros":
+                try:
+                    self.pedir(json.loads(cuerpo or b"{}"))
+                except (ValueError, TypeError, AttributeError) as error:
+                    responder_json(escritor, 400, {"error": str(error)})
+                else:
+                    futuro = asyncio.get_running_loop().create_future()
+                    self._esperando.append(futuro)
+                    responder_json(escritor, 200, await futuro)
+            else:
+                responder_json(escritor, 404, {"error": f"No existe {metodo} {ruta}"})
+            await escritor.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            escritor.close()
+
+    async def websocket(self, lector, escritor, clave):
+        aceptar = base64.b64encode(hashlib.sha1((clave + GUID_WEBSOCKET).encode()).digest()).decode()
+        escritor.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                        f"Sec-WebSocket-Accept: {aceptar}\r\n\r\n").encode())
+        self.clientes.add(escritor)
+        try:
+            if self.ultimo is not None:
+                await enviar_websocket(escritor, a_json(self.ultimo))
+            while (mensaje := await recibir_websocket(lector, escritor)) is not None:
+                try:
+                    self.pedir(json.loads(mensaje))
+                except (ValueError, TypeError, AttributeError) as error:
+                    await enviar_websocket(escritor, a_json({"error": str(error)}))
+        finally:
+            self.clientes.discard(escritor)
+
+    async def correr(self, host="127.0.0.1", puerto=8765):
+        self._hay_cambios = asyncio.Event()
+        self.pedir({})
+        tarea = asyncio.create_task(self.simulador())
+        servidor = await asyncio.start_server(self.atender, host, puerto)
+        print(f"Servidor en http://{host}:{puerto}/")
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            tarea.cancel()
+
+def responder(escritor, codigo, cuerpo, tipo):
+    razon = {200: "OK", 400: "Bad Request", 404: "Not Found"}[codigo]
+    escritor.write(f"HTTP/1.1 {codigo} {razon}\r\nContent-Type: {tipo}\r\nContent-Length: {len(cuerpo)}\r\n"
+                   "Connection: close\r\n\r\n".encode() + cuerpo)
+
+def a_json(datos):
+    # JSON estricto: NaN o infinito fallan acá en lugar de romper el JSON.parse del cliente
+    return json.dumps(datos, allow_nan=False)
+
+def responder_json(escritor, codigo, datos):
+    responder(escritor, codigo, a_json(datos).encode(), "application/json")
+
+async def enviar_websocket(escritor, texto, codigo=0x1):
+    datos = texto.encode() if isinstance(texto, str) else texto
+    n = len(datos)
+    if n < 126:
+        cabecera = struct.pack("!BB", 0x80 | codigo, n)
+    elif n < 1 << 16:
+        cabecera = struct.pack("!BBH", 0x80 | codigo, 126, n)
+    else:
+        cabecera = struct.pack("!BBQ", 0x80 | codigo, 127, n)
+    escritor.write(cabecera + datos)
+    await escritor.drain()
+
+async def recibir_websocket(lector, escritor):
+    """
+    Lee el próximo mensaje de texto del cliente (uniendo fragmentos y
+    respondiendo los ping). Devuelve None cuando el cliente cierra.
+    """
+    partes = []
+    while True:
+        primero, segundo = await lector.readexactly(2)
+        codigo, n = primero & 0x0F, segundo & 0x7F
+        if n == 126:
+            n = struct.unpack("!H", await lector.readexactly(2))[0]
+        elif n == 127:
+            n = struct.unpack("!Q", await lector.readexactly(8))[0]
+        mascara = await lector.readexactly(4) if segundo & 0x80 else bytes(4)
+        datos = bytes(b ^ mascara[i % 4] for i, b in enumerate(await lector.readexactly(n)))
+        if codigo == 0x8:
+            await enviar_websocket(escritor, datos[:2], 0x8)
+            return None
+        if codigo == 0x9:
+            await enviar_websocket(escritor, datos, 0xA)
+            continue
+        if codigo in (0x0, 0x1, 0x2):
+            partes.append(datos)
+            if primero & 0x80:
+                return b"".join(partes).decode()
+
+PAGINA = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Vuelta</title>
+<style>body{font-family:sans-serif;margin:1em}label{display:inline-block;width:22em}
+#graficos{display:grid;grid-template-columns:repeat(3,1fr);gap:8px}canvas{border:1px solid #ccc;width:100%}</style>
+</head><body>
+<div id="controles"></div><p id="resumen"></p><div id="graficos"></div>
+<script>
+const RANGOS = {f1: [-48000, 48000], f2: [-48000, 48000], f3: [-48000, 48000], r1: [1, 20], r2: [1, 20], v0: [1, 100]};
+const EXTENSION = %EXTENSION%;
+const PANELES = ["trayectoria", "velocidad", "aceleracion", "acc_tangencial", "acc_centripeta", "fuerza"];
+const fondo = new Image(); fondo.src = "/pista.png";
+const ws = new WebSocket(`ws://${location.host}/ws`);
+const lienzos = {};
+for (const p of PANELES) {
+  const c = document.createElement("canvas"); c.width = 500; c.height = 320; c.title = p;
+  document.getElementById("graficos").appendChild(c); lienzos[p] = c;
+}
+function controles(parametros) {
+  const div = document.getElementById("controles");
+  if (div.childElementCount) return;
+  for (const [nombre, valor] of Object.entries(parametros)) {
+    const [min, max] = RANGOS[nombre] || [valor / 2, valor * 2];
+    const l = document.createElement("label");
+    l.innerHTML = `${nombre} <input type="range" min="${min}" max="${max}" step="any" value="${valor}"> <span>${valor}</span>`;
+    const entrada = l.querySelector("input");
+    entrada.oninput = () => { l.querySelector("span").textContent = (+entrada.value).toFixed(2);
+                              ws.send(JSON.stringify({[nombre]: +entrada.value})); };
+    div.appendChild(l);
+  }
+}
+function dibujar(c, x, y, imagen) {
+  const g = c.getContext("2d"); g.clearRect(0, 0, c.width, c.height);
+  let [x0, x1, y0, y1] = imagen ? EXTENSION : [Math.min(...x), Math.max(...x), Math.min(...y), Math.max(...y)];
+  if (y1 === y0) { y0 -= 1; y1 += 1; }
+  if (imagen) g.drawImage(fondo, 0, 0, c.width, c.height);
+  g.beginPath();
+  x.forEach((xi, i) => { const px = (xi - x0) / (x1 - x0) * c.width, py = (y1 - y[i]) / (y1 - y0) * c.height;
+                         i ? g.lineTo(px, py) : g.moveTo(px, py); });
+  g.lineWidth = 2; g.stroke(); g.fillText(c.title, 5, 12);
+}
+ws.onmessage = (evento) => {
+  const r = JSON.parse(evento.data);
+  if (r.parametros) controles(r.parametros);
+  if (r.error) { document.getElementById("resumen").textContent = "Error: " + r.error; return; }
+  document.getElementById("resumen").textContent =
+    `t = ${r.t_total.toFixed(4)} s, a_t máx = ${r.acc_tangencial_max.toFixed(1)}, ` +
+    `a_c máx = ${r.acc_centripeta_max.toFixed(1)}, margen = ${r.margen_pista === null ? "fuera de la imagen" : r.margen_pista.toFixed(2) + " m"}, ` +
+    `tramos re-simulados: ${r.recalculados.join(", ")}`;
+  for (const p of PANELES) dibujar(lienzos[p], r.series[p].x, r.series[p].y, p === "trayectoria");
+};
+</script></body></html>
+""".replace("%EXTENSION%", json.dumps(EXTENSION_PISTA))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor local para ajustar la vuelta en vivo")
+    parser.add_argument("--pista", help="Archivo de pista (.json/.toml); por defecto tp_completo")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--metodo", default="auto")
+    parser.add_argument("--dt", type=float, default=dt)
+    parser.add_argument("--max-puntos", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    pista = cargar_pista(args.pista) if args.pista else pista_por_defecto()
+    servidor = Servidor(pista, args.max_puntos, dt=args.dt, metodo=args.metodo)
+    try:
+        asyncio.run(servidor.correr(args.host, args.puerto))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+import numpy as np
+
+from simulador.constantes import M, dt, F_max
+from simulador.integradores import (rk4, INTEGRADORES, pasos_rk4, pasos_fijos, pasos_dormand_prince,
+                                   interpolante_hermite, localizar_evento)
+from simulador import analitico, perfil
+from simulador.trayectoria import Trayectoria
+
+def vector(p1, p2):
+    return np.array([p2[0] - p1[0], p2[1] - p1[1]])
+
+def angulo_entre(v1, v2):
+    v1_u = v1 / np.linalg.norm(v1)
+    v2_u = v2 / np.linalg.norm(v2)
+    dot = np.dot(v1_u, v2_u)
+    return np.arccos(dot)
+
+def tramo_recto(t, estado, F):
+    x, y, v, theta = estado
+    a_real = F / M
+    dx = v * np.cos(theta)
+    dy = v * np.sin(theta)
+    dv = a_real
+    dtheta = 0
+    return np.array([dx, dy, dv, dtheta])
+
+def tramo_recto_exponencial(t, estado, F, v_ref=60):
+    # Modelo de Trayectoria_2_42_final_forzada.py: la fuerza cae con la velocidad
+    x, y, v, theta = estado
+    F_real = np.clip(F * np.exp(-v / v_ref), -F_max, F_max)
+    a = F_real / M
+    dx = v * np.cos(theta)
+    dy = v * np.sin(theta)
+    dv = a
+    dtheta = 0
+    return np.array([dx, dy, dv, dtheta])
+
+def tramo_curva(t, estado, radio, _):
+    x, y, v, theta = estado
+    omega = v / radio
+    dx = v * np.cos(theta)
+    dy = v * np.sin(theta)
+    dv = 0
+    dtheta = omega
+    return np.array([dx, dy, dv, dtheta])
+
+# --- Eventos de fin de tramo: g(t, estado) se dispara al pasar de < 0 a >= 0 ---
+def evento_distancia(x0, y0, distancia_objetivo):
+    def g(t, estado):
+        return np.hypot(estado[0] - x0, estado[1] - y0) - distancia_objetivo
+    return g
+
+def evento_angulo(theta0, angulo_objetivo):
+    def g(t, estado):
+        return abs(estado[3] - theta0) - angulo_objetivo
+    return g
+
+def evento_velocidad(v_objetivo, frenando=True):
+    def g(t, estado):
+        return v_objetivo - estado[2] if frenando else estado[2] - v_objetivo
+    return g
+
+def _pasos(f, t, estado, dt, args, metodo, rtol, atol, h_max, limite, estadisticas):
+    if metodo == "rk4":
+        return pasos_rk4(f, t, estado, dt, args, estadisticas)
+    if metodo == "rk45":
+        return pasos_dormand_prince(f, t, estado, dt, args, rtol, atol, h_max, limite, estadisticas)
+    if metodo in INTEGRADORES and not INTEGRADORES[metodo].segundo_orden:
+        return pasos_fijos(INTEGRADORES[metodo].paso, f, t, estado, dt, args, estadisticas)
+    raise ValueError(f"Método de integración desconocido: {metodo}")
+
+def _resultado(trayectoria, tipo, inicio, estado_inicial, t_inicial, estado, t, radio=None):
+    """
+    Cierra el tramo en la trayectoria y arma la tupla que devuelven los
+    simular_tramo_*, con vistas de las columnas en lugar de listas. Los tiempos
+    son los del comienzo de cada paso, como siempre devolvieron.
+    """
+    inicio = trayectoria.cerrar_tramo(tipo, inicio, estado_inicial, t_inicial, radio)
+    columna = lambda nombre: trayectoria.columna(nombre, inicio)
+    tiempos = np.concatenate(([t_inicial], columna("t")))[:-1]
+    acc_tangencial, acc_centripeta = columna("a_t"), columna("a_c")
+    aceleraciones = acc_tangencial if tipo == "recta" else acc_centripeta
+    return (estado, columna("x"), columna("y"), columna("v"), aceleraciones, columna("F"),
+            tiempos, t, acc_tangencial, acc_centripeta)
+
+def _muestras_analiticas(trayectoria, estado_inicial, t_salida, dt, t_inicial, estado_en):
+    # Muestras cada dt (y la última justo en la salida), igual que los pasos de
+    # rk4, filtradas por la política de registro de la trayectoria
+    n = int(np.ceil(t_salida / dt - 1e-9)) if t_salida > 0 else 0
+    transcurrido = trayectoria.registro.tiempos(np.minimum(np.arange(1, n + 1) * dt, t_salida))
+    n = len(transcurrido)
+    # Con al_llenar se escribe de a un arreglo lleno por vez, para poder vaciarlo entre partes
+    parte = trayectoria.capacidad if trayectoria.al_llenar is not None else max(n, 1)
+    for i in range(0, n, parte):
+        muestras = transcurrido[i:i + parte]
+        bloque = trayectoria.reservar(len(muestras))
+        bloque[:, 0] = t_inicial + muestras
+        bloque[:, 1:5] = estado_en(muestras)
+    return bloque[-1, 1:5].copy() if n else estado_inicial.copy()
+
+def _simular_recta_analitica(estado_inicial, distancia_objetivo, F, dt, t_inicial, trayectoria):
+    t_salida = analitico.tiempo_salida_recta(estado_inicial[2], F, max(distancia_objetivo, 0))
+    if np.isnan(t_salida):
+        raise ValueError("El auto se detuvo antes de completar el tramo recto")
+    inicio = trayectoria.abrir_tramo(t_inicial, estado_inicial, "recta")
+    muestrear = perfil.cronometrar("integrar", _muestras_analiticas)
+    estado = muestrear(trayectoria, estado_inicial, t_salida, dt, t_inicial,
+                       lambda s: analitico.estado_recta(estado_inicial, F, s))
+    cerrar = perfil.cronometrar("posproceso", _resultado)
+    return cerrar(trayectoria, "recta", inicio, estado_inicial, t_inicial, estado, t_inicial + t_salida)
+
+def _simular_curva_analitica(estado_inicial, radio, angulo_objetivo, dt, t_inicial, trayectoria):
+    t_salida = analitico.tiempo_salida_curva(estado_inicial[2], radio, max(angulo_objetivo, 0))
+    inicio = trayectoria.abrir_tramo(t_inicial, estado_inicial, "curva", radio)
+    muestrear = perfil.cronometrar("integrar", _muestras_analiticas)
+    estado = muestrear(trayectoria, estado_inicial, t_salida, dt, t_inicial,
+                       lambda s: analitico.estado_curva(estado_inicial, radio, s))
+    cerrar = perfil.cronometrar("posproceso", _resultado)
+    return cerrar(trayectoria, "curva", inicio, estado_inicial, t_inicial, estado, t_inicial + t_salida, radio)
+
+def en_distancia(dinamica):
+    """
+    Pasa una dinámica en el tiempo a la longitud de arco s como variable
+    independiente: el estado se extiende con el tiempo, [x, y, v, theta, t],
+    y d/ds = (d/dt) / v (dv/ds = a / v, dt/ds = 1 / v).
+    """
+    def f(s, estado, *args):
+        derivadas = np.empty(5)
+        derivadas[:4] = dinamica(estado[4], estado[:4], *args)
+        derivadas[4] = 1.0
+        return derivadas / estado[2]
+    return f
+
+def _simular_en_distancia(tipo, dinamica, args, estado_inicial, longitud, ds, t_inicial, trayectoria,
+                          radio=None):
+    # Grilla fija en s: n pasos de largo longitud / n, sin control de llegada
+    n = int(np.ceil(longitud / ds - 1e-9)) if longitud > 0 else 0
+    h = longitud / n if n else 0.0
+    dinamica = perfil.contar(dinamica)
+    f = en_distancia(dinamica)
+    paso = perfil.cronometrar("integrar", rk4, paso=True)
+    agregar = perfil.cronometrar("registrar", trayectoria.agregar)
+    estado = np.append(estado_inicial, t_inicial)
+    inicio = trayectoria.abrir_tramo(t_inicial, estado_inicial, tipo, radio)
+    for i in range(n):
+        anterior = estado
+        estado = paso(f, i * h, estado, h, *args)
+        if not estado[2] > 0:
+            raise ValueError("El auto se detuvo antes de completar el tramo recto")
+        # Salida densa en el tiempo (Hermite con la dinámica en los extremos)
+        estado_en = interpolante_hermite(dinamica, args, anterior[4], anterior[:4], estado[4], estado[:4])
+        agregar(estado[4], estado[:4], estado_en)
+    cerrar = perfil.cronometrar("posproceso", _resultado)
+    return cerrar(trayectoria, tipo, inicio, estado_inicial, t_inicial, estado[:4].copy(), estado[4], radio)
+
+def _avanzar(pasos, t, estado, eventos, exacto):
+    """
+    Da un paso y, si en él se dispara algún evento, lo recorta para terminar
+    justo sobre el evento (o lo deja pasar si exacto=False).
+
+    Retorna:
+    (t_siguiente, estado, h, terminado, estado_en), con estado_en la salida
+    densa del paso (válida hasta t_siguiente)
+    """
+    t_siguiente, estado_nuevo, h, estado_en = next(pasos)
+    if not exacto:
+        terminado = any(g(t_siguiente, estado_nuevo) >= 0 for g in eventos)
+        return t_siguiente, estado_nuevo, h, terminado, estado_en
+
+    evento = localizar_evento(eventos, t, estado, t_siguiente, estado_nuevo, estado_en)
+    if evento is None:
+        return t_siguiente, estado_nuevo, h, False, estado_en
+    t_evento, estado_evento, _ = evento
+    return t_evento, estado_evento, t_evento - t, True, estado_en
+
+def simular_tramo_recto(estado_inicial, distancia_objetivo, F, dt, t_inicial,
+                        metodo="auto", rtol=1e-6, atol=1e-9, h_max=np.inf, estadisticas=None,
+                        eventos=(), exacto=True, dinamica=tramo_recto, trayectoria=None, ds=0.1):
+    """
+    Simula un tramo recto con fuerza F hasta recorrer distancia_objetivo.
+    dinamica es el modelo de fuerza (tramo_recto con F constante por defecto,
+    o por ejemplo tramo_recto_exponencial).
+
+    Con metodo="analitico" se usa la solución exacta del movimiento
+    uniformemente acelerado, muestreada cada dt; metodo="auto" (por defecto)
+    la elige cuando la dinámica es tramo_recto y no hay eventos extra, y si no
+    integra con rk4. Con metodo="rk4" avanza con paso fijo dt (también sirven
+    "euler" y "heun" de INTEGRADORES); con metodo="rk45" usa
+    Dormand-Prince con paso adaptativo (dt es el primer paso de prueba) y
+    cada paso se acota al doble del tiempo que falta para el final de la recta,
+    para que un paso largo no cruce el objetivo y vuelva (frenando a fondo).
+    Si se pasa un diccionario en estadisticas, se acumulan ahí los pasos
+    aceptados y rechazados.
+
+    El tramo termina al alcanzar la distancia o al dispararse cualquiera de los
+    eventos extra (por ejemplo evento_velocidad). Con exacto=True el último paso
+    se recorta sobre la raíz del evento en la salida densa del paso, así que el
+    tramo termina justo en el objetivo; con exacto=False se pasa de largo hasta
+    un paso como antes.
+
+    Con metodo="distancia" se integra con rk4 en la longitud de arco (ver
+    en_distancia) sobre una grilla fija de paso ds, ajustado para que la
+    recta tenga un número entero de pasos: termina justo en su longitud sin
+    buscar la llegada, y dos corridas con distintas fuerzas quedan muestreadas
+    en las mismas distancias. No admite eventos extra.
+
+    Las muestras se escriben en trayectoria (una Trayectoria compartida por
+    toda la vuelta, o una nueva si no se pasa) y las columnas devueltas son
+    vistas de ese tramo.
+    """
+    if trayectoria is None:
+        trayectoria = Trayectoria()
+    if metodo == "auto":
+        metodo = "analitico" if dinamica is tramo_recto and not eventos else "rk4"
+    with perfil.tramo("recta", metodo, trayectoria):
+        if metodo == "analitico":
+            return _simular_recta_analitica(estado_inicial, distancia_objetivo, F, dt, t_inicial, trayectoria)
+        if metodo == "distancia":
+            if eventos:
+                raise ValueError("metodo='distancia' no admite eventos extra")
+            return _simular_en_distancia("recta", dinamica, (F,), estado_inicial, distancia_objetivo, ds,
+                                         t_inicial, trayectoria)
+
+        estado = estado_inicial.copy()
+        x0, y0 = estado[0], estado[1]
+        inicio = trayectoria.abrir_tramo(t_inicial, estado_inicial, "recta")
+        t = t_inicial
+
+        def limite(t, estado):
+            restante = distancia_objetivo - np.hypot(estado[0] - x0, estado[1] - y0)
+            return max(2 * restante / max(estado[2], 1e-9), 1e-9)
+
+        eventos = [perfil.cronometrar("eventos", g)
+                   for g in (evento_distancia(x0, y0, distancia_objetivo), *eventos)]
+        pasos = _pasos(perfil.contar(dinamica), t, estado, dt, (F,), metodo, rtol, atol, h_max, limite,
+                       estadisticas)
+        avanzar = perfil.cronometrar("integrar", _avanzar, paso=True)
+        agregar = perfil.cronometrar("registrar", trayectoria.agregar)
+        cerrar = perfil.cronometrar("posproceso", _resultado)
+        terminado = distancia_objetivo <= 0
+
+        while not terminado:
+            t, estado, h, terminado, estado_en = avanzar(pasos, t, estado, eventos, exacto)
+            agregar(t, estado, estado_en)
+
+            if estado[2] <= 0 and not terminado:
+                raise ValueError("El auto se detuvo antes de completar el tramo recto")
+
+        return cerrar(trayectoria, "recta", inicio, estado_inicial, t_inicial, estado, t)
+
+def simular_tramo_curva(estado_inicial, radio, angulo_objetivo, dt, t_inicial,
+                        metodo="auto", rtol=1e-6, atol=1e-9, h_max=np.inf, estadisticas=None,
+                        eventos=(), exacto=True, trayectoria=None, ds=0.1):
+    """
+    Simula una curva de radio constante hasta girar angulo_objetivo. Los
+    parámetros metodo, rtol, atol, h_max, estadisticas, eventos, exacto,
+    trayectoria y ds son los mismos que en simular_tramo_recto; la curva a
+    velocidad constante es un arco de circunferencia, así que "auto" usa la
+    solución exacta salvo que haya eventos extra.
+    """
+    if trayectoria is None:
+        trayectoria = Trayectoria()
+    if metodo == "auto":
+        metodo = "rk4" if eventos else "analitico"
+    with perfil.tramo("curva", metodo, trayectoria):
+        if metodo == "analitico":
+            return _simular_curva_analitica(estado_inicial, radio, angulo_objetivo, dt, t_inicial,
+                                            trayectoria)
+        if metodo == "distancia":
+            if eventos:
+                raise ValueError("metodo='distancia' no admite eventos extra")
+            return _simular_en_distancia("curva", tramo_curva, (radio, estado_inicial[2]), estado_inicial,
+                                         radio * angulo_objetivo, ds, t_inicial, trayectoria, radio)
+
+        estado = estado_inicial.copy()
+        theta0 = estado[3]
+        inicio = trayectoria.abrir_tramo(t_inicial, estado_inicial, "curva", radio)
+        t = t_inicial
+
+        def limite(t, estado):
+            restante = angulo_objetivo - abs(estado[3] - theta0)
+            return max(2 * restante * radio / max(estado[2], 1e-9), 1e-9)
+
+        args = (radio, estado[2])
+        eventos = [perfil.cronometrar("eventos", g)
+                   for g in (evento_angulo(theta0, angulo_objetivo), *eventos)]
+        pasos = _pasos(perfil.contar(tramo_curva), t, estado, dt, args, metodo, rtol, atol, h_max, limite,
+                       estadisticas)
+        avanzar = perfil.cronometrar("integrar", _avanzar, paso=True)
+        agregar = perfil.cronometrar("registrar", trayectoria.agregar)
+        cerrar = perfil.cronometrar("posproceso", _resultado)
+        terminado = angulo_objetivo <= 0
+
+        while not terminado:
+            t, estado, h, terminado, estado_en = avanzar(pasos, t, estado, eventos, exacto)
+            agregar(t, estado, estado_en)
+
+        return cerrar(trayectoria, "curva", inicio, estado_inicial, t_inicial, estado, t, radio)
@@ -0,0 +1,373 @@
+import numpy as np
+
+from simulador.constantes import M
+
+# Columnas de cada muestra: tiempo, estado [x, y, v, theta], aceleraciones
+# tangencial y centrípeta y fuerza aplicada
+COLUMNAS = ("t", "x", "y", "v", "theta", "a_t", "a_c", "F")
+_INDICE = {nombre: i for i, nombre in enumerate(COLUMNAS)}
+
+class RegistroCompleto:
+    """
+    Política de registro: decide qué pasos de cada tramo se guardan en la
+    Trayectoria. Esta guarda todos; las subclases guardan menos, pero
+    siempre el estado con que termina cada tramo.
+
+    abrir(t, estado) se llama al empezar un tramo, paso(...) tras cada paso
+    integrado (con estado_en, la salida densa del paso, si el integrador la
+    tiene) y cerrar(...) al terminarlo. Los tramos analíticos no tienen
+    pasos: eligen sus instantes de muestreo con tiempos(transcurrido).
+    """
+
+    def abrir(self, t, estado):
+        pass
+
+    def paso(self, trayectoria, t, estado, estado_en=None):
+        trayectoria.escribir(t, estado)
+
+    def cerrar(self, trayectoria):
+        pass
+
+    def tiempos(self, transcurrido):
+        return transcurrido
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+class RegistroDecimado(RegistroCompleto):
+    """
+    Guarda uno de cada k pasos y el último de cada tramo.
+    """
+
+    def __init__(self, k):
+        self.k = k
+        self._contador = 0
+        self._pendiente = None
+
+    def __repr__(self):
+        return f"RegistroDecimado({self.k})"
+
+    def abrir(self, t, estado):
+        self._contador = 0
+        self._pendiente = None
+
+    def paso(self, trayectoria, t, estado, estado_en=None):
+        self._contador += 1
+        if self._contador % self.k == 0:
+            trayectoria.escribir(t, estado)
+            self._pendiente = None
+        else:
+            self._pendiente = (t, np.array(estado, dtype=float))
+
+    def cerrar(self, trayectoria):
+        if self._pendiente is not None:
+            trayectoria.escribir(*self._pendiente)
+            self._pendiente = None
+
+    def tiempos(self, transcurrido):
+        elegidos = transcurrido[self.k - 1::self.k]
+        if len(transcurrido) % self.k:
+            elegidos = np.append(elegidos, transcurrido[-1])
+        return elegidos
+
+class RegistroIntervalo(RegistroCompleto):
+    """
+    Guarda muestras cada `intervalo` segundos desde el comienzo de cada tramo,
+    evaluadas en la salida densa del paso que las contiene (linealmente entre
+    pasos si no la hay), y el último estado del tramo.
+    """
+
+    def __init__(self, intervalo):
+        self.intervalo = intervalo
+        self._previo = None
+        self._siguiente = None
+        self._pendiente = None
+
+    def __repr__(self):
+        return f"RegistroIntervalo({self.intervalo!r})"
+
+    def abrir(self, t, estado):
+        self._previo = (t, np.array(estado, dtype=float))
+        self._siguiente = t + self.intervalo
+        self._pendiente = None
+
+    def paso(self, trayectoria, t, estado, estado_en=None):
+        t0, estado0 = self._previo
+        estado = np.array(estado, dtype=float)
+        tolerancia = 1e-9 * self.intervalo
+        while self._siguiente <= t + tolerancia:
+            if estado_en is None:
+                peso = (self._siguiente - t0) / (t - t0)
+                trayectoria.escribir(self._siguiente, estado0 + peso * (estado - estado0))
+            else:
+                # La salida densa puede traer más componentes (por ejemplo sensibilidades)
+                trayectoria.escribir(self._siguiente, estado_en(min(self._siguiente, t))[:4])
+            self._siguiente += self.intervalo
+        self._previo = (t, estado)
+        # El último paso se guarda al cerrar si no cayó justo sobre una muestra
+        self._pendiente = None if abs(self._siguiente - self.intervalo - t) <= tolerancia else (t, estado)
+
+    def cerrar(self, trayectoria):
+        if self._pendiente is not None:
+            trayectoria.escribir(*self._pendiente)
+            self._pendiente = None
+
+    def tiempos(self, transcurrido):
+        if not len(transcurrido):
+            return transcurrido
+        final = transcurrido[-1]
+        grilla = np.arange(1, int(np.floor(final / self.intervalo * (1 + 1e-12))) + 1) * self.intervalo
+        grilla = grilla[final - grilla > 1e-9 * self.intervalo]
+        return np.append(grilla, final)
+
+class RegistroEventos(RegistroCompleto):
+    """
+    Sólo guarda eventos: los picos de velocidad dentro de cada tramo (máximos
+    y mínimos locales, ubicados sobre la salida densa de los pasos) y la
+    salida del tramo, que es la raíz de su evento de llegada (o de un evento
+    extra como evento_velocidad). La entrada de cada tramo es la salida del
+    anterior y la de la vuelta es su estado inicial, así que las filas no
+    dependen del integrador.
+
+    Los picos de fuerza no se buscan aparte: en los modelos de tramos la
+    fuerza es constante o monótona en la velocidad, así que sus extremos
+    están en la entrada o la salida del tramo o en un pico de velocidad.
+    """
+
+    def __init__(self):
+        self._abrir(None, None)
+
+    def _abrir(self, t, estado):
+        self._picos = []
+        self._ultimo = None
+        # Los dos últimos pasos (t, estado, estado_en) y el signo de dv en el último
+        self._previos = [(t, estado, None)]
+        self._signo = 0
+
+    def abrir(self, t, estado):
+        self._abrir(t, np.array(estado, dtype=float))
+
+    def paso(self, trayectoria, t, estado, estado_en=None):
+        estado = np.array(estado, dtype=float)
+        t_previo, estado_previo, _ = self._previos[-1]
+        dv = estado[2] - estado_previo[2]
+        signo = 0 if abs(dv) <= 1e-12 * max(1.0, abs(estado[2])) else np.sign(dv)
+        if signo and self._signo and signo != self._signo:
+            # La velocidad cambió de sentido: hay un pico en los dos últimos pasos
+            self._picos.append(self._pico(self._previos[0], self._previos[-1], (t, estado, estado_en),
+                                          self._signo))
+        if signo:
+            self._signo = signo
+        self._previos = [self._previos[-1], (t, estado, estado_en)]
+        self._ultimo = (t, estado)
+
+    def _pico(self, inicio, medio, fin, signo, iteraciones=60):
+        # Sección áurea sobre la salida densa de los dos pasos (sin ella, el paso del medio)
+        if medio[2] is None or fin[2] is None or inicio[0] is None:
+            return medio[0], medio[1]
+
+        def estado_en(t):
+            return np.asarray(medio[2](t) if t <= medio[0] else fin[2](t))[:4]
+
+        a, b = inicio[0], fin[0]
+        razon = (np.sqrt(5) - 1) / 2
+        c, d = b - razon * (b - a), a + razon * (b - a)
+        vc, vd = signo * estado_en(c)[2], signo * estado_en(d)[2]
+        for _ in range(iteraciones):
+            if vc > vd:
+                b, d, vd = d, c, vc
+                c = b - razon * (b - a)
+                vc = signo * estado_en(c)[2]
+            else:
+                a, c, vc = c, d, vd
+                d = a + razon * (b - a)
+                vd = signo * estado_en(d)[2]
+        t = (a + b) / 2
+        return t, estado_en(t)
+
+    def cerrar(self, trayectoria):
+        if self._ultimo is not None:
+            for muestra in self._picos:
+                if muestra[0] < self._ultimo[0]:
+                    trayectoria.escribir(*muestra)
+            trayectoria.escribir(*self._ultimo)
+        self._abrir(None, None)
+
+    def tiempos(self, transcurrido):
+        # Los tramos analíticos (fuerza constante, curva a velocidad constante)
+        # tienen velocidad monótona: no hay picos dentro del tramo
+        return transcurrido[-1:]
+
+class Trayectoria:
+    """
+    Registro de muestras de una simulación en un único arreglo (n, 8)
+    preasignado que crece al doble cuando se llena. Los tramos escriben el
+    tiempo y el estado de cada paso; las aceleraciones y la fuerza se calculan
+    al cerrar cada tramo con np.diff, sin listas intermedias.
+
+    Uso:
+    trayectoria = Trayectoria()
+    simular_tramo_recto(estado, distancia, F, dt, t, trayectoria=trayectoria)
+    trayectoria["x"], trayectoria["v"], trayectoria.tramos, ...
+
+    registro es la política que decide qué pasos se guardan (RegistroCompleto
+    por defecto, RegistroDecimado, RegistroIntervalo o RegistroEventos). Con
+    menos filas, a_t sale de las diferencias entre muestras guardadas: es la
+    aceleración media entre ellas.
+
+    Si se da al_llenar(trayectoria, listas), se llama cuando el arreglo se
+    llena, antes de agrandarlo: las primeras `listas` filas ya tienen sus
+    columnas derivadas (también las del tramo en curso, si se abrió con su
+    tipo) y se pueden entregar y descartar. Así la memoria queda acotada
+    aunque un tramo tenga muchas más filas que la capacidad.
+    """
+
+    def __init__(self, capacidad=1024, registro=None, al_llenar=None):
+        self._datos = np.empty((max(capacidad, 1), len(COLUMNAS)))
+        self._n = 0
+        # (tipo, inicio, fin) de cada tramo cerrado
+        self.tramos = []
+        self.registro = RegistroCompleto() if registro is None else registro
+        self.al_llenar = al_llenar
+        # Filas quitadas con descartar desde que se creó
+        self.descartadas = 0
+        # [tipo, radio, inicio, primera fila sin completar, v y t de la fila
+        # anterior] del tramo en curso
+        self._abierto = None
+
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, nombre):
+        return self._datos[:self._n, _INDICE[nombre]]
+
+    @property
+    def datos(self):
+        return self._datos[:self._n]
+
+    @property
+    def capacidad(self):
+        return len(self._datos)
+
+    def _asegurar(self, n):
+        if self._n + n > len(self._datos) and self.al_llenar is not None:
+            self._vaciar()
+        necesario = self._n + n
+        if necesario > len(self._datos):
+            nuevos = np.empty((max(necesario, 2 * len(self._datos)), len(COLUMNAS)))
+            nuevos[:self._n] = self._datos[:self._n]
+            self._datos = nuevos
+
+    def _vaciar(self):
+        # Sin el tipo del tramo en curso sus filas no se pueden completar todavía
+        listas = self._n
+        if self._abierto is not None:
+            if self._abierto[0] is None:
+                listas = self._abierto[3]
+            else:
+                self._completar(self._n)
+        self.al_llenar(self, listas)
+
+    def abrir_tramo(self, t, estado, tipo=None, radio=None):
+        """
+        Avisa a la política de registro que empieza un tramo y devuelve la
+        fila donde empiezan sus muestras. Con tipo (y radio si es una curva)
+        las filas del tramo se pueden completar y entregar a al_llenar antes
+        de cerrarlo.
+        """
+        self.registro.abrir(t, estado)
+        self._abierto = [tipo, radio, self._n, self._n, estado[2], t]
+        return self._n
+
+    def agregar(self, t, estado, estado_en=None):
+        """
+        Entrega un paso (y su salida densa, si la hay) a la política de
+        registro, que decide qué se guarda.
+        """
+        self.registro.paso(self, t, estado, estado_en)
+
+    def escribir(self, t, estado):
+        if self._n == len(self._datos):
+            self._asegurar(1)
+        fila = self._datos[self._n]
+        fila[0] = t
+        fila[1:5] = estado
+        self._n += 1
+
+    def reservar(self, n):
+        """
+        Reserva n filas al final y devuelve la vista para escribirlas.
+        """
+        self._asegurar(n)
+        vista = self._datos[self._n:self._n + n]
+        self._n += n
+        return vista
+
+    def columna(self, nombre, inicio=0, fin=None):
+        fin = self._n if fin is None else fin
+        return self._datos[inicio:fin, _INDICE[nombre]]
+
+    def _completar(self, fin):
+        tipo, radio, _, desde, v_anterior, t_anterior = self._abierto
+        tramo = self._datos[desde:fin]
+        if tipo == "recta":
+            dv = np.diff(tramo[:, 3], prepend=v_anterior)
+            dt = np.diff(tramo[:, 0], prepend=t_anterior)
+            tramo[:, 5] = dv / dt
+            tramo[:, 6] = 0
+            tramo[:, 7] = M * tramo[:, 5]
+        else:
+            tramo[:, 5] = 0
+            tramo[:, 6] = tramo[:, 3] ** 2 / radio
+            tramo[:, 7] = 0
+        if len(tramo):
+            self._abierto[3:] = [fin, tramo[-1, 3], tramo[-1, 0]]
+
+    def cerrar_tramo(self, tipo, inicio, estado_inicial, t_inicial, radio=None):
+        """
+        Completa las columnas derivadas de las filas escritas desde inicio
+        (las que no se completaron antes para al_llenar): en una recta
+        a_t = dv/dt (con np.diff desde el estado de entrada) y F = M * a_t; en
+        una curva a_c = v² / radio. Devuelve la fila donde empiezan las
+        muestras del tramo que siguen en el arreglo.
+        """
+        self.registro.cerrar(self)
+        if self._abierto is None:
+            self._abierto = [tipo, radio, inicio, inicio, estado_inicial[2], t_inicial]
+        self._abierto[:2] = [tipo, radio]
+        self._completar(self._n)
+        inicio = self._abierto[2]
+        self._abierto = None
+        self.tramos.append((tipo, inicio, self._n))
+        return inicio
+
+    def extender(self, otra):
+        """
+        Agrega al final las filas y los tramos de otra Trayectoria.
+        """
+        inicio = self._n
+        self.reservar(len(otra))[:] = otra.datos
+        self.tramos.extend((tipo, a + inicio, b + inicio) for tipo, a, b in otra.tramos)
+
+    def descartar(self, n):
+        """
+        Quita las primeras n filas (ya entregadas, por ejemplo a un archivo) y
+        corre el resto al comienzo del arreglo sin cambiar la capacidad. Los
+        tramos que quedan se renumeran y los que terminaban antes se olvidan.
+        """
+        n = min(n, self._n)
+        resto = self._n - n
+        self._datos[:resto] = self._datos[n:self._n]
+        self._n = resto
+        self.descartadas += n
+        self.tramos = [(tipo, max(inicio - n, 0), fin - n)
+                       for tipo, inicio, fin in self.tramos if fin > n]
+        if self._abierto is not None:
+            self._abierto[2] = max(self._abierto[2] - n, 0)
+            self._abierto[3] = max(self._abierto[3] - n, 0)
+
+    def compactar(self):
+        """
+        Libera la capacidad sobrante una vez terminada la simulación.
+        """
+        self._datos = self._datos[:self._n].copy()
@@ -0,0 +1,89 @@
+import numpy as np
+
+from simulador.constantes import dt
+from simulador.tramos import simular_tramo_recto, simular_tramo_curva, tramo_recto, tramo_recto_exponencial
+from simulador.trayectoria import Trayectoria
+from simulador.pista import Recta, pista_por_defecto, entrada_recta
+
+# Modelos de fuerza que puede pedir una recta de la pista
+MODELOS = {"constante": tramo_recto, "exponencial": tramo_recto_exponencial}
+
+def simular_pista(pista, fuerzas=None, radios=None, v0=None, dt=dt, trayectoria=None, cache=None,
+                  registro=None, **opciones):
+    """
+    Recorre los tramos de una pista compilada.
+
+    Parámetros:
+    pista: Pista compilada (ver simulador.pista)
+    fuerzas: Fuerza de cada recta, en orden; por defecto las de la pista
+    radios: Radio de cada curva, en orden; por defecto los de la pista
+    v0: Velocidad inicial; por defecto la de la pista
+    dt: Paso temporal
+    trayectoria: Trayectoria donde escribir las muestras (se crea si no se pasa)
+    cache: CacheTramos opcional; los tramos con la misma entrada se reusan
+    registro: Política de registro de la Trayectoria nueva (ver simulador.trayectoria)
+    opciones: Argumentos extra para simular_tramo_* (metodo, rtol, ...)
+
+    Retorna:
+    estado: Estado final
+    t_actual: Tiempo total de la vuelta
+    trayectoria: Trayectoria con todas las muestras de la vuelta
+    """
+    if trayectoria is None:
+        trayectoria = Trayectoria(registro=registro)
+    v0 = pista.v0 if v0 is None else v0
+    estado = np.array([*pista.inicio, v0, pista.rumbo_inicial])
+    t_actual = 0.0
+    for estado, t_actual in recorrer_tramos(pista, estado, t_actual, fuerzas, radios, dt, trayectoria,
+                                            cache, **opciones):
+        pass
+    return estado, t_actual, trayectoria
+
+def recorrer_tramos(pista, estado, t_actual, fuerzas=None, radios=None, dt=dt, trayectoria=None,
+                    cache=None, **opciones):
+    """
+    Generador que simula los tramos de la pista uno por uno desde estado y
+    t_actual, escribiendo las muestras en trayectoria, y entrega
+    (estado, t_actual) al terminar cada tramo. Los parámetros son los de
+    simular_pista.
+    """
+    fuerzas = iter(fuerzas if fuerzas is not None else [r.fuerza for r in pista.rectas])
+    radios = iter(radios if radios is not None else [c.radio for c in pista.curvas])
+
+    for tramo in pista.tramos:
+        parametro = next(fuerzas) if isinstance(tramo, Recta) else next(radios)
+        estado, t_actual = simular_tramo_pista(tramo, parametro, estado, t_actual, dt, trayectoria, cache,
+                                               **opciones)
+        yield estado, t_actual
+
+def simular_tramo_pista(tramo, parametro, estado, t_actual, dt=dt, trayectoria=None, cache=None, **opciones):
+    """
+    Simula un tramo de una pista compilada desde estado y t_actual: una Recta
+    con fuerza parametro (primero se orienta el rumbo según la recta) o una
+    Curva con radio parametro.
+
+    Retorna:
+    (estado, t_actual) a la salida del tramo
+    """
+    estado = estado.copy()
+    if isinstance(tramo, Recta):
+        simular_recta = simular_tramo_recto if cache is None else cache.simular_tramo_recto
+        estado[3], distancia = entrada_recta(tramo, estado[0], estado[1], estado[3])
+        estado, *_, t_actual, _, _ = simular_recta(
+            estado, distancia, parametro, dt, t_actual, trayectoria=trayectoria,
+            dinamica=MODELOS[tramo.modelo], **opciones)
+    else:
+        simular_curva = simular_tramo_curva if cache is None else cache.simular_tramo_curva
+        estado, *_, t_actual, _, _ = simular_curva(
+            estado, parametro, tramo.angulo, dt, t_actual, trayectoria=trayectoria, **opciones)
+    return estado, t_actual
+
+def simular_vuelta(f1, f2, f3, r1, r2, v0=50.0, dt=dt, trayectoria=None, cache=None, registro=None,
+                   **opciones):
+    """
+    Simula la vuelta de tp_completo.py (recta inicial, curva 1, recta 2,
+    curva 2 y recta final hacia (x_fin3, y_fin3)) con las fuerzas y radios
+    dados. Devuelve lo mismo que simular_pista.
+    """
+    return simular_pista(pista_por_defecto(), (f1, f2, f3), (r1, r2), v0, dt, trayectoria, cache,
+                         registro, **opciones)
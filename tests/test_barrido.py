@@ -0,0 +1,31 @@
+import json
+
+import numpy as np
+import pytest
+
+from simulador.barrido import main
+
+def pista_larga(tmp_path):
+    # Cuatro rectas y tres curvas, todas con rumbo continuo
+    tramos = [{"tipo": "recta", "longitud": 20, "rumbo": "continuar", "fuerza": 0}]
+    for _ in range(3):
+        tramos += [{"tipo": "curva", "radio": 20, "angulo_grados": 30},
+                   {"tipo": "recta", "longitud": 20, "rumbo": "continuar", "fuerza": 0}]
+    ruta = tmp_path / "larga.json"
+    ruta.write_text(json.dumps({"nombre": "larga", "rumbo_inicial": 0, "v0": 30, "tramos": tramos}))
+    return str(ruta)
+
+def test_parametros_salen_de_la_pista(tmp_path, capsys):
+    salida = str(tmp_path / "tabla.csv")
+    main(["--pista", pista_larga(tmp_path), "--f4", "0,1000", "--r3", "15,20,25", "--procesos", "1",
+          "--salida", salida])
+    assert "6 vueltas" in capsys.readouterr().out
+    with open(salida) as archivo:
+        columnas = archivo.readline().strip().split(",")
+    assert columnas[:8] == ["f1", "f2", "f3", "f4", "r1", "r2", "r3", "v0"]
+    tabla = np.loadtxt(salida, delimiter=",", skiprows=1)
+    assert sorted(set(tabla[:, 3])) == [0, 1000] and sorted(set(tabla[:, 6])) == [15, 20, 25]
+
+def test_parametro_que_la_pista_no_tiene():
+    with pytest.raises(SystemExit):
+        main(["--f4", "0,1000", "--procesos", "1"])
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from simulador.cache import CacheTramos
+from simulador.pista import pista_por_defecto
+from simulador.tramos import evento_velocidad
+from simulador.trayectoria import Trayectoria
+from simulador.vuelta import simular_pista
+
+def vuelta(cache, **opciones):
+    trayectoria = Trayectoria()
+    estado, t_total, _ = simular_pista(pista_por_defecto(), trayectoria=trayectoria, cache=cache,
+                                       metodo="rk4", **opciones)
+    return estado, t_total, trayectoria
+
+def assert_vueltas_iguales(a, b):
+    assert np.array_equal(a[0], b[0]) and a[1] == b[1]
+    assert np.array_equal(a[2].datos, b[2].datos)
+    assert a[2].tramos == b[2].tramos
+
+def test_acierto_en_memoria_igual_a_fallo():
+    cache = CacheTramos()
+    fallo = vuelta(cache)
+    acierto = vuelta(cache)
+    assert cache.fallos == cache.aciertos == 5
+    assert_vueltas_iguales(fallo, acierto)
+    assert_vueltas_iguales(fallo, vuelta(None))
+
+def test_acierto_en_disco_igual_a_fallo(tmp_path):
+    fallo = vuelta(CacheTramos(directorio=str(tmp_path)))
+    cache = CacheTramos(directorio=str(tmp_path))
+    acierto = vuelta(cache)
+    assert cache.aciertos == 5 and cache.fallos == 0
+    assert_vueltas_iguales(fallo, acierto)
+
+def test_estadisticas_no_cambian_la_clave():
+    cache = CacheTramos()
+    estadisticas = {}
+    vuelta(cache, estadisticas=estadisticas)
+    assert estadisticas["aceptados"] > 0
+    vuelta(cache, estadisticas={"aceptados": 3})
+    assert cache.aciertos == 5
+
+def test_eventos_se_rechazan():
+    with pytest.raises(ValueError, match="eventos"):
+        vuelta(CacheTramos(), eventos=[evento_velocidad(10.0)])
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from simulador.cadena import CadenaVuelta
+from simulador.trayectoria import Trayectoria
+from simulador.vuelta import simular_vuelta
+
+def vuelta_nueva(parametros, metodo):
+    trayectoria = Trayectoria()
+    parametros = dict(parametros)
+    v0 = parametros.pop("v0")
+    estado, t_total, _ = simular_vuelta(*parametros.values(), v0=v0, trayectoria=trayectoria, metodo=metodo)
+    return estado, t_total, trayectoria
+
+@pytest.mark.parametrize("metodo", ["analitico", "rk4"])
+def test_cambios_recalculan_solo_los_tramos_siguientes(metodo):
+    cadena = CadenaVuelta(metodo=metodo)
+    cadena.actualizar()
+    assert cadena.recalculados == [0, 1, 2, 3, 4]
+    # (cambio, tramos que dependen de él)
+    for cambios, recalculados in [({"f3": 30000.0}, [4]), ({"r2": 4.5}, [3, 4]), ({"f2": -4200.0}, [2, 3, 4]),
+                                  ({"v0": 49.0}, [0, 1, 2, 3, 4]), ({"f3": 30000.0}, [])]:
+        estado, t_total, trayectoria = cadena.cambiar(**cambios)
+        assert cadena.recalculados == recalculados, cambios
+        estado_ref, t_ref, trayectoria_ref = vuelta_nueva(cadena.parametros(), metodo)
+        assert t_total == t_ref and np.array_equal(estado, estado_ref)
+        assert np.array_equal(trayectoria.datos, trayectoria_ref.datos)
+        assert trayectoria.tramos == trayectoria_ref.tramos
+    assert cadena.simulados == 5 + 1 + 2 + 3 + 5
+
+def test_parametro_desconocido():
+    with pytest.raises(ValueError):
+        CadenaVuelta().cambiar(f9=1.0)
@@ -0,0 +1,31 @@
+import numpy as np
+
+from simulador.constantes import g_max
+from simulador.cuasiestatico import resolver_cuasiestatico
+from simulador.mapa import linea_central, malla_linea_central
+from simulador.pista import pista_por_defecto
+
+def test_malla_linea_central_alterna_rectas_y_curvas():
+    malla = malla_linea_central(linea_central())
+    tipos = [malla.curvatura[malla.tramo == i].any() for i in range(malla.tramo.max() + 1)]
+    # tp_completo: recta, curva, recta, curva, recta
+    assert tipos == [False, True, False, True, False]
+    assert abs(malla.s[-1] - resolver_cuasiestatico()["malla"].s[-1]) < 0.02 * malla.s[-1]
+
+def test_cuasiestatico_con_linea_central():
+    resultado = resolver_cuasiestatico(linea=linea_central())
+    v_limite = np.sqrt(g_max / resultado["malla"].curvatura.max())
+    assert resultado["v"].min() <= v_limite + 1e-9
+    assert np.isfinite(resultado["t_total"]) and resultado["t_total"] > 0
+    assert resultado["v"][0] <= pista_por_defecto().v0
+
+def test_cuasiestatico_respeta_v0():
+    pista = pista_por_defecto()
+    resultado = resolver_cuasiestatico(pista)
+    assert resultado["factible"] and resultado["v"][0] == pista.v0
+
+def test_cuasiestatico_marca_entrada_imposible():
+    # A 200 m/s no alcanza la primera recta para frenar antes de la curva
+    resultado = resolver_cuasiestatico(v0=200.0)
+    assert not resultado["factible"]
+    assert resultado["v"][0] < 200.0
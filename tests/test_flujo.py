@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from simulador.flujo import leer_bloques, simular_en_bloques, volcar
+from simulador.pista import pista_por_defecto
+from simulador.tramos import simular_tramo_recto
+from simulador.trayectoria import RegistroDecimado, Trayectoria
+from simulador.vuelta import simular_pista
+
+@pytest.mark.parametrize("metodo", ["analitico", "rk4", "rk45", "distancia"])
+def test_bloques_iguales_a_la_vuelta_entera(metodo):
+    # Bloques de 50 filas: bastante menos que cada tramo
+    bloques = list(simular_en_bloques(pista_por_defecto(), tamano_bloque=50, metodo=metodo))
+    _, _, trayectoria = simular_pista(pista_por_defecto(), metodo=metodo)
+    assert all(len(b) == 50 for b in bloques[:-1]) and 0 < len(bloques[-1]) <= 50
+    assert np.array_equal(np.concatenate(bloques), trayectoria.datos)
+
+def test_al_llenar_acota_la_memoria_dentro_del_tramo():
+    entregadas = []
+
+    def vaciar(trayectoria, listas):
+        entregadas.append(trayectoria.datos[:listas].copy())
+        trayectoria.descartar(listas)
+
+    trayectoria = Trayectoria(capacidad=8, al_llenar=vaciar)
+    estado = np.array([0.0, 0.0, 50.0, 0.0])
+    simular_tramo_recto(estado, 30.0, -10000.0, 1e-3, 0.0, metodo="rk4", trayectoria=trayectoria)
+    completa = Trayectoria()
+    simular_tramo_recto(estado, 30.0, -10000.0, 1e-3, 0.0, metodo="rk4", trayectoria=completa)
+    assert trayectoria.capacidad == 8 and len(completa) > 100
+    assert np.array_equal(np.concatenate(entregadas + [trayectoria.datos]), completa.datos)
+
+@pytest.mark.parametrize("extension", [".npy", ".npz"])
+def test_volcar_y_leer_bloques(tmp_path, extension):
+    ruta = str(tmp_path / f"vuelta{extension}")
+    filas = volcar(simular_en_bloques(pista_por_defecto(), tamano_bloque=64, vueltas=2, metodo="rk4",
+                                      registro=RegistroDecimado(3)), ruta)
+    datos = np.concatenate(list(simular_en_bloques(pista_por_defecto(), tamano_bloque=1000, vueltas=2,
+                                                   metodo="rk4", registro=RegistroDecimado(3))))
+    leidos = leer_bloques(ruta)
+    assert filas == len(leidos) == len(datos)
+    assert np.array_equal(leidos, datos)
+    assert np.all(np.diff(leidos[:, 0]) > 0)
+
+def test_errores_llegan_al_consumidor():
+    with pytest.raises(ValueError, match="detuvo"):
+        list(simular_en_bloques(pista_por_defecto(), fuerzas=[-40000.0, 0.0, 0.0], tamano_bloque=16))
+
+def test_abandonar_el_generador_termina_el_hilo():
+    bloques = simular_en_bloques(pista_por_defecto(), tamano_bloque=8, metodo="rk4")
+    assert len(next(bloques)) == 8
+    bloques.close()
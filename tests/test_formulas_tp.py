@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from formulas_tp import (ACELERACION_MAX, dormand_prince_orden_superior, ecuacion_curvas, orden_convergencia,
+                         runge_kutta_4_orden_superior, runge_kutta_4_sistema)
+from simulador.perfil import perfilar
+
+def oscilador(t, y, u):
+    return -y
+
+def test_orden_rk4_oscilador():
+    # y'' = -y con y(0) = 1, y'(0) = 0: la solución es cos t
+    pasos = (0.1, 0.05, 0.025, 0.0125)
+    errores = [abs(runge_kutta_4_orden_superior(oscilador, 0, 1.0, 0.0, 5.0, h)[1][-1] - np.cos(5.0))
+               for h in pasos]
+    for p in np.log2(np.array(errores[:-1]) / errores[1:]):
+        assert abs(p - 4) < 0.2
+
+def test_orden_rk4_ecuacion_curvas():
+    _, ordenes = orden_convergencia(runge_kutta_4_orden_superior, ecuacion_curvas,
+                                    0.0, 0.0, 20 / 30, 5.0, 0.1, 30, ACELERACION_MAX, refinamientos=5)
+    for p in ordenes:
+        assert abs(p - 4) < 0.2
+
+def test_escalar_igual_que_sistema():
+    t, y, u = runge_kutta_4_orden_superior(oscilador, 0, 1.0, 0.0, 2.0, 0.1)
+    _, Y = runge_kutta_4_sistema(lambda t, Y: np.array([Y[1], -Y[0]]), 0, [1.0, 0.0], 2.0, 0.1)
+    assert y.shape == u.shape == t.shape
+    assert np.array_equal(y, Y[:, 0]) and np.array_equal(u, Y[:, 1])
+
+@pytest.mark.parametrize("y0", [[1.0, 0.5], np.array([[1.0], [0.5]])])
+def test_vector_resuelve_cada_coordenada(y0):
+    _, y, _ = runge_kutta_4_orden_superior(oscilador, 0, y0, 0.0, 2.0, 0.1)
+    _, y_escalar, _ = runge_kutta_4_orden_superior(oscilador, 0, 0.5, 0.0, 2.0, 0.1)
+    assert y.shape == (21, 2)
+    assert np.allclose(y[:, 1], y_escalar)
+
+def test_perfil_cuenta_las_evaluaciones():
+    with perfilar() as perfil:
+        t, _, _ = runge_kutta_4_orden_superior(oscilador, 0, 1.0, 0.0, 1.0, 0.1)
+    assert sum(perfil.llamadas.values()) == 4 * (len(t) - 1)
+
+def test_dormand_prince_termina_en_tf_con_arreglos():
+    t, y, u, estadisticas = dormand_prince_orden_superior(oscilador, 0.0, 1.0, 0.0, 5.0, 0.1)
+    assert all(isinstance(a, np.ndarray) for a in (t, y, u))
+    assert t[-1] == pytest.approx(5.0, abs=1e-12) and np.all(np.diff(t) > 0)
+    assert abs(y[-1] - np.cos(5.0)) < 1e-5
+    assert estadisticas["aceptados"] == len(t) - 1
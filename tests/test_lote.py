@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from simulador.constantes import M
+from simulador.lote import simular_pista_lote, simular_tramo_curva_lote, simular_tramo_recto_lote
+from simulador.mapa import campo_distancia
+from simulador.pista import pista_por_defecto
+from simulador.tramos import simular_tramo_curva, simular_tramo_recto
+from simulador.vuelta import simular_pista
+
+def grilla():
+    # Las filas comparten los primeros tramos: muchas tienen igual v0, f1 y r1
+    return np.meshgrid([-10400.0, -10200.0, -10000.0], [9.0, 9.5], [-4500.0, -4300.0],
+                       [4.0, 4.5], [30000.0, 40000.0, 47088.0], [49.0, 50.0], indexing="ij")
+
+@pytest.mark.parametrize("metodo", ["analitico", "rk4", "distancia"])
+def test_compartir_prefijos_no_cambia_resultados(metodo):
+    f1, r1, f2, r2, f3, v0 = grilla()
+    pista = pista_por_defecto()
+    campo = campo_distancia()
+    compartido = simular_pista_lote(pista, (f1, f2, f3), (r1, r2), v0, metodo=metodo, campo=campo)
+    separado = simular_pista_lote(pista, (f1, f2, f3), (r1, r2), v0, metodo=metodo, campo=campo,
+                                  compartir_prefijos=False)
+    assert compartido["tramos_simulados"] < separado["tramos_simulados"] == 5 * f1.size
+    for clave, valor in separado.items():
+        if clave == "tramos_simulados":
+            continue
+        assert np.array_equal(compartido[clave], valor, equal_nan=True), clave
+
+def test_masa_escala_las_fuerzas():
+    pista = pista_por_defecto()
+    masa = np.array([780.0, M, 850.0])
+    fuerzas = [r.fuerza for r in pista.rectas]
+    resultado = simular_pista_lote(pista, fuerzas, masa=masa)
+    for i, m in enumerate(masa):
+        # Con masa m la fuerza F acelera como F * M / m con la masa M del simulador
+        _, t_total, _ = simular_pista(pista, [F * M / m for F in fuerzas], metodo="analitico")
+        assert resultado["t_total"][i] == pytest.approx(t_total, rel=1e-12)
+    assert resultado["t_total"][1] == simular_pista_lote(pista, fuerzas)["t_total"][0]
+
+ESTADOS = np.array([[0.0, 0.0, 50.0, 0.3], [1.0, 2.0, 40.0, 1.0], [-3.0, 5.0, 20.0, -2.0]])
+
+# exacto sólo cambia el corte de rk4
+@pytest.mark.parametrize("metodo, exacto", [("analitico", True), ("rk4", True), ("rk4", False), ("distancia", True)])
+def test_tramos_lote_igual_a_escalares(metodo, exacto):
+    fuerzas, radios = np.array([-10000.0, 20000.0, 0.0]), np.array([9.0, 4.0, 15.0])
+    rectas = simular_tramo_recto_lote(ESTADOS, 30.0, fuerzas, 1e-2, 1.0, exacto=exacto, metodo=metodo)
+    curvas = simular_tramo_curva_lote(ESTADOS, radios, 1.2, 1e-2, 1.0, exacto=exacto, metodo=metodo)
+    for i, estado in enumerate(ESTADOS):
+        recta = simular_tramo_recto(estado, 30.0, fuerzas[i], 1e-2, 1.0, metodo=metodo, exacto=exacto)
+        curva = simular_tramo_curva(estado, radios[i], 1.2, 1e-2, 1.0, metodo=metodo, exacto=exacto)
+        assert np.allclose(rectas[0][i], recta[0], rtol=1e-9, atol=1e-9)
+        assert rectas[1][i] == pytest.approx(recta[7], abs=1e-9)
+        assert np.allclose(curvas[0][i], curva[0], rtol=1e-9, atol=1e-9)
+        assert curvas[1][i] == pytest.approx(curva[7], abs=1e-9)
+
+@pytest.mark.parametrize("metodo", ["analitico", "rk4", "distancia"])
+def test_pista_lote_igual_a_simular_pista(metodo):
+    pista = pista_por_defecto()
+    f1, f2 = np.array([-10400.0, -10200.0, -10000.0]), np.array([-4500.0, -4300.0, -4200.0])
+    resultado = simular_pista_lote(pista, (f1, f2, 47088.0), metodo=metodo)
+    for i in range(3):
+        estado, t_total, _ = simular_pista(pista, (f1[i], f2[i], 47088.0), metodo=metodo)
+        assert resultado["t_total"][i] == pytest.approx(t_total, abs=1e-9)
+        assert np.allclose(resultado["estado_final"][i], estado, atol=1e-8)
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from simulador.pista import compilar_pista, pista_por_defecto
+from simulador.vuelta import simular_pista
+
+def test_pista_que_empieza_con_curva_toma_el_rumbo_de_la_recta_siguiente():
+    spec = {"inicio": [0, 0], "tramos": [
+        {"tipo": "curva", "radio": 10, "angulo_grados": 90},
+        {"tipo": "recta", "desde": [10, 10], "hasta": [10, 40], "fuerza": 0},
+    ]}
+    pista = compilar_pista(spec)
+    assert pista.rumbo_inicial == pytest.approx(0.0)
+    # Saliendo hacia +x desde el origen, la curva termina en (10, 10) mirando a +y
+    estado, _, _ = simular_pista(pista, metodo="analitico")
+    assert np.allclose(estado[:2], [10, 40])
+
+def test_pista_que_empieza_con_curva_sin_rumbo():
+    tramos = [{"tipo": "curva", "radio": 10, "angulo": 1.0}, {"tipo": "recta", "longitud": 20, "rumbo": "continuar"}]
+    with pytest.raises(ValueError, match="rumbo_inicial"):
+        compilar_pista({"tramos": tramos})
+    assert compilar_pista({"tramos": tramos, "rumbo_inicial": 0.5}).rumbo_inicial == 0.5
+
+def test_rumbo_inicial_de_la_pista_por_defecto():
+    pista = pista_por_defecto()
+    assert pista.rumbo_inicial == pista.tramos[0].direccion
@@ -0,0 +1,63 @@
+import os
+
+import numpy as np
+import pytest
+
+from simulador.pista import DIRECTORIO_PISTAS, cargar_pista, pista_por_defecto
+from simulador.sensibilidad import disparo_newton, simular_pista_sensible
+from simulador.optimizacion import resolver_fuerzas
+from simulador.vuelta import simular_pista
+
+PARAMETROS = ["f1", "f2", "f3", "r1", "r2", "v0"]
+# Paso de las diferencias centradas de cada parámetro
+PASOS = {"f": 1.0, "r": 1e-4, "v": 1e-5}
+
+def vuelta_perturbada(pista, nombre, h):
+    fuerzas = [r.fuerza for r in pista.rectas]
+    radios = [c.radio for c in pista.curvas]
+    v0 = pista.v0
+    if nombre == "v0":
+        v0 += h
+    elif nombre[0] == "f":
+        fuerzas[int(nombre[1:]) - 1] += h
+    else:
+        radios[int(nombre[1:]) - 1] += h
+    return simular_pista(pista, fuerzas, radios, v0, metodo="rk4")
+
+def test_vuelta_sensible_igual_a_simular_pista():
+    pista = pista_por_defecto()
+    estado, t_total, _, _ = simular_pista_sensible(pista, parametros=PARAMETROS)
+    estado_ref, t_ref, _ = simular_pista(pista, metodo="rk4")
+    assert t_total == t_ref
+    assert np.array_equal(estado, estado_ref)
+
+@pytest.mark.parametrize("nombre", PARAMETROS)
+def test_jacobianos_contra_diferencias_finitas(nombre):
+    pista = pista_por_defecto()
+    *_, jacobianos = simular_pista_sensible(pista, parametros=PARAMETROS)
+    columna = PARAMETROS.index(nombre)
+    h = PASOS[nombre[0]]
+    estado_mas, t_mas, _ = vuelta_perturbada(pista, nombre, h)
+    estado_menos, t_menos, _ = vuelta_perturbada(pista, nombre, -h)
+
+    dt_dp = (t_mas - t_menos) / (2 * h)
+    assert jacobianos["t_total"][columna] == pytest.approx(dt_dp, rel=1e-5, abs=1e-12)
+    # x e y finales están fijos por la recta que apunta a la llegada: se comparan v y theta
+    derivada = (estado_mas - estado_menos) / (2 * h)
+    assert np.allclose(jacobianos["estado"][2:, columna], derivada[2:], rtol=1e-5, atol=1e-8)
+
+def test_disparo_newton_converge_en_tp_completo():
+    pista = cargar_pista(os.path.join(DIRECTORIO_PISTAS, "tp_completo.json"))
+    resultado = disparo_newton(pista, fuerzas=[0.0, 0.0, pista.rectas[-1].fuerza])
+    assert np.max(np.abs(resultado["residuo"])) < 1e-6
+    assert resultado["iteraciones"] <= 10
+    referencia = resolver_fuerzas(pista)["fuerzas"]
+    assert np.allclose(resultado["fuerzas"][:2], referencia[:2], rtol=1e-6)
+
+def test_disparo_newton_tiempo_de_vuelta():
+    resultado = disparo_newton(objetivos=[(4, "t", 5.6)], parametros=["f3"])
+    assert resultado["vuelta"][1] == pytest.approx(5.6, abs=1e-6)
+
+def test_sensibilidades_rechazan_metodos_sin_pasos():
+    with pytest.raises(ValueError):
+        simular_pista_sensible(metodo="analitico")
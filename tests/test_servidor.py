@@ -0,0 +1,28 @@
+import asyncio
+
+import pytest
+
+from simulador.servidor import Servidor
+
+@pytest.fixture
+def servidor():
+    servidor = Servidor()
+    servidor._hay_cambios = asyncio.Event()
+    return servidor
+
+def test_pedir_acumula_los_ultimos_valores(servidor):
+    servidor.pedir({"f3": 30000})
+    servidor.pedir({"f3": 40000, "r1": 8.5})
+    assert servidor._pendiente == {"f3": 40000.0, "r1": 8.5}
+    assert servidor._hay_cambios.is_set()
+
+@pytest.mark.parametrize("cambios, mensaje", [
+    ({"f9": 1.0}, "desconocidos: f9"),
+    ({"f1": float("nan")}, "no finitos: f1"),
+    ({"r1": 0.0}, "positivos: r1"),
+    ({"r2": -3.0, "v0": -1.0}, "positivos: r2, v0"),
+])
+def test_pedir_rechaza_valores_invalidos(servidor, cambios, mensaje):
+    with pytest.raises(ValueError, match=mensaje):
+        servidor.pedir(cambios)
+    assert servidor._pendiente == {} and not servidor._hay_cambios.is_set()
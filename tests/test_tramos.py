@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from simulador.pista import pista_por_defecto
+from simulador.tramos import evento_velocidad, simular_tramo_curva, simular_tramo_recto
+from simulador.vuelta import simular_pista
+
+ESTADO = np.array([0.0, 0.0, 50.0, 0.3])
+
+@pytest.mark.parametrize("metodo", ["rk4", "rk45"])
+def test_evento_exacto_termina_sobre_el_borde(metodo):
+    recta = simular_tramo_recto(ESTADO, 30.0, -10000.0, 1e-2, 0.0, metodo=metodo)
+    assert np.hypot(*recta[0][:2]) == pytest.approx(30.0, abs=1e-9)
+    curva = simular_tramo_curva(ESTADO, 9.0, 1.2, 1e-2, 0.0, metodo=metodo)
+    assert curva[0][3] - ESTADO[3] == pytest.approx(1.2, abs=1e-9)
+
+def test_sin_recorte_se_pasa_hasta_un_paso():
+    estado, *_, t, _, _ = simular_tramo_recto(ESTADO, 30.0, -10000.0, 1e-2, 0.0, metodo="rk4", exacto=False)
+    assert 30.0 < np.hypot(*estado[:2]) < 30.0 + estado[2] * 1e-2
+    assert t == pytest.approx(round(t / 1e-2) * 1e-2)
+
+def test_evento_extra_corta_el_tramo():
+    estado, *_ = simular_tramo_recto(ESTADO, 100.0, -10000.0, 1e-2, 0.0, metodo="rk4",
+                                     eventos=[evento_velocidad(40.0)])
+    assert estado[2] == pytest.approx(40.0, abs=1e-9)
+
+def test_vuelta_sin_recorte_reproduce_la_original():
+    # Pasándose hasta un paso en cada tramo, como el tp_completo.py original
+    _, t_total, _ = simular_pista(pista_por_defecto(), metodo="rk4", exacto=False)
+    assert t_total == pytest.approx(5.63, abs=1e-9)
+    _, t_exacto, _ = simular_pista(pista_por_defecto(), metodo="rk4")
+    assert t_exacto == pytest.approx(5.5882, abs=1e-4)
+
+@pytest.mark.parametrize("metodo", ["rk4", "rk45", "distancia"])
+def test_tramos_analiticos_igual_a_integrados(metodo):
+    tolerancia = 1e-6 if metodo == "rk45" else 1e-9
+    analitica = simular_tramo_recto(ESTADO, 30.0, -10000.0, 1e-2, 0.0, metodo="analitico")
+    integrada = simular_tramo_recto(ESTADO, 30.0, -10000.0, 1e-2, 0.0, metodo=metodo)
+    assert np.allclose(analitica[0], integrada[0], atol=tolerancia)
+    assert analitica[7] == pytest.approx(integrada[7], abs=tolerancia)
+    analitica = simular_tramo_curva(ESTADO, 9.0, 1.2, 1e-2, 0.0, metodo="analitico")
+    integrada = simular_tramo_curva(ESTADO, 9.0, 1.2, 1e-2, 0.0, metodo=metodo)
+    assert np.allclose(analitica[0], integrada[0], atol=tolerancia)
+    assert analitica[7] == pytest.approx(integrada[7], abs=tolerancia)
+
+@pytest.mark.parametrize("metodo, tolerancia", [("rk4", 1e-9), ("rk45", 1e-6), ("distancia", 1e-9)])
+def test_tiempo_de_vuelta_igual_en_todos_los_metodos(metodo, tolerancia):
+    _, t_analitico, _ = simular_pista(pista_por_defecto(), metodo="analitico")
+    _, t_total, _ = simular_pista(pista_por_defecto(), metodo=metodo)
+    assert t_analitico == pytest.approx(5.588192, abs=1e-6)
+    assert t_total == pytest.approx(t_analitico, abs=tolerancia)
+
+def test_auto_usa_la_solucion_cerrada():
+    auto = simular_tramo_recto(ESTADO, 30.0, -10000.0, 1e-2, 0.0)
+    analitica = simular_tramo_recto(ESTADO, 30.0, -10000.0, 1e-2, 0.0, metodo="analitico")
+    assert np.array_equal(auto[0], analitica[0]) and auto[7] == analitica[7]
+
+def test_distancia_termina_justo_en_la_longitud():
+    # Dos fuerzas distintas: misma grilla en s y salida justo a 30 m
+    lenta = simular_tramo_recto(ESTADO, 30.0, -10000.0, 1e-2, 0.0, metodo="distancia", ds=0.7)
+    rapida = simular_tramo_recto(ESTADO, 30.0, 20000.0, 1e-2, 0.0, metodo="distancia", ds=0.7)
+    for resultado in (lenta, rapida):
+        assert np.hypot(*resultado[0][:2]) == pytest.approx(30.0, abs=1e-12)
+        assert len(resultado[1]) == int(np.ceil(30.0 / 0.7))
+    recorrido = lambda r: np.hypot(r[1], r[2])
+    assert np.allclose(recorrido(lenta), recorrido(rapida), atol=1e-12)
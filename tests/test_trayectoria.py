@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from simulador import RegistroEventos, RegistroIntervalo, Trayectoria, pista_por_defecto, simular_pista
+
+# Diferencia máxima en posición (m) con la vuelta analítica, por método
+TOLERANCIAS = {"rk4": 1e-6, "distancia": 1e-6, "rk45": 1e-3}
+
+def vuelta(metodo, registro):
+    trayectoria = Trayectoria(registro=registro)
+    simular_pista(pista_por_defecto(), metodo=metodo, trayectoria=trayectoria)
+    return trayectoria
+
+@pytest.mark.parametrize("metodo", sorted(TOLERANCIAS))
+def test_intervalo_sigue_la_vuelta_analitica(metodo):
+    referencia = vuelta("analitico", RegistroIntervalo(0.05))
+    trayectoria = vuelta(metodo, RegistroIntervalo(0.05))
+    assert len(trayectoria) == len(referencia)
+    assert np.allclose(trayectoria["t"], referencia["t"], atol=1e-6)
+    for columna in ("x", "y"):
+        assert np.abs(trayectoria[columna] - referencia[columna]).max() < TOLERANCIAS[metodo]
+
+@pytest.mark.parametrize("metodo", sorted(TOLERANCIAS))
+def test_eventos_no_dependen_del_metodo(metodo):
+    referencia = vuelta("analitico", RegistroEventos())
+    trayectoria = vuelta(metodo, RegistroEventos())
+    assert len(trayectoria) == len(referencia) == len(pista_por_defecto().tramos)
+    assert [tipo for tipo, *_ in trayectoria.tramos] == [tipo for tipo, *_ in referencia.tramos]
+    assert np.allclose(trayectoria["t"], referencia["t"], atol=1e-6)
+
+def test_eventos_guardan_picos_de_velocidad():
+    # v(t) = 10 - (t - 1)²: un máximo en t = 1 entre pasos de 0.3 s
+    def estado(t):
+        return np.array([t, 0.0, 10 - (t - 1) ** 2, 0.0])
+
+    trayectoria = Trayectoria(registro=RegistroEventos())
+    inicio = trayectoria.abrir_tramo(0.0, estado(0.0))
+    for t in np.arange(1, 8) * 0.3:
+        trayectoria.agregar(t, estado(t), estado)
+    trayectoria.cerrar_tramo("curva", inicio, estado(0.0), 0.0, radio=10.0)
+    assert len(trayectoria) == 2
+    assert trayectoria["t"][0] == pytest.approx(1.0, abs=1e-6)
+    assert trayectoria["v"][0] == pytest.approx(10.0, abs=1e-12)
+    assert trayectoria["t"][1] == pytest.approx(2.1)